@@ -1,28 +1,122 @@
+import atexit
+import copy
+import json
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Настройки логирования (из bot/.env)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # json или text
+LOG_MAX_FIELD_LENGTH = int(os.getenv('LOG_MAX_FIELD_LENGTH', '4000'))  # 0 - без ограничения
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+
+# Атрибуты LogRecord, которые не относятся к extra-полям
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+def truncate(value, max_length):
+    """Обрезать строку до max_length символов с пометкой об обрезке"""
+    if not max_length or len(value) <= max_length:
+        return value
+    return f"{value[:max_length]}... [обрезано {len(value) - max_length} символов]"
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога в одну строку JSON с обрезкой длинных полей"""
+
+    def __init__(self, max_field_length=0):
+        super().__init__()
+        self.max_field_length = max_field_length
+
+    def _cap(self, value):
+        if isinstance(value, str):
+            return truncate(value, self.max_field_length)
+        return value
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": self._cap(record.getMessage()),
+            "source": f"{record.filename}:{record.lineno}",
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = self._cap(value)
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Текстовый формат с обрезкой длинных сообщений"""
+
+    def __init__(self, max_field_length=0):
+        super().__init__(TEXT_FORMAT)
+        self.max_field_length = max_field_length
+
+    def formatMessage(self, record):
+        record.message = truncate(record.message, self.max_field_length)
+        return super().formatMessage(record)
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """QueueHandler без форматирования в потоке event loop"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        # Аргументы могут измениться до записи - подставляем их сразу
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Трассировка держит ссылки на кадры стека - сохраняем только текст
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 def setup_logging():
-    """Настройка логирования в файл и консоль"""
+    """
+    Настройка логирования в файл и консоль
+
+    Обработчики бота только кладут записи в очередь, а форматирование
+    и запись в консоль и файл выполняет фоновый поток - запись на диск
+    не блокирует event loop.
+    """
+    global _listener
+
+    # Логгер
+    logger = logging.getLogger()
+    logger.setLevel(LOG_LEVEL)
+    if _listener is not None:
+        return logger
+
     # Создаем директорию для логов если нет
     log_dir = "logs"
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
     # Формат логов
-    log_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
-    )
-
-    # Логгер
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    if LOG_FORMAT == 'json':
+        log_format = JsonFormatter(LOG_MAX_FIELD_LENGTH)
+    else:
+        log_format = TextFormatter(LOG_MAX_FIELD_LENGTH)
 
     # 1. Вывод в консоль
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(log_format)
-    logger.addHandler(console_handler)
 
     # 2. Вывод в файл (ротация по 10МБ, храним 5 файлов)
     file_handler = RotatingFileHandler(
@@ -32,10 +126,27 @@ def setup_logging():
         encoding='utf-8'
     )
     file_handler.setFormatter(log_format)
-    logger.addHandler(file_handler)
-    
+
+    # 3. Запись обоих выводов в фоновом потоке
+    log_queue = queue.Queue(-1)
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    logger.addHandler(BackgroundQueueHandler(log_queue))
+
     # Убираем шум от библиотек
     logging.getLogger("httpx").setLevel(logging.WARNING)
     logging.getLogger("apscheduler").setLevel(logging.WARNING)
 
     return logger
+
+
+def shutdown_logging():
+    """Дописать записи из очереди и остановить фоновый поток"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -3,6 +3,8 @@
 Telegram бот для Health Assist с кнопочным интерфейсом
 """
 import os
+import json
+import time
 import logging
 import httpx
 from datetime import datetime
@@ -27,11 +29,13 @@ import sys
 
 # ... imports ...
 from logger import setup_logging
+from tracing import api_client, setup_tracing, shutdown_tracing, traced
 
 # Загружаем переменные окружения
 load_dotenv()
 
 logger = setup_logging()
+setup_tracing()
 API_URL = os.getenv('API_URL', 'http://api:8000')
 WEB_URL = os.getenv('WEB_URL', 'http://127.0.0.1:8000')
 
@@ -109,7 +113,7 @@ async def check_authorization(user_id: int, context: ContextTypes.DEFAULT_TYPE)
         return True
 
     # Проверяем через API
-    async with httpx.AsyncClient(timeout=5.0) as client:
+    async with api_client(timeout=5.0) as client:
         try:
             response = await client.get(f"{API_URL}/api/v1/auth/check/{user_id}")
             if response.status_code == 200:
@@ -128,6 +132,7 @@ async def check_authorization(user_id: int, context: ContextTypes.DEFAULT_TYPE)
             return False
 
 
+@traced("bot.start")
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик команды /start"""
     user = update.effective_user
@@ -136,7 +141,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     start_param = context.args[0] if context.args else None
 
     # Проверяем авторизацию через API при каждом старте
-    async with httpx.AsyncClient(timeout=5.0) as client:
+    async with api_client(timeout=5.0) as client:
         try:
             response = await client.get(f"{API_URL}/api/v1/auth/check/{user.id}")
             if response.status_code == 200:
@@ -210,12 +215,13 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     logger.info(f"User {user.id} ({user.first_name}) started the bot (not authorized)")
 
 
+@traced("bot.auth")
 async def handle_auth(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обработчик авторизации"""
     user = update.effective_user
 
     # Check auth status in backend
-    async with httpx.AsyncClient(timeout=5.0) as client:
+    async with api_client(timeout=5.0) as client:
         try:
             response = await client.get(f"{API_URL}/api/v1/auth/check/{user.id}")
             if response.status_code == 200:
@@ -320,6 +326,28 @@ async def plan_upload_start(update: Update, context: ContextTypes.DEFAULT_TYPE)
     return UPLOAD_FILE
 
 
+# Подписи разделов плана в сообщении о ходе загрузки
+PLAN_SECTION_LABELS = {
+    'medications': '💊 Лекарств',
+    'examinations': '🔬 Обследований',
+    'referrals': '👨‍⚕️ Направлений',
+    'symptoms': '🩺 Симптомов',
+}
+
+# Минимальный интервал между обновлениями сообщения о ходе загрузки (секунды)
+PROGRESS_EDIT_INTERVAL = 1.0
+
+
+def format_upload_progress(file_name: str, item_counts: dict) -> str:
+    """Текст сообщения о ходе разбора плана лечения"""
+    lines = [f"⏳ Разбираю план лечения '{file_name}'..."]
+    for section, label in PLAN_SECTION_LABELS.items():
+        if item_counts.get(section):
+            lines.append(f"{label}: {item_counts[section]}")
+    return "\n".join(lines)
+
+
+@traced("bot.plan_upload")
 async def plan_upload_file(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Обработка загрузки файла и отправка в API"""
     document = update.message.document
@@ -339,8 +367,8 @@ async def plan_upload_file(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         )
         return UPLOAD_FILE
 
-    # Показываем сообщение о загрузке
-    await update.message.reply_text(
+    # Показываем сообщение о загрузке (обновляется по мере извлечения плана)
+    progress_message = await update.message.reply_text(
         f"⏳ Загружаю план лечения '{document.file_name}'...",
         reply_markup=ReplyKeyboardRemove()
     )
@@ -362,32 +390,65 @@ async def plan_upload_file(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             'X-Telegram-ID': str(user.id)
         }
 
-        # Отправляем в API
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{API_URL}/api/v1/plans/load_plan_file",
+        # Отправляем в API; результат приходит потоком событий (NDJSON),
+        # таймаут ограничивает ожидание каждого события, а не всего ответа
+        result = None
+        error_detail = None
+        item_counts = {}
+        last_edit = 0.0
+
+        async with api_client(timeout=30.0) as client:
+            async with client.stream(
+                "POST",
+                f"{API_URL}/api/v1/plans/load_plan_file/stream",
                 files=files,
                 headers=headers
+            ) as response:
+                if response.status_code != 201:
+                    await response.aread()
+                    error_detail = response.json().get('detail', 'Unknown error')
+                else:
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        event = json.loads(line)
+
+                        if event['event'] == 'item':
+                            section = event['section']
+                            item_counts[section] = item_counts.get(section, 0) + 1
+                            # Не чаще раза в PROGRESS_EDIT_INTERVAL секунд (лимиты Telegram)
+                            now = time.monotonic()
+                            if now - last_edit >= PROGRESS_EDIT_INTERVAL:
+                                last_edit = now
+                                try:
+                                    await progress_message.edit_text(
+                                        format_upload_progress(document.file_name, item_counts)
+                                    )
+                                except Exception as e:
+                                    # Прогресс необязателен, загрузку не прерываем
+                                    logger.warning(f"Failed to update upload progress for user {user.id}: {e}")
+                        elif event['event'] == 'result':
+                            result = event['data']
+                        elif event['event'] == 'error':
+                            error_detail = event['detail']
+
+        if result is not None:
+            success_message = (
+                "✅ План лечения успешно загружен!\n\n"
+                f"📋 Название: {result.get('title')}\n"
+                f"🆔 ID плана: {result.get('id')}\n\n"
+                "Вы можете посмотреть его в разделе 'Мое лечение'"
             )
-
-            if response.status_code == 201:
-                result = response.json()
-                success_message = (
-                    "✅ План лечения успешно загружен!\n\n"
-                    f"📋 Название: {result.get('title')}\n"
-                    f"🆔 ID плана: {result.get('id')}\n\n"
-                    "Вы можете посмотреть его в разделе 'Мое лечение'"
-                )
-                await update.message.reply_text(success_message, reply_markup=get_main_keyboard())
-                logger.info(f"User {user.id} successfully uploaded plan, ID: {result.get('id')}")
-            else:
-                error_detail = response.json().get('detail', 'Unknown error')
-                await update.message.reply_text(
-                    f"❌ Ошибка при загрузке плана:\n{error_detail}\n\n"
-                    "Пожалуйста, попробуйте позже.",
-                    reply_markup=get_main_keyboard()
-                )
-                logger.error(f"API error uploading plan for user {user.id}: {response.status_code} - {error_detail}")
+            await update.message.reply_text(success_message, reply_markup=get_main_keyboard())
+            logger.info(f"User {user.id} successfully uploaded plan, ID: {result.get('id')}")
+        else:
+            error_detail = error_detail or 'Unknown error'
+            await update.message.reply_text(
+                f"❌ Ошибка при загрузке плана:\n{error_detail}\n\n"
+                "Пожалуйста, попробуйте позже.",
+                reply_markup=get_main_keyboard()
+            )
+            logger.error(f"API error uploading plan for user {user.id}: {error_detail}")
 
     except httpx.TimeoutException:
         await update.message.reply_text(
@@ -489,18 +550,62 @@ async def handle_treatment_show(update: Update, context: ContextTypes.DEFAULT_TY
     logger.info(f"User {query.from_user.id} requested treatment plan with recommendations")
 
 
+@traced("bot.plan_export")
 async def handle_treatment_pdf(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Обработчик 'Скачать PDF'"""
+    """Обработчик 'Скачать PDF' - отправляет последний план лечения в PDF"""
     query = update.callback_query
     await query.answer()
 
-    message = (
-        "📄 Скачать план лечения в PDF\n\n"
-        "Здесь вы сможете скачать ваш план лечения в формате PDF для печати или хранения.\n\n"
-        "🚧 Функция находится в разработке..."
-    )
-    await query.edit_message_text(message)
-    logger.info(f"User {query.from_user.id} requested PDF download")
+    user = query.from_user
+    headers = {
+        'X-Telegram-ID': str(user.id)
+    }
+
+    try:
+        async with api_client(timeout=30.0) as client:
+            # Берём самый свежий план пользователя
+            response = await client.get(
+                f"{API_URL}/api/v1/plans/get_all",
+                params={'limit': 1},
+                headers=headers
+            )
+            if response.status_code != 200:
+                await query.edit_message_text("⚠️ Не удалось получить список планов. Пожалуйста, попробуйте позже.")
+                logger.error(f"API error listing plans for user {user.id}: {response.status_code}")
+                return
+
+            plans = response.json()
+            if not plans:
+                await query.edit_message_text(
+                    "📄 У вас пока нет планов лечения.\n\n"
+                    "Добавьте план через кнопку 'Добавить план лечения'."
+                )
+                return
+
+            plan = plans[0]
+            response = await client.get(
+                f"{API_URL}/api/v1/plans/{plan['id']}/export.pdf",
+                headers=headers
+            )
+            if response.status_code != 200:
+                await query.edit_message_text("⚠️ Не удалось сформировать PDF. Пожалуйста, попробуйте позже.")
+                logger.error(f"API error exporting plan {plan['id']} for user {user.id}: {response.status_code}")
+                return
+
+        await query.edit_message_text(f"📄 План лечения '{plan['title']}'")
+        await query.message.reply_document(
+            document=response.content,
+            filename=f"plan_{plan['id']}.pdf"
+        )
+        logger.info(f"User {user.id} downloaded plan {plan['id']} as PDF")
+
+    except httpx.TimeoutException:
+        await query.edit_message_text("❌ Время ожидания истекло. Сервер не отвечает.")
+        logger.error(f"Timeout exporting plan PDF for user {user.id}")
+
+    except Exception as e:
+        await query.edit_message_text("❌ Произошла ошибка при формировании PDF. Пожалуйста, попробуйте позже.")
+        logger.error(f"Error exporting plan PDF for user {user.id}: {e}")
 
 
 async def handle_treatment_back(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -596,6 +701,7 @@ def main() -> None:
     # Запускаем бота
     logger.info("Bot is running...")
     application.run_polling(allowed_updates=Update.ALL_TYPES)
+    shutdown_tracing()
 
 
 if __name__ == "__main__":
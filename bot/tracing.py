@@ -0,0 +1,89 @@
+import functools
+import os
+
+import httpx
+from opentelemetry import trace
+
+# Настройки трассировки (из bot/.env)
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'file')  # file или otlp
+TRACING_FILE = os.getenv('TRACING_FILE', 'logs/traces.jsonl')
+TRACING_OTLP_ENDPOINT = os.getenv('TRACING_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+TRACING_SAMPLE_RATIO = float(os.getenv('TRACING_SAMPLE_RATIO', '1.0'))
+
+SERVICE_NAME = 'health_assist_bot'
+
+tracer = trace.get_tracer(__name__)
+
+_provider = None
+
+
+def setup_tracing():
+    """
+    Настройка трассировки OpenTelemetry
+
+    Спан обработчика (traced) - корень trace загрузки плана; контекст
+    передается в API заголовком traceparent через клиентов api_client().
+    """
+    global _provider
+    if not TRACING_ENABLED or _provider is not None:
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if TRACING_EXPORTER == 'otlp':
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=TRACING_OTLP_ENDPOINT)
+    else:
+        os.makedirs(os.path.dirname(TRACING_FILE) or '.', exist_ok=True)
+        # Один спан - одна строка JSON
+        exporter = ConsoleSpanExporter(
+            service_name=SERVICE_NAME,
+            out=open(TRACING_FILE, 'a', encoding='utf-8'),
+            formatter=lambda span: span.to_json(indent=None) + '\n',
+        )
+
+    _provider = TracerProvider(
+        resource=Resource.create({'service.name': SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO)),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+
+
+def shutdown_tracing():
+    """Отправить накопленные спаны"""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def api_client(**kwargs) -> httpx.AsyncClient:
+    """
+    HTTP-клиент для запросов к API с передачей контекста трассировки
+
+    Инструментируются только клиенты API - запросы python-telegram-bot
+    к Telegram (long polling) в трассировку не попадают.
+    """
+    client = httpx.AsyncClient(**kwargs)
+    if _provider is not None:
+        from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+        HTTPXClientInstrumentor.instrument_client(client, tracer_provider=_provider)
+    return client
+
+
+def traced(name):
+    """Декоратор обработчика: спан на время обработки апдейта"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(update, context):
+            with tracer.start_as_current_span(name) as span:
+                if update.effective_user:
+                    span.set_attribute('telegram.user_id', update.effective_user.id)
+                return await handler(update, context)
+        return wrapper
+    return decorator
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+GigaChat Mock Service
+
+Локальная замена GigaChat API для нагрузочного и регрессионного
+тестирования: OAuth, chat completions (обычный и потоковый режим),
+воспроизведение заготовленных ответов, настраиваемые задержки,
+доля ошибок и ограничение частоты запросов.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+MODEL_NAME = "GigaChat"
+EVENT_STREAM = "text/event-stream"
+
+# Примерное количество символов на токен (для русского текста)
+CHARS_PER_TOKEN = 3
+
+
+class MockSettings:
+    """Настройки мок-сервиса (из переменных окружения)"""
+
+    def __init__(self):
+        self.responses_dir = Path(os.getenv("MOCK_RESPONSES_DIR", Path(__file__).parent / "responses"))
+        # hash - ответ определяется текстом запроса, round_robin, random
+        self.response_selection = os.getenv("MOCK_RESPONSE_SELECTION", "hash")
+        self.token_ttl = int(os.getenv("MOCK_TOKEN_TTL_SECONDS", "1800"))
+
+        # Задержка до первого токена: fixed, uniform, normal, lognormal
+        self.latency_distribution = os.getenv("MOCK_LATENCY_DISTRIBUTION", "lognormal")
+        self.latency_ms = float(os.getenv("MOCK_LATENCY_MS", "800"))  # медиана/среднее
+        self.latency_jitter_ms = float(os.getenv("MOCK_LATENCY_JITTER_MS", "200"))  # для uniform/normal
+        self.latency_sigma = float(os.getenv("MOCK_LATENCY_SIGMA", "0.5"))  # для lognormal
+        # Время генерации одного токена ответа
+        self.token_delay_ms = float(os.getenv("MOCK_TOKEN_DELAY_MS", "5"))
+        self.stream_chunk_tokens = int(os.getenv("MOCK_STREAM_CHUNK_TOKENS", "4"))
+
+        # Доля ответов с ошибкой сервера и доля невалидного (обрезанного) JSON
+        self.error_rate = float(os.getenv("MOCK_ERROR_RATE", "0"))
+        self.error_statuses = [int(code) for code in os.getenv("MOCK_ERROR_STATUSES", "500,503").split(",")]
+        self.invalid_rate = float(os.getenv("MOCK_INVALID_RATE", "0"))
+
+        # Ограничения: запросов в секунду (token bucket) и одновременных генераций, 0 - без ограничения
+        self.rate_limit_rps = float(os.getenv("MOCK_RATE_LIMIT_RPS", "0"))
+        self.rate_limit_burst = int(os.getenv("MOCK_RATE_LIMIT_BURST", "10"))
+        self.max_concurrent = int(os.getenv("MOCK_MAX_CONCURRENT", "0"))
+
+        seed = os.getenv("MOCK_SEED")
+        self.seed = int(seed) if seed else None
+
+
+class RateLimiter:
+    """Token bucket: rps запросов в секунду с запасом burst"""
+
+    def __init__(self, rps: float, burst: int):
+        self.rps = rps
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def acquire(self) -> bool:
+        """Взять токен; False, если лимит исчерпан"""
+        if self.rps <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rps)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+settings = MockSettings()
+rng = random.Random(settings.seed)
+rate_limiter = RateLimiter(settings.rate_limit_rps, settings.rate_limit_burst)
+
+# Выданные токены доступа: токен -> время истечения (unix, секунды)
+access_tokens: Dict[str, float] = {}
+active_generations = 0
+stats: Dict[str, int] = {}
+
+
+def reset_stats() -> None:
+    """Сброс счетчиков"""
+    stats.update({
+        "oauth_requests": 0,
+        "chat_requests": 0,
+        "stream_requests": 0,
+        "unauthorized": 0,
+        "rate_limited": 0,
+        "errors": 0,
+        "invalid_responses": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+    })
+
+
+def load_responses(responses_dir: Path) -> List[str]:
+    """
+    Загрузка заготовленных ответов модели
+
+    *.json и *.txt из директории используются как текст ответа без изменений
+    (в том числе с markdown-обрамлением, чтобы проверять разбор ответа).
+    """
+    files = sorted(responses_dir.glob("*.json")) + sorted(responses_dir.glob("*.txt"))
+    responses = [path.read_text(encoding="utf-8") for path in files]
+    if not responses:
+        raise RuntimeError(f"No canned responses found in {responses_dir}")
+    return responses
+
+
+reset_stats()
+responses = load_responses(settings.responses_dir)
+round_robin = itertools.cycle(range(len(responses)))
+
+app = FastAPI(
+    title="GigaChat Mock Service",
+    description="Мок-сервис для имитации GigaChat API",
+    version="1.0.0"
+)
+
+
+def count_tokens(text: str) -> int:
+    """Примерная оценка количества токенов"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def sample_latency() -> float:
+    """Задержка до первого токена в секундах по заданному распределению"""
+    distribution = settings.latency_distribution
+    if distribution == "fixed":
+        latency_ms = settings.latency_ms
+    elif distribution == "uniform":
+        latency_ms = rng.uniform(settings.latency_ms - settings.latency_jitter_ms,
+                                 settings.latency_ms + settings.latency_jitter_ms)
+    elif distribution == "normal":
+        latency_ms = rng.gauss(settings.latency_ms, settings.latency_jitter_ms)
+    elif distribution == "lognormal":
+        # Медиана latency_ms, длинный хвост как у реального API
+        latency_ms = settings.latency_ms * rng.lognormvariate(0, settings.latency_sigma)
+    else:
+        raise ValueError(f"Unknown latency distribution: {distribution}")
+    return max(latency_ms, 0) / 1000
+
+
+def select_response(messages: List[Dict[str, Any]]) -> str:
+    """Выбор заготовленного ответа для запроса"""
+    if settings.response_selection == "round_robin":
+        index = next(round_robin)
+    elif settings.response_selection == "random":
+        index = rng.randrange(len(responses))
+    else:
+        # Один и тот же запрос всегда получает один и тот же ответ
+        content = "".join(str(message.get("content", "")) for message in messages)
+        index = int(hashlib.sha256(content.encode("utf-8")).hexdigest(), 16) % len(responses)
+
+    content = responses[index]
+    if settings.invalid_rate and rng.random() < settings.invalid_rate:
+        # Обрезанный ответ - проверка запроса на исправление
+        stats["invalid_responses"] += 1
+        content = content[:len(content) // 2]
+    return content
+
+
+def error_response(status_code: int, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """Ответ с ошибкой в формате GigaChat API"""
+    return JSONResponse(
+        status_code=status_code,
+        content={"status": status_code, "message": message},
+        headers=headers
+    )
+
+
+def check_access_token(request: Request) -> bool:
+    """Проверка Bearer-токена, выданного /api/v2/oauth"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    expires_at = access_tokens.get(token)
+    return scheme == "Bearer" and expires_at is not None and expires_at > time.time()
+
+
+def split_chunks(content: str) -> List[str]:
+    """Разбиение ответа на фрагменты для потоковой выдачи"""
+    size = settings.stream_chunk_tokens * CHARS_PER_TOKEN
+    return [content[index:index + size] for index in range(0, len(content), size)]
+
+
+@app.get("/")
+async def root():
+    """Main endpoint"""
+    return {
+        "service": "GigaChat Mock Service",
+        "status": "running",
+        "version": "1.0.0",
+        "responses": len(responses)
+    }
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {
+        "status": "healthy",
+        "service": "GigaChat Mock Service"
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    """Счетчики запросов (для проверки результатов нагрузочных тестов)"""
+    return {**stats, "active_generations": active_generations}
+
+
+@app.post("/stats/reset")
+async def post_stats_reset():
+    """Сброс счетчиков запросов"""
+    reset_stats()
+    return {"status": "reset"}
+
+
+@app.post("/api/v2/oauth")
+async def oauth(request: Request):
+    """Выдача токена доступа (аналог ngw.devices.sberbank.ru/api/v2/oauth)"""
+    stats["oauth_requests"] += 1
+
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    form = parse_qs((await request.body()).decode("utf-8"))
+    if scheme not in ("Basic", "Bearer") or not credentials:
+        stats["unauthorized"] += 1
+        return error_response(401, "Authorization error: header is incorrect")
+    if not form.get("scope"):
+        return error_response(400, "scope is required")
+
+    token = uuid.uuid4().hex
+    expires_at = time.time() + settings.token_ttl
+    access_tokens[token] = expires_at
+    return {"access_token": token, "expires_at": int(expires_at * 1000)}
+
+
+@app.get("/api/v1/models")
+async def get_models(request: Request):
+    """Список доступных моделей"""
+    if not check_access_token(request):
+        stats["unauthorized"] += 1
+        return error_response(401, "Token has expired")
+    return {
+        "object": "list",
+        "data": [{"id": MODEL_NAME, "object": "model", "owned_by": "salutedevices"}]
+    }
+
+
+@app.post("/api/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Генерация ответа (обычный и потоковый режим)"""
+    global active_generations
+
+    stats["chat_requests"] += 1
+    if not check_access_token(request):
+        stats["unauthorized"] += 1
+        return error_response(401, "Token has expired")
+
+    if not rate_limiter.acquire():
+        stats["rate_limited"] += 1
+        return error_response(429, "Too many requests", headers={"Retry-After": "1"})
+    if settings.max_concurrent and active_generations >= settings.max_concurrent:
+        stats["rate_limited"] += 1
+        return error_response(429, "Too many concurrent requests", headers={"Retry-After": "1"})
+
+    body = await request.json()
+    messages = body.get("messages", [])
+    model = body.get("model") or MODEL_NAME
+    stream = body.get("stream", False)
+
+    if settings.error_rate and rng.random() < settings.error_rate:
+        stats["errors"] += 1
+        await asyncio.sleep(sample_latency())
+        return error_response(rng.choice(settings.error_statuses), "Internal Server Error")
+
+    content = select_response(messages)
+    prompt_tokens = sum(count_tokens(str(message.get("content", ""))) for message in messages)
+    completion_tokens = count_tokens(content)
+    stats["prompt_tokens"] += prompt_tokens
+    stats["completion_tokens"] += completion_tokens
+    created = int(time.time())
+
+    if not stream:
+        active_generations += 1
+        try:
+            await asyncio.sleep(sample_latency() + completion_tokens * settings.token_delay_ms / 1000)
+        finally:
+            active_generations -= 1
+
+        return {
+            "choices": [{
+                "message": {"role": "assistant", "content": content},
+                "index": 0,
+                "finish_reason": "stop"
+            }],
+            "created": created,
+            "model": model,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            },
+            "object": "chat.completion"
+        }
+
+    stats["stream_requests"] += 1
+    # Генерация считается активной с момента приема запроса
+    active_generations += 1
+
+    async def events():
+        global active_generations
+        try:
+            await asyncio.sleep(sample_latency())
+            chunks = split_chunks(content)
+            for index, chunk in enumerate(chunks):
+                if index:
+                    await asyncio.sleep(settings.stream_chunk_tokens * settings.token_delay_ms / 1000)
+                event = {
+                    "choices": [{
+                        "delta": {"role": "assistant", "content": chunk},
+                        "index": 0,
+                        "finish_reason": "stop" if index == len(chunks) - 1 else None
+                    }],
+                    "created": created,
+                    "model": model,
+                    "object": "chat.completion"
+                }
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            active_generations -= 1
+
+    return StreamingResponse(events(), media_type=EVENT_STREAM)
@@ -9,6 +9,8 @@ from alembic import context
 
 # Добавляем корневую директорию в PYTHONPATH
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# и каталог миграций - для общих операций (migration_helpers)
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 # Импортируем настройки и модели
 from app.core.config import settings
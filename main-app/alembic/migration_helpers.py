@@ -0,0 +1,36 @@
+"""
+Общие операции миграций (импорт: from migration_helpers import ...).
+"""
+
+from alembic import op
+
+
+def create_index_concurrently(name: str, ddl: str) -> None:
+    """
+    Построить индекс без блокировки записи в таблицу
+
+    Вызывается внутри op.get_context().autocommit_block(): CONCURRENTLY
+    не работает в транзакции. Прерванное построение оставляет невалидный
+    индекс, который IF NOT EXISTS пропустил бы, - такой индекс удаляется
+    и строится заново.
+
+    Args:
+        name: Имя индекса
+        ddl: Определение индекса после имени (ON таблица ...)
+
+    Example:
+        >>> with op.get_context().autocommit_block():
+        ...     create_index_concurrently('idx_symptoms_next_survey_at', 'ON symptoms (next_survey_at)')
+    """
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = '{name}' AND NOT i.indisvalid
+            ) THEN
+                EXECUTE 'DROP INDEX {name}';
+            END IF;
+        END $$
+    """)
+    op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {ddl}')
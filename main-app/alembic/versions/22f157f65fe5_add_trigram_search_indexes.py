@@ -0,0 +1,43 @@
+"""add_trigram_search_indexes
+
+Revision ID: 22f157f65fe5
+Revises: f3a4b2c1d5e6
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_helpers import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '22f157f65fe5'
+down_revision: Union[str, None] = 'f3a4b2c1d5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (индекс, таблица, колонка) - GIN-индексы pg_trgm для /medicins/search и /plans/search
+TRIGRAM_INDEXES = [
+    ('idx_medicins_name_trgm', 'medicins', 'name'),
+    ('idx_medicins_international_name_trgm', 'medicins', 'international_name'),
+    ('idx_plans_title_trgm', 'plans', 'title'),
+    ('idx_plans_description_trgm', 'plans', 'description'),
+]
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CONCURRENTLY не блокирует запись в таблицы, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        for index_name, table_name, column_name in TRIGRAM_INDEXES:
+            create_index_concurrently(index_name, f'ON {table_name} USING gin ({column_name} gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, _, _ in reversed(TRIGRAM_INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+    # Расширение pg_trgm не удаляем: им могут пользоваться другие объекты БД
@@ -0,0 +1,74 @@
+"""add_stats_rollup_tables
+
+Revision ID: a3d71c9e2b40
+Revises: f9abc2be6611
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_helpers import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d71c9e2b40'
+down_revision: Union[str, None] = 'f9abc2be6611'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    watermarks = op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=50), nullable=False, comment='surveys, adherence'),
+    sa.Column('last_id', sa.BigInteger(), nullable=True, comment='Последний учтенный id (опросы)'),
+    sa.Column('next_id', sa.BigInteger(), nullable=True, comment='Максимальный id на момент прошлого прохода'),
+    sa.Column('last_time', sa.DateTime(timezone=True), nullable=True, comment='Учтены строки раньше этого времени (уведомления)'),
+    sa.Column('timezone', sa.String(length=64), nullable=True, comment='Часовой пояс границ дней агрегатов'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Фоновая задача только блокирует и обновляет эти строки
+    op.bulk_insert(watermarks, [{'name': 'surveys'}, {'name': 'adherence'}])
+
+    op.create_table('survey_daily_rollups',
+    sa.Column('symptom_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('value_count', sa.Integer(), nullable=False, comment='Количество опросов'),
+    sa.Column('value_sum', sa.Integer(), nullable=False, comment='Сумма оценок'),
+    sa.Column('value_min', sa.Integer(), nullable=False),
+    sa.Column('value_max', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['symptom_id'], ['symptoms.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('symptom_id', 'day')
+    )
+    op.create_index('idx_survey_daily_rollups_user_id_day', 'survey_daily_rollups', ['user_id', 'day'], unique=False)
+
+    op.create_table('adherence_daily_rollups',
+    sa.Column('prescription_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False, comment='Отправлено напоминаний'),
+    sa.Column('read_count', sa.Integer(), nullable=False, comment='Прочитано напоминаний'),
+    sa.ForeignKeyConstraint(['prescription_id'], ['medical_prescriptions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('prescription_id', 'day')
+    )
+    op.create_index('idx_adherence_daily_rollups_user_id_day', 'adherence_daily_rollups', ['user_id', 'day'], unique=False)
+
+    # Напоминания о приеме по времени отправки - для прохода фоновой задачи
+    with op.get_context().autocommit_block():
+        create_index_concurrently('idx_notifications_prescription_time', "ON notifications (time) WHERE type = 'prescription'")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_notifications_prescription_time')
+    op.drop_index('idx_adherence_daily_rollups_user_id_day', table_name='adherence_daily_rollups')
+    op.drop_table('adherence_daily_rollups')
+    op.drop_index('idx_survey_daily_rollups_user_id_day', table_name='survey_daily_rollups')
+    op.drop_table('survey_daily_rollups')
+    op.drop_table('rollup_watermarks')
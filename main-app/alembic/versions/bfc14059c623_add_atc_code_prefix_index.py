@@ -0,0 +1,33 @@
+"""add_atc_code_prefix_index
+
+Revision ID: bfc14059c623
+Revises: 22f157f65fe5
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_helpers import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bfc14059c623'
+down_revision: Union[str, None] = '22f157f65fe5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # text_pattern_ops обслуживает и равенство, и диапазоны префиксов классов АТХ
+    # (app.services.atc), поэтому заменяет обычный индекс по atc_code
+    with op.get_context().autocommit_block():
+        create_index_concurrently('idx_medicins_atc_code_pattern', 'ON medicins (atc_code text_pattern_ops)')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_medicins_atc_code')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_medicins_atc_code ON medicins (atc_code)')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_medicins_atc_code_pattern')
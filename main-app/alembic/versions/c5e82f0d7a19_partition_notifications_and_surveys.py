@@ -0,0 +1,151 @@
+"""partition_notifications_and_surveys
+
+Revision ID: c5e82f0d7a19
+Revises: a3d71c9e2b40
+Create Date: 2026-10-19 21:00:00.000000
+
+notifications и surveys становятся секционированными по месяцам (RANGE по
+времени уведомления и дате опроса). Данные копируются в новые таблицы в одной
+транзакции, таблицы на это время заблокированы - миграцию выполнять при
+остановленных API и боте. Дальше секции создает и архивирует
+app.services.partitions.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e82f0d7a19'
+down_revision: Union[str, None] = 'a3d71c9e2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Секции на столько месяцев вперед (дальше - фоновая задача)
+PREMAKE_MONTHS = 3
+
+
+def _surveys_columns():
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('surveys_id_seq'::regclass)"), nullable=False),
+        sa.Column('date', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False, comment='Оценка от 0 до 10'),
+        sa.Column('user_answer', sa.Text(), nullable=True),
+        sa.Column('symptom_id', sa.Integer(), nullable=False),
+        sa.CheckConstraint('value >= 0 AND value <= 10', name='check_survey_value_range'),
+        sa.ForeignKeyConstraint(['symptom_id'], ['symptoms.id'], ondelete='CASCADE'),
+    ]
+
+
+def _notifications_columns():
+    return [
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('notifications_id_seq'::regclass)"), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False, comment='appointment, prescription, test, reminder, alert'),
+        sa.Column('time', sa.DateTime(timezone=True), nullable=False, comment='Время отправки уведомления'),
+        sa.Column('title', sa.String(length=128), nullable=False),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('is_read', sa.Boolean(), server_default='false', nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('medical_entity_id', sa.Integer(), nullable=True, comment='ID связанной сущности (appointment/prescription/test; reminder - symptom)'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint("type IN ('appointment', 'prescription', 'test', 'reminder', 'alert')", name='check_notification_type'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    ]
+
+
+SURVEYS_COLUMNS = 'id, date, value, user_answer, symptom_id'
+NOTIFICATIONS_COLUMNS = 'id, type, time, title, message, is_read, user_id, medical_entity_id, created_at'
+
+
+def _rename_legacy(table: str, indexes: Sequence[str]) -> None:
+    # Имена индексов общие для схемы - освобождаем их для новой таблицы
+    op.rename_table(table, f'{table}_legacy')
+    op.execute(f'ALTER TABLE {table}_legacy RENAME CONSTRAINT {table}_pkey TO {table}_legacy_pkey')
+    for index in indexes:
+        op.execute(f'ALTER INDEX {index} RENAME TO {index}_legacy')
+
+
+def _create_month_partitions(table: str, key: str) -> None:
+    # С месяца самой ранней строки до PREMAKE_MONTHS вперед; остальное - в секцию по умолчанию
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date := date_trunc('month', LEAST((SELECT min({key}) FROM {table}_legacy), now()) AT TIME ZONE 'UTC')::date;
+            last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{PREMAKE_MONTHS} months')::date;
+        BEGIN
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_p' || to_char(month, 'YYYYMM'),
+                    month::timestamp AT TIME ZONE 'UTC',
+                    (month + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+
+def _move_rows(source: str, target: str, columns: str, sequence: str) -> None:
+    op.execute(f'INSERT INTO {target} ({columns}) SELECT {columns} FROM {source}')
+    # Последовательность id принадлежит старой таблице и удалилась бы вместе с ней
+    op.execute(f'ALTER SEQUENCE {sequence} OWNED BY {target}.id')
+    op.drop_table(source)
+
+
+def upgrade() -> None:
+    _rename_legacy('surveys', ['idx_surveys_symptom_id_date', 'ix_surveys_id'])
+    op.create_table('surveys',
+    *_surveys_columns(),
+    sa.PrimaryKeyConstraint('id', 'date'),
+    postgresql_partition_by='RANGE (date)'
+    )
+    op.create_index('idx_surveys_symptom_id_date', 'surveys', ['symptom_id', 'date'], unique=False, postgresql_include=['value'])
+    _create_month_partitions('surveys', 'date')
+    _move_rows('surveys_legacy', 'surveys', SURVEYS_COLUMNS, 'surveys_id_seq')
+
+    _rename_legacy('notifications', ['idx_notifications_user_id', 'ix_notifications_id', 'idx_notifications_prescription_time'])
+    op.create_table('notifications',
+    *_notifications_columns(),
+    sa.PrimaryKeyConstraint('id', 'time'),
+    postgresql_partition_by='RANGE (time)'
+    )
+    op.create_index('idx_notifications_user_id', 'notifications', ['user_id'], unique=False)
+    op.create_index(
+        'idx_notifications_prescription_time', 'notifications', ['time'], unique=False,
+        postgresql_where=sa.text("type = 'prescription'")
+    )
+    _create_month_partitions('notifications', 'time')
+    _move_rows('notifications_legacy', 'notifications', NOTIFICATIONS_COLUMNS, 'notifications_id_seq')
+
+    # Отсоединенные старые секции (app.services.partitions)
+    op.execute('CREATE SCHEMA IF NOT EXISTS archive')
+
+
+def downgrade() -> None:
+    # Архивные секции остаются в схеме archive и обратно не переносятся
+    op.create_table('notifications_legacy',
+    *_notifications_columns(),
+    sa.PrimaryKeyConstraint('id', name='notifications_legacy_pkey')
+    )
+    _move_rows('notifications', 'notifications_legacy', NOTIFICATIONS_COLUMNS, 'notifications_id_seq')
+    op.rename_table('notifications_legacy', 'notifications')
+    op.execute('ALTER TABLE notifications RENAME CONSTRAINT notifications_legacy_pkey TO notifications_pkey')
+    op.create_index('idx_notifications_user_id', 'notifications', ['user_id'], unique=False)
+    op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
+    op.create_index(
+        'idx_notifications_prescription_time', 'notifications', ['time'], unique=False,
+        postgresql_where=sa.text("type = 'prescription'")
+    )
+
+    op.create_table('surveys_legacy',
+    *_surveys_columns(),
+    sa.PrimaryKeyConstraint('id', name='surveys_legacy_pkey')
+    )
+    _move_rows('surveys', 'surveys_legacy', SURVEYS_COLUMNS, 'surveys_id_seq')
+    op.rename_table('surveys_legacy', 'surveys')
+    op.execute('ALTER TABLE surveys RENAME CONSTRAINT surveys_legacy_pkey TO surveys_pkey')
+    op.create_index('idx_surveys_symptom_id_date', 'surveys', ['symptom_id', 'date'], unique=False, postgresql_include=['value'])
+    op.create_index(op.f('ix_surveys_id'), 'surveys', ['id'], unique=False)
@@ -0,0 +1,43 @@
+"""add_symptoms_next_survey_at
+
+Revision ID: d81b4e6f3c20
+Revises: c5e82f0d7a19
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_helpers import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81b4e6f3c20'
+down_revision: Union[str, None] = 'c5e82f0d7a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # now() вычисляется один раз - столбец добавляется без перезаписи таблицы,
+    # все существующие симптомы сразу попадают к планировщику опросов
+    op.add_column('symptoms', sa.Column(
+        'next_survey_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True,
+        comment='Когда спросить об оценке симптома (NULL - план завершен)'
+    ))
+    # Напоминания об опросе ссылаются на симптом
+    op.alter_column(
+        'notifications', 'medical_entity_id', existing_type=sa.Integer(), existing_nullable=True,
+        comment='ID связанной сущности (appointment/prescription/test; reminder - symptom)',
+        existing_comment='ID связанной сущности (appointment/prescription/test)'
+    )
+    with op.get_context().autocommit_block():
+        create_index_concurrently('idx_symptoms_next_survey_at', 'ON symptoms (next_survey_at)')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_symptoms_next_survey_at')
+    op.drop_column('symptoms', 'next_survey_at')
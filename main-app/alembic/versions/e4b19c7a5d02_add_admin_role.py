@@ -0,0 +1,41 @@
+"""add_admin_role
+
+Revision ID: e4b19c7a5d02
+Revises: d81b4e6f3c20
+Create Date: 2026-10-20 00:00:00.000000
+
+Роль admin нужна для /api/v1/admin/*. Назначается вручную:
+UPDATE users SET role_id = (SELECT id FROM roles WHERE type = 'admin')
+WHERE external_id = '<Telegram ID>';
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b19c7a5d02'
+down_revision: Union[str, None] = 'd81b4e6f3c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Новые пользователи получают role_id = 1 (app.api.v1.auth) - на чистой базе
+    # эта роль должна остаться обычной, а не стать администраторской
+    op.execute("INSERT INTO roles (id, type) VALUES (1, 'patient') ON CONFLICT DO NOTHING")
+    op.execute("""
+        INSERT INTO roles (id, type)
+        SELECT max(id) + 1, 'admin' FROM roles
+        HAVING NOT bool_or(type = 'admin')
+    """)
+    # id заданы явно - последовательность догоняет таблицу
+    op.execute("SELECT setval(pg_get_serial_sequence('roles', 'id'), (SELECT max(id) FROM roles))")
+
+
+def downgrade() -> None:
+    # Роль 1 оставляем: на нее ссылаются пользователи
+    op.execute("""
+        DELETE FROM roles
+        WHERE type = 'admin' AND NOT EXISTS (SELECT 1 FROM users WHERE users.role_id = roles.id)
+    """)
@@ -0,0 +1,33 @@
+"""add_surveys_symptom_date_index
+
+Revision ID: f9abc2be6611
+Revises: bfc14059c623
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_helpers import create_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9abc2be6611'
+down_revision: Union[str, None] = 'bfc14059c623'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (symptom_id, date) INCLUDE (value) - динамика симптомов читает только индекс;
+    # индекс по одному symptom_id становится лишним (его префикс)
+    with op.get_context().autocommit_block():
+        create_index_concurrently('idx_surveys_symptom_id_date', 'ON surveys (symptom_id, date) INCLUDE (value)')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_surveys_symptom_id')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_surveys_symptom_id ON surveys (symptom_id)')
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS idx_surveys_symptom_id_date')
@@ -1,14 +1,21 @@
 """
 Зависимости для FastAPI endpoints
 """
-from typing import AsyncGenerator
+from datetime import date, datetime, time, timedelta
+from typing import AsyncGenerator, NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from fastapi import Header, HTTPException, status, Depends
+from fastapi import Header, HTTPException, Path, Query, status, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import settings
 from app.core.database import get_db as get_db_session
-from app.models.user import User
+from app.models.user import Role, User
+from app.services.atc import atc_level
+
+# Тип роли администратора (таблица roles)
+ADMIN_ROLE = "admin"
 
 # Экспортируем get_db для использования в роутах
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -72,4 +79,97 @@ async def get_current_user(
             detail="User not authorized. Please complete Yandex ID authorization."
         )
     
-    return user
\ No newline at end of file
+    return user
+
+
+async def get_current_admin(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Зависимость для служебных эндпоинтов (профилирование и т.п.)
+
+    Returns:
+        User: Авторизованный пользователь с ролью администратора
+
+    Raises:
+        HTTPException: 403 если роль пользователя не ADMIN_ROLE
+    """
+    query = select(Role.type).where(Role.id == current_user.role_id)
+    role_type = (await db.execute(query)).scalar_one_or_none()
+
+    if role_type != ADMIN_ROLE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required."
+        )
+
+    return current_user
+
+
+def get_atc_code(code: str = Path(..., max_length=7, description="Код класса АТХ любого уровня (J, J01, J01C, J01CA, J01CA04)")) -> str:
+    """
+    Зависимость для endpoints по классу АТХ
+
+    Returns:
+        str: Код класса в верхнем регистре
+
+    Raises:
+        HTTPException: 400 если код не соответствует формату АТХ
+    """
+    code = code.strip().upper()
+    if not atc_level(code):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid ATC code: {code}"
+        )
+    return code
+
+
+class StatsPeriod(NamedTuple):
+    """Период статистики по дням в часовом поясе пациента"""
+    timezone: str
+    date_from: date
+    date_to: date  # Включительно
+    start: datetime  # Полночь date_from
+    end: datetime  # Полночь после date_to
+
+
+def get_stats_period(
+    date_from: Optional[date] = Query(None, description="Первый день периода (по умолчанию - SURVEY_STATS_DEFAULT_DAYS дней назад)"),
+    date_to: Optional[date] = Query(None, description="Последний день периода включительно (по умолчанию - сегодня)"),
+    tz: Optional[str] = Query(None, description="Часовой пояс пациента, например Europe/Moscow"),
+) -> StatsPeriod:
+    """
+    Зависимость для endpoints статистики по дням
+
+    Returns:
+        StatsPeriod: Период с границами в часовом поясе tz (по умолчанию SURVEY_STATS_TIMEZONE)
+
+    Raises:
+        HTTPException: 400 при неизвестном часовом поясе, перепутанных датах
+            или периоде длиннее SURVEY_STATS_MAX_DAYS
+    """
+    timezone = tz or settings.SURVEY_STATS_TIMEZONE
+    try:
+        zone = ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown timezone: {timezone}")
+
+    date_to = date_to or datetime.now(zone).date()
+    date_from = date_from or date_to - timedelta(days=settings.SURVEY_STATS_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from is after date_to")
+    if (date_to - date_from).days >= settings.SURVEY_STATS_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Period is longer than {settings.SURVEY_STATS_MAX_DAYS} days"
+        )
+
+    return StatsPeriod(
+        timezone=timezone,
+        date_from=date_from,
+        date_to=date_to,
+        start=datetime.combine(date_from, time.min, tzinfo=zone),
+        end=datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=zone),
+    )
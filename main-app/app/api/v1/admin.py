@@ -0,0 +1,73 @@
+"""
+Служебные API endpoints (только для администраторов)
+"""
+import asyncio
+import logging
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import get_current_admin
+from app.core.config import settings
+from app.models.user import User
+from app.services.profiler import ProfileMode, ProfilerBusyError, SamplingProfiler, cpu_mode_supported
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="Длительность профилирования"),
+    mode: ProfileMode = Query(ProfileMode.WALL, description="wall - все время, cpu - процессорное время"),
+    interval_ms: float = Query(5.0, ge=1, le=1000, description="Интервал между снимками стеков"),
+    include_tasks: bool = Query(True, description="Стеки ожидающих asyncio-задач (режим wall)"),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Профилирование процесса API, обработавшего запрос
+
+    Снимает стеки seconds секунд (не больше PROFILER_MAX_SECONDS) и отдает
+    файл в collapsed-формате для flamegraph.pl / speedscope:
+
+    ```bash
+    curl -H "X-Telegram-ID: ..." "$API/api/v1/admin/profile?seconds=30&mode=cpu" > api.collapsed
+    flamegraph.pl api.collapsed > api.svg
+    ```
+
+    При нескольких воркерах профилируется только один из них - тот,
+    которому балансировщик отдал запрос.
+
+    Raises:
+        HTTPException: 400 если cpu-режим недоступен, 409 если профилирование уже идет
+    """
+    if mode == ProfileMode.CPU and not cpu_mode_supported():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CPU mode is not supported on this platform"
+        )
+
+    duration = min(seconds, settings.PROFILER_MAX_SECONDS)
+    profiler = SamplingProfiler(
+        mode=mode,
+        interval=interval_ms / 1000,
+        loop=asyncio.get_running_loop(),
+        include_tasks=include_tasks
+    )
+
+    logger.info(f"Пользователь {current_user.id} запустил профилирование ({mode.value}, {duration} с)")
+    try:
+        await profiler.run(duration)
+    except ProfilerBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Profiling is already running in this worker"
+        )
+
+    filename = f"profile_{mode.value}_{datetime.now():%Y%m%d_%H%M%S}.collapsed"
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
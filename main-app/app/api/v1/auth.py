@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import httpx
+from functools import lru_cache
 from pathlib import Path
 
 from app.core.config import settings
@@ -14,7 +14,14 @@ router = APIRouter()
 
 # Настройка Jinja2 шаблонов
 templates_dir = Path(__file__).parent.parent.parent / "templates"
-templates = Jinja2Templates(directory=str(templates_dir))
+
+
+@lru_cache(maxsize=1)
+def get_templates():
+    """Шаблоны страниц авторизации (Jinja2 импортируется при первом входе, а не при старте API)"""
+    from fastapi.templating import Jinja2Templates
+
+    return Jinja2Templates(directory=str(templates_dir))
 
 
 @router.get("/auth/login")
@@ -132,7 +139,7 @@ async def yandex_callback(
         await db.refresh(user)
 
         # Return HTML template with redirect to Telegram bot
-        return templates.TemplateResponse(
+        return get_templates().TemplateResponse(
             "auth_success.html",
             {
                 "request": request,
@@ -172,7 +179,7 @@ async def yandex_callback(
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
         # Return HTML template with redirect to Telegram bot
-        return templates.TemplateResponse(
+        return get_templates().TemplateResponse(
             "auth_success.html",
             {
                 "request": request,
@@ -0,0 +1,110 @@
+"""
+API endpoints для справочника лекарственных препаратов
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.api.deps import get_atc_code, get_db, get_current_user
+from app.core.config import settings
+from app.crud.search import decode_cursor
+from app.models.user import User
+from app.services.medicine_resolver import medicine_resolver
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=schemas.MedicinSearchPage)
+async def search_medicins(
+    q: str = Query(..., min_length=2, max_length=100, description="Название препарата или его начало"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Поиск препаратов по торговому и международному названию
+
+    Нечеткий поиск по триграммам (pg_trgm): находит названия с опечатками
+    и по началу слова. Результаты упорядочены по похожести.
+
+    Args:
+        q: Поисковый запрос
+        limit: Размер страницы
+        cursor: Курсор следующей страницы из предыдущего ответа
+        db: Database session
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        Страница найденных препаратов и курсор следующей страницы
+    """
+    try:
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    rows, next_cursor = await crud.medicin.search(
+        db, query=q, limit=limit, cursor=page_cursor, min_score=settings.SEARCH_MIN_SIMILARITY
+    )
+    return schemas.MedicinSearchPage(
+        items=[
+            schemas.MedicinSearchResult(**schemas.MedicinRead.model_validate(medicin).model_dump(), score=round(score, 4))
+            for medicin, score in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/atc/{code}", response_model=schemas.AtcClassRead)
+async def get_atc_class(
+    atc_code: str = Depends(get_atc_code),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Класс АТХ: название, классы-предки и подклассы, представленные в справочнике
+
+    Данные берутся из дерева АТХ в памяти (строится вместе с индексом справочника).
+
+    Args:
+        atc_code: Код класса
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        Класс АТХ с путем от анатомической группы и подклассами
+    """
+    tree = medicine_resolver.atc_tree
+    node = tree.get(atc_code)
+    if node is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="ATC class not found in catalog")
+
+    return schemas.AtcClassRead(
+        **node.to_dict(),
+        path=[ancestor.to_dict() for ancestor in tree.path(atc_code)[:-1]],
+        children=[tree.nodes[child].to_dict() for child in node.children],
+    )
+
+
+@router.get("/atc/{code}/medicins", response_model=List[schemas.MedicinRead])
+async def get_atc_class_medicins(
+    atc_code: str = Depends(get_atc_code),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Препараты справочника из класса АТХ (включая все подклассы)
+
+    Args:
+        atc_code: Код класса
+        skip: Сколько препаратов пропустить
+        limit: Максимум препаратов
+        db: Database session
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        Препараты по коду АТХ
+    """
+    return await crud.medicin.get_by_atc_class(db, atc_code=atc_code, skip=skip, limit=limit)
@@ -2,20 +2,30 @@
 API endpoints для планов лечения
 """
 import os
+import asyncio
 import logging
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
-from app.api.deps import get_db, get_current_user
+from app.api.deps import StatsPeriod, get_db, get_current_user, get_stats_period
+from app.core.config import settings
+from app.core.logging_config import log_payload
+from app.core.stages import track_stage
+from app.crud.search import decode_cursor
 from app.models.user import User
-from app.services.pdf_processor import process_treatment_plan_pdf
-from app.services.gigachat_service import get_gigachat_service
-from app.prompts import load_treatment_plan_prompt
+from app.services.interactions import DrugItem, interaction_checker, load_active_prescriptions, plan_drug_items
+from app.services.medicine_resolver import medicine_resolver, resolve_medications
+from app.services.pdf_processor import process_treatment_plan_pdf_async
+from app.services.plan_export import export_plan_pdf
+from app.services.plan_extraction import ItemCallback, extract_plan_structure
+from app.services.response_parser import dump_json
+from app.services.survey_stats import build_symptom_stats
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -27,146 +37,143 @@ UPLOAD_DIR = Path("uploads/plans")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 
-@router.post("/load_plan_file", response_model=schemas.PlanFileUpload, status_code=status.HTTP_201_CREATED)
-async def load_plan_file(
-    file: UploadFile = File(..., description="PDF файл с планом лечения"),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Загрузить файл с планом лечения (PDF)
-
-    Args:
-        file: PDF файл с планом лечения
-        db: Database session
-        current_user: Текущий авторизованный пользователь (из middleware)
-
-    Returns:
-        Информация о загруженном файле и созданном плане
-    """
-    # Проверяем, что файл является PDF
+def _validate_pdf_upload(file: UploadFile) -> None:
+    """Проверка, что загружаемый файл является PDF"""
     if not file.content_type == "application/pdf":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only PDF files are allowed"
         )
 
+
+async def _save_plan_file(file: UploadFile, user_id: int) -> Path:
+    """
+    Сохранение загруженного файла плана на диск
+
+    Args:
+        file: Загруженный PDF файл
+        user_id: ID пользователя
+
+    Returns:
+        Путь к сохраненному файлу
+    """
     # Генерируем уникальное имя файла
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    file_name = f"plan_{current_user.id}_{timestamp}_{file.filename}"
+    file_name = f"plan_{user_id}_{timestamp}_{file.filename}"
     file_path = UPLOAD_DIR / file_name
 
     # Сохраняем файл
     try:
-        contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        with track_stage("upload"):
+            contents = await file.read()
+            with open(file_path, "wb") as f:
+                f.write(contents)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error saving file: {str(e)}"
         )
 
-    # Обрабатываем PDF-файл и извлекаем текст
+    return file_path
+
+
+async def _load_prescription_items(user_id: int) -> List[DrugItem]:
+    """Действующие назначения пациента (без них план проверяется только сам с собой)"""
+    try:
+        return await load_active_prescriptions(user_id)
+    except Exception as e:
+        logger.warning(f"Не удалось загрузить назначения для проверки взаимодействий: {e!r}")
+        return []
+
+
+async def _process_plan_file(
+    file_path: Path,
+    on_item: Optional[ItemCallback] = None,
+    user_id: Optional[int] = None
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Извлечение текста из PDF и структурированных данных плана
+
+    Args:
+        file_path: Путь к сохраненному PDF файлу
+        on_item: Обработчик элементов плана по мере их извлечения
+        user_id: ID пользователя - лекарства плана проверяются на взаимодействия
+            с его действующими назначениями (поле interactions результата)
+
+    Returns:
+        Кортеж (результат обработки PDF, структурированные данные или None)
+    """
+    prescriptions_task = None
+    if user_id is not None and settings.INTERACTION_CHECK_ENABLED:
+        # Назначения загружаются из БД параллельно с разбором PDF и запросом к LLM
+        prescriptions_task = asyncio.create_task(_load_prescription_items(user_id))
+    try:
+        return await _extract_plan(file_path, on_item, prescriptions_task)
+    finally:
+        if prescriptions_task is not None and not prescriptions_task.done():
+            prescriptions_task.cancel()
+
+
+async def _extract_plan(
+    file_path: Path,
+    on_item: Optional[ItemCallback],
+    prescriptions_task: Optional["asyncio.Task[List[DrugItem]]"]
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Разбор PDF, извлечение плана, сопоставление со справочником и проверка взаимодействий"""
     logger.info(f"Начало обработки PDF-файла: {file_path}")
-    pdf_result = process_treatment_plan_pdf(str(file_path))
+    with track_stage("parse"):
+        pdf_result = await process_treatment_plan_pdf_async(str(file_path))
 
     logger.info(f"Статус обработки PDF: {pdf_result['status']}")
     logger.info(f"Сообщение: {pdf_result['message']}")
 
+    parsed_response = None
     if pdf_result['status'] == 'success':
         logger.info(f"Тип PDF: {pdf_result['data'].get('pdf_type')}")
         logger.info(f"Количество символов в тексте: {pdf_result['data'].get('text_length')}")
         logger.info(f"Метаданные: {pdf_result['data'].get('metadata')}")
-        logger.info(f"Извлеченный текст:\n{pdf_result['data'].get('text')}")
+        log_payload(logger, "Извлеченный текст", pdf_result['data'].get('text'))
 
-        # Извлекаем структурированную информацию с помощью GigaChat
-        extracted_text = pdf_result['data'].get('text')
+        async def on_plan_item(section: str, item: Dict[str, Any]) -> None:
+            # Лекарство отдается клиенту уже со ссылкой на справочник
+            if section == "medications":
+                medicine_resolver.annotate_medication(item)
+            await on_item(section, item)
 
-        try:
-            logger.info("=" * 80)
-            logger.info("Начало извлечения структурированной информации с помощью GigaChat")
-            logger.info("=" * 80)
-
-            # Загружаем промпт
-            system_prompt, user_prompt, llm_params = load_treatment_plan_prompt(extracted_text)
-
-            logger.info(f"Системный промпт загружен (длина: {len(system_prompt)} символов)")
-            logger.info(f"Пользовательский промпт сформирован (длина: {len(user_prompt)} символов)")
-            logger.info(f"Параметры LLM: {llm_params}")
-
-            # Инициализируем GigaChat и отправляем запрос
-            with get_gigachat_service() as giga:
-                logger.info("GigaChat сервис инициализирован")
-
-                # Формируем сообщения
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ]
-
-                logger.info("Отправка запроса к GigaChat API...")
-
-                # Отправляем запрос
-                gigachat_response = giga.chat(
-                    messages=messages,
-                    temperature=llm_params.get('temperature', 0.1),
-                    max_tokens=llm_params.get('max_tokens', 2000),
-                    top_p=llm_params.get('top_p', 0.95)
-                )
-
-                logger.info("=" * 80)
-                logger.info("ОТВЕТ ОТ GIGACHAT:")
-                logger.info("=" * 80)
-                logger.info(gigachat_response)
-                logger.info("=" * 80)
-                logger.info(f"Длина ответа: {len(gigachat_response)} символов")
-
-                # Попытка распарсить JSON
-                import json
-                try:
-                    # Очищаем ответ от markdown если есть
-                    cleaned_response = gigachat_response.strip()
-                    if cleaned_response.startswith("```json"):
-                        cleaned_response = cleaned_response[7:]
-                    if cleaned_response.startswith("```"):
-                        cleaned_response = cleaned_response[3:]
-                    if cleaned_response.endswith("```"):
-                        cleaned_response = cleaned_response[:-3]
-                    cleaned_response = cleaned_response.strip()
-
-                    parsed_response = json.loads(cleaned_response)
-                    logger.info("=" * 80)
-                    logger.info("СТРУКТУРИРОВАННЫЕ ДАННЫЕ:")
-                    logger.info("=" * 80)
-                    logger.info(json.dumps(parsed_response, indent=2, ensure_ascii=False))
-                    logger.info("=" * 80)
-
-                    # Логируем ключевые данные
-                    if 'doctor' in parsed_response:
-                        logger.info(f"Врач: {parsed_response['doctor']}")
-                    if 'symptoms' in parsed_response:
-                        logger.info(f"Симптомов: {len(parsed_response['symptoms'])}")
-                    if 'medications' in parsed_response:
-                        logger.info(f"Лекарств назначено: {len(parsed_response['medications'])}")
-                    if 'examinations' in parsed_response:
-                        logger.info(f"Обследований: {len(parsed_response['examinations'])}")
-                    if 'referrals' in parsed_response:
-                        logger.info(f"Направлений к врачам: {len(parsed_response['referrals'])}")
-
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Не удалось распарсить ответ как JSON: {e}")
-                    logger.warning("Ответ будет обработан как текст")
-
-        except Exception as e:
-            logger.error(f"Ошибка при работе с GigaChat: {e}", exc_info=True)
-            logger.warning("Продолжаем без извлечения структурированной информации")
+        parsed_response = await extract_plan_structure(
+            pdf_result['data'].get('text'),
+            on_item=on_plan_item if on_item is not None else None
+        )
+        if parsed_response is not None:
+            with track_stage("medicine_match"):
+                medications = parsed_response.get('medications') or []
+                matched = resolve_medications(medications)
+            logger.info(f"Лекарств найдено в справочнике: {matched} из {len(medications)}")
+
+            if prescriptions_task is not None:
+                prescription_items = await prescriptions_task
+                with track_stage("interaction_check"):
+                    warnings = interaction_checker.check(plan_drug_items(medications) + prescription_items)
+                parsed_response['interactions'] = warnings
+                if warnings:
+                    logger.info(f"Предупреждений о взаимодействиях и дублировании: {len(warnings)}")
 
     elif pdf_result['status'] == 'error':
         logger.warning(f"Ошибка обработки PDF: {pdf_result['message']}")
         if 'data' in pdf_result:
             logger.info(f"Дополнительные данные: {pdf_result['data']}")
 
+    return pdf_result, parsed_response
+
+
+def _build_plan_upload(
+    file: UploadFile,
+    file_path: Path,
+    user_id: int,
+    pdf_result: Dict[str, Any],
+    parsed_response: Optional[Dict[str, Any]] = None
+) -> schemas.PlanFileUpload:
+    """Формирование ответа о загруженном плане"""
     # Создаем запись плана в базе данных с автоматически сгенерированными данными
     today = datetime.now().date()
 
@@ -184,7 +191,7 @@ async def load_plan_file(
         share_with_doctor=False,
         original_file_path=str(file_path),  # Сохраняем путь к оригинальному файлу
         doctor_id=1,  # Дефолтный врач (TODO: можно сделать настройку)
-        user_id=current_user.id
+        user_id=user_id
     )
 
     # временно закомментил, надо бд поправить
@@ -195,7 +202,99 @@ async def load_plan_file(
         id=1, #plan.id,
         title=title, #plan.title,
         file_path=str(file_path),
-        message=str(pdf_result['data'])
+        message=str(pdf_result['data']),
+        interactions=(parsed_response or {}).get('interactions') or []
+    )
+
+
+@router.post("/load_plan_file", response_model=schemas.PlanFileUpload, status_code=status.HTTP_201_CREATED)
+async def load_plan_file(
+    file: UploadFile = File(..., description="PDF файл с планом лечения"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Загрузить файл с планом лечения (PDF)
+
+    Args:
+        file: PDF файл с планом лечения
+        db: Database session
+        current_user: Текущий авторизованный пользователь (из middleware)
+
+    Returns:
+        Информация о загруженном файле и созданном плане
+    """
+    _validate_pdf_upload(file)
+    file_path = await _save_plan_file(file, current_user.id)
+
+    pdf_result, parsed_response = await _process_plan_file(file_path, user_id=current_user.id)
+
+    return _build_plan_upload(file, file_path, current_user.id, pdf_result, parsed_response)
+
+
+@router.post("/load_plan_file/stream", status_code=status.HTTP_201_CREATED)
+async def load_plan_file_stream(
+    file: UploadFile = File(..., description="PDF файл с планом лечения"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Загрузить файл с планом лечения (PDF) с потоковой выдачей результата
+
+    Ответ - NDJSON, по одному событию на строку:
+    {"event": "status", "stage": ..., "message": ...} - этапы обработки;
+    {"event": "item", "section": ..., "data": ...} - элемент плана
+    (лекарство, обследование, направление, симптом) сразу после извлечения;
+    лекарства дополнены полями medicin_id и medicin_match (препарат справочника);
+    {"event": "result", "data": PlanFileUpload} - итог загрузки (в interactions -
+    предупреждения о взаимодействиях с действующими назначениями);
+    {"event": "error", "detail": ...} - ошибка обработки.
+
+    Args:
+        file: PDF файл с планом лечения
+        current_user: Текущий авторизованный пользователь (из middleware)
+
+    Returns:
+        Поток событий обработки плана
+    """
+    _validate_pdf_upload(file)
+    # Файл сохраняется до начала ответа: после возврата UploadFile закрывается
+    file_path = await _save_plan_file(file, current_user.id)
+    user_id = current_user.id
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_item(section: str, item: Dict[str, Any]) -> None:
+        await queue.put({"event": "item", "section": section, "data": item})
+
+    async def run_pipeline() -> None:
+        try:
+            await queue.put({"event": "status", "stage": "processing", "message": "Обработка PDF"})
+            pdf_result, parsed_response = await _process_plan_file(file_path, on_item=on_item, user_id=user_id)
+            upload = _build_plan_upload(file, file_path, user_id, pdf_result, parsed_response)
+            await queue.put({"event": "result", "data": upload.model_dump()})
+        except Exception as e:
+            logger.error(f"Ошибка потоковой обработки плана {file_path}: {e}", exc_info=True)
+            await queue.put({"event": "error", "detail": str(e)})
+        finally:
+            await queue.put(None)
+
+    async def events() -> AsyncIterator[str]:
+        task = asyncio.create_task(run_pipeline())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield dump_json(event) + "\n"
+        finally:
+            # Клиент отключился - обработку не продолжаем
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        events(),
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/x-ndjson"
     )
 
 
@@ -224,6 +323,52 @@ async def get_all_plans(
     return plans
 
 
+@router.get("/search", response_model=schemas.PlanSearchPage)
+async def search_plans(
+    q: str = Query(..., min_length=2, max_length=100, description="Текст для поиска в названии и описании"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Поиск по планам лечения текущего пользователя
+
+    Нечеткий поиск по триграммам (pg_trgm) в названии и описании плана,
+    совпадения в названии ранжируются выше.
+
+    Args:
+        q: Поисковый запрос
+        limit: Размер страницы
+        cursor: Курсор следующей страницы из предыдущего ответа
+        db: Database session
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        Страница найденных планов и курсор следующей страницы
+    """
+    try:
+        page_cursor = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    rows, next_cursor = await crud.plan.search(
+        db,
+        user_id=current_user.id,
+        query=q,
+        limit=limit,
+        cursor=page_cursor,
+        min_score=settings.SEARCH_MIN_SIMILARITY
+    )
+    return schemas.PlanSearchPage(
+        items=[
+            schemas.PlanSearchResult(**schemas.PlanRead.model_validate(plan).model_dump(), score=round(score, 4))
+            for plan, score in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/get_one/{plan_id}", response_model=schemas.PlanRead)
 async def get_one_plan(
     plan_id: int,
@@ -251,4 +396,105 @@ async def get_one_plan(
             detail="Plan not found or you don't have access to it"
         )
 
-    return plan
\ No newline at end of file
+    return plan
+
+
+@router.get("/{plan_id}/symptoms/stats", response_model=schemas.PlanSymptomStats)
+async def get_plan_symptom_stats(
+    plan_id: int,
+    bucket: Literal["day", "week"] = Query("day", description="Интервал агрегации"),
+    period: StatsPeriod = Depends(get_stats_period),
+    smooth: int = Query(0, ge=0, le=30, description="Окно скользящего среднего в интервалах (0 - без сглаживания)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Динамика симптомов плана лечения по опросам
+
+    По каждому симптому - min / avg / max оценок за день или неделю,
+    изменение среднего и наклон тренда (баллов в день). Все считается
+    одним запросом к БД, без выгрузки отдельных ответов; в часовом поясе
+    SURVEY_STATS_TIMEZONE - по дневным агрегатам и еще не агрегированным опросам.
+
+    Args:
+        plan_id: ID плана лечения
+        bucket: Интервал агрегации (day, week)
+        period: Период и часовой пояс для границ дней (date_from, date_to, tz)
+        smooth: Окно скользящего среднего
+        db: Database session
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        Динамика симптомов по интервалам
+    """
+    rows = await crud.survey.get_plan_stats(
+        db,
+        user_id=current_user.id,
+        plan_id=plan_id,
+        date_from=period.start,
+        date_to=period.end,
+        bucket=bucket,
+        timezone=period.timezone,
+    )
+    # Пустой результат - нет опросов за период или чужой план: различаем только здесь
+    if not rows and not await crud.plan.get_user_plan(db, user_id=current_user.id, plan_id=plan_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plan not found or you don't have access to it"
+        )
+
+    return schemas.PlanSymptomStats(
+        plan_id=plan_id,
+        bucket=bucket,
+        timezone=period.timezone,
+        date_from=period.date_from,
+        date_to=period.date_to,
+        symptoms=build_symptom_stats(rows, smooth=smooth),
+    )
+
+
+@router.get("/{plan_id}/export.pdf", response_class=FileResponse)
+async def export_plan(
+    plan_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Скачать план лечения в формате PDF
+
+    PDF рендерится в пуле процессов и кэшируется на диске по версии
+    содержимого плана, повторные скачивания отдаются из кэша.
+    Поддерживаются Range-запросы.
+
+    Args:
+        plan_id: ID плана лечения
+        db: Database session
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        PDF-файл с планом лечения
+    """
+    plan = await crud.plan.get_user_plan_with_details(
+        db, user_id=current_user.id, plan_id=plan_id
+    )
+
+    if not plan:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Plan not found or you don't have access to it"
+        )
+
+    try:
+        pdf_path = await export_plan_pdf(plan)
+    except Exception as e:
+        logger.error(f"Ошибка при генерации PDF плана {plan_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error rendering PDF: {str(e)}"
+        )
+
+    return FileResponse(
+        pdf_path,
+        media_type="application/pdf",
+        filename=f"plan_{plan_id}.pdf",
+    )
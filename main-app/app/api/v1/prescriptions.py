@@ -0,0 +1,130 @@
+"""
+API endpoints для назначений пациента
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.api.deps import StatsPeriod, get_atc_code, get_db, get_current_user, get_stats_period
+from app.models.user import User
+from app.schemas.prescription import PrescriptionStatus
+from app.services.medicine_resolver import medicine_resolver
+
+router = APIRouter()
+
+
+@router.get("/atc/{code}", response_model=List[schemas.PrescriptionWithMedicin])
+async def get_prescriptions_in_atc_class(
+    atc_code: str = Depends(get_atc_code),
+    prescription_status: Optional[List[PrescriptionStatus]] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Назначения текущего пользователя по всем планам из класса АТХ
+
+    Например, /prescriptions/atc/J01?status=active - все действующие
+    назначения антибактериальных препаратов.
+
+    Args:
+        atc_code: Код класса любого уровня
+        prescription_status: Статусы назначений (по умолчанию - все)
+        db: Database session
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        Назначения с препаратами справочника
+    """
+    return await crud.prescription.get_user_prescriptions_in_class(
+        db, user_id=current_user.id, atc_code=atc_code, statuses=prescription_status
+    )
+
+
+@router.get("/atc-overlaps", response_model=List[schemas.AtcClassOverlap])
+async def get_atc_class_overlaps(
+    level: int = Query(4, ge=1, le=5, description="Уровень класса АТХ: 4 - химическая группа, 5 - вещество"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Классы АТХ, в которых у пользователя несколько разных действующих назначений
+
+    Используется для проверки дублирующей терапии (препараты одной группы
+    из разных планов лечения).
+
+    Args:
+        level: Уровень классов АТХ
+        db: Database session
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        Классы с препаратами и назначениями
+    """
+    rows = await crud.prescription.get_user_class_overlaps(db, user_id=current_user.id, level=level)
+    tree = medicine_resolver.atc_tree
+    overlaps = []
+    for row in rows:
+        node = tree.get(row.atc_class)
+        overlaps.append(schemas.AtcClassOverlap(
+            atc_class=schemas.AtcClassBrief(
+                code=row.atc_class, level=level, name=node.name if node else None
+            ),
+            medicin_ids=sorted(row.medicin_ids),
+            prescription_ids=sorted(row.prescription_ids),
+        ))
+    return overlaps
+
+
+@router.get("/{prescription_id}/adherence", response_model=schemas.PrescriptionAdherence)
+async def get_prescription_adherence(
+    prescription_id: int,
+    period: StatsPeriod = Depends(get_stats_period),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Соблюдение назначения: отправленные и прочитанные напоминания о приеме по дням
+
+    Читается из дневных агрегатов и еще не агрегированных напоминаний,
+    без просмотра всех уведомлений пользователя.
+
+    Args:
+        prescription_id: ID назначения
+        period: Период и часовой пояс для границ дней (date_from, date_to, tz)
+        db: Database session
+        current_user: Текущий авторизованный пользователь
+
+    Returns:
+        Итоги за период и дни с напоминаниями
+    """
+    rows = await crud.prescription.get_adherence(
+        db,
+        user_id=current_user.id,
+        prescription_id=prescription_id,
+        date_from=period.start,
+        date_to=period.end,
+        timezone=period.timezone,
+    )
+    # Пустой результат - нет напоминаний за период или чужое назначение: различаем только здесь
+    if not rows and not await crud.prescription.get_user_prescription(
+        db, user_id=current_user.id, prescription_id=prescription_id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Prescription not found or you don't have access to it"
+        )
+
+    sent = sum(row.sent for row in rows)
+    read = sum(row.read for row in rows)
+    return schemas.PrescriptionAdherence(
+        prescription_id=prescription_id,
+        timezone=period.timezone,
+        date_from=period.date_from,
+        date_to=period.date_to,
+        sent=sent,
+        read=read,
+        rate=round(read / sent, 4) if sent else None,
+        days=[schemas.AdherenceDay(day=row.day, sent=row.sent, read=row.read) for row in rows],
+    )
@@ -0,0 +1,3 @@
+"""
+Команды обслуживания, запускаются из main-app/: python -m app.commands.<команда>
+"""
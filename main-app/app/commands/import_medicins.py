@@ -0,0 +1,487 @@
+"""
+Загрузка справочника препаратов medicins из выгрузки госреестра (CSV или XML)
+
+Файл читается потоком, строки нормализуются и порциями загружаются через
+COPY (asyncpg copy_records_to_table) во временную таблицу, после чего
+справочник обновляется одним набором запросов в транзакции: измененные
+строки обновляются, новые добавляются, с --prune удаляются строки, которых
+нет в выгрузке и на которые не ссылаются назначения. Строка справочника
+определяется тройкой (name, international_name, form).
+
+Запуск (из main-app/):
+    python -m app.commands.import_medicins registry.csv
+    python -m app.commands.import_medicins registry.csv --encoding cp1251 --delimiter ";"
+    python -m app.commands.import_medicins registry.xml --record-tag Drug --prune
+
+    # Проверить разбор и посчитать изменения без записи в БД
+    python -m app.commands.import_medicins registry.csv --dry-run
+
+Запущенный API подхватывает изменения при фоновом обновлении индекса
+справочника: новые строки - через MEDICINE_INDEX_REFRESH_SECONDS,
+изменения и удаления - при полной перезагрузке (MEDICINE_INDEX_RELOAD_SECONDS).
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import itertools
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import asyncpg
+
+from app.core.config import settings
+from app.services.atc import ANATOMICAL_GROUPS, atc_level
+
+FIELDS = ("name", "international_name", "form", "atc_code", "instruction")
+
+# Длины колонок medicins (app.models.medicin)
+MAX_LENGTHS = {"name": 255, "international_name": 255, "form": 100, "atc_code": 20}
+
+# Заголовки колонок CSV / теги XML выгрузок реестра -> поле справочника
+FIELD_ALIASES = {
+    "name": (
+        "name", "trade_name", "tradename", "торговое наименование",
+        "торговое наименование лекарственного препарата", "наименование",
+    ),
+    "international_name": (
+        "international_name", "inn", "mnn", "мнн",
+        "международное непатентованное наименование",
+        "международное непатентованное или химическое наименование",
+    ),
+    "form": (
+        "form", "dosage_form", "лекарственная форма", "форма выпуска",
+        "лекарственная форма, дозировка, упаковка",
+    ),
+    "atc_code": ("atc_code", "atc", "атх", "код атх", "атх код", "анатомо-терапевтическо-химическая классификация"),
+    "instruction": ("instruction", "инструкция", "инструкция по применению", "показания"),
+}
+
+# В реестре бывает несколько кодов АТХ через запятую
+ATC_SEPARATORS_RE = re.compile(r"[,;]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+CSV_DELIMITERS = ",;\t|"
+SNIFF_BYTES = 64 * 1024
+MAX_FIELD_SIZE = 64 * 1024 * 1024
+
+# Ключ строки справочника
+KEY_COLUMNS = "name, international_name, form"
+
+
+class RegistryFormatError(Exception):
+    """Ошибка формата файла выгрузки"""
+
+
+def _header_key(header: str) -> str:
+    return WHITESPACE_RE.sub(" ", header.replace("\ufeff", "")).strip().lower()
+
+
+def resolve_columns(headers: List[str], overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Сопоставить колонки файла полям справочника
+
+    Args:
+        headers: Заголовки CSV или теги полей XML
+        overrides: Явное сопоставление поле -> заголовок (--column)
+
+    Returns:
+        Поле справочника -> заголовок в файле
+
+    Raises:
+        RegistryFormatError: В файле нет колонки с торговым названием
+
+    Example:
+        >>> resolve_columns(["Торговое наименование", "МНН", "Код АТХ"])
+        {'name': 'Торговое наименование', 'international_name': 'МНН', 'atc_code': 'Код АТХ'}
+    """
+    by_key = {_header_key(header): header for header in headers}
+    columns = {}
+    for field in FIELDS:
+        if overrides and field in overrides:
+            header = by_key.get(_header_key(overrides[field]))
+            if header is None:
+                raise RegistryFormatError(f"Колонка {overrides[field]!r} для поля {field} не найдена в файле")
+            columns[field] = header
+            continue
+        for alias in FIELD_ALIASES[field]:
+            if alias in by_key:
+                columns[field] = by_key[alias]
+                break
+    if "name" not in columns:
+        raise RegistryFormatError(
+            f"Не найдена колонка торгового названия среди {headers}; укажите ее через --column name=<заголовок>"
+        )
+    return columns
+
+
+def _clean(value: Optional[str], max_length: Optional[int] = None) -> str:
+    if not value:
+        return ""
+    value = WHITESPACE_RE.sub(" ", value).strip()
+    return value[:max_length] if max_length else value
+
+
+def _clean_instruction(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    # В инструкции сохраняем абзацы, схлопываем пробелы внутри строк
+    lines = (WHITESPACE_RE.sub(" ", line).strip() for line in value.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def normalize_atc_code(value: Optional[str]) -> str:
+    """
+    Первый корректный код АТХ любого уровня (A, A02, ..., A02BC01) из поля реестра
+
+    Example:
+        >>> normalize_atc_code(" j01cr02, J01CA04")
+        'J01CR02'
+    """
+    if not value:
+        return ""
+    for part in ATC_SEPARATORS_RE.split(value.upper()):
+        code = WHITESPACE_RE.sub("", part)
+        if atc_level(code) and code[0] in ANATOMICAL_GROUPS:
+            return code
+    return ""
+
+
+def normalize_record(raw: Dict[str, Optional[str]], columns: Dict[str, str]) -> Optional[Tuple[str, str, str, str, str]]:
+    """
+    Строка справочника из записи файла
+
+    Args:
+        raw: Запись файла (заголовок -> значение)
+        columns: Сопоставление колонок (resolve_columns)
+
+    Returns:
+        (name, international_name, form, atc_code, instruction) или None,
+        если в записи нет торгового названия
+    """
+    name = _clean(raw.get(columns["name"]), MAX_LENGTHS["name"])
+    if not name:
+        return None
+    international_name = _clean(raw.get(columns.get("international_name", "")), MAX_LENGTHS["international_name"])
+    return (
+        name,
+        # Колонки справочника NOT NULL: без МНН препарат ищется по торговому названию
+        international_name or name,
+        _clean(raw.get(columns.get("form", "")), MAX_LENGTHS["form"]),
+        normalize_atc_code(raw.get(columns.get("atc_code", ""))),
+        _clean_instruction(raw.get(columns.get("instruction", ""))),
+    )
+
+
+def _sniff_delimiter(source: BinaryIO, encoding: str) -> str:
+    sample = source.read(SNIFF_BYTES)
+    source.seek(0)
+    text = sample.decode(encoding, errors="ignore")
+    try:
+        return csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        return ","
+
+
+def read_csv(
+    source: BinaryIO,
+    encoding: str = "utf-8-sig",
+    delimiter: Optional[str] = None,
+    overrides: Optional[Dict[str, str]] = None
+) -> Iterator[Tuple[str, str, str, str, str]]:
+    """
+    Строки справочника из CSV (потоком, без загрузки файла в память)
+
+    Args:
+        source: Файл, открытый в двоичном режиме
+        encoding: Кодировка (выгрузки реестра часто в cp1251)
+        delimiter: Разделитель (по умолчанию определяется по заголовку)
+        overrides: Явное сопоставление колонок (--column)
+    """
+    delimiter = delimiter or _sniff_delimiter(source, encoding)
+    # Тексты инструкций длиннее стандартного лимита поля csv (128 КБ)
+    csv.field_size_limit(MAX_FIELD_SIZE)
+    text = io.TextIOWrapper(source, encoding=encoding, newline="")
+    try:
+        reader = csv.reader(text, delimiter=delimiter)
+        headers = next(reader, None)
+        if not headers:
+            raise RegistryFormatError("Пустой CSV файл")
+        columns = resolve_columns(headers, overrides)
+        for values in reader:
+            record = normalize_record(dict(zip(headers, values)), columns)
+            if record is not None:
+                yield record
+    finally:
+        # Иначе обертка закроет исходный файл, а он еще нужен для вывода прогресса
+        text.detach()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def read_xml(
+    source: BinaryIO,
+    record_tag: str,
+    overrides: Optional[Dict[str, str]] = None
+) -> Iterator[Tuple[str, str, str, str, str]]:
+    """
+    Строки справочника из XML (потоком через iterparse)
+
+    Поля записи - дочерние элементы и атрибуты элемента record_tag.
+
+    Args:
+        source: Файл, открытый в двоичном режиме
+        record_tag: Тег записи о препарате (без пространства имен)
+        overrides: Явное сопоставление полей (--column)
+    """
+    columns = None
+    parents: List[ET.Element] = []
+    for event, element in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        if _local_name(element.tag) != record_tag:
+            continue
+
+        raw = {_local_name(key): value for key, value in element.attrib.items()}
+        for child in element:
+            raw[_local_name(child.tag)] = "".join(child.itertext())
+        # Разобранная запись больше не нужна - не держим дерево в памяти
+        if parents:
+            parents[-1].remove(element)
+        if columns is None:
+            columns = resolve_columns(list(raw), overrides)
+        record = normalize_record(raw, columns)
+        if record is not None:
+            yield record
+
+
+class Progress:
+    """Вывод хода загрузки: строки, скорость, доля прочитанного файла"""
+
+    def __init__(self, source: BinaryIO, interval: float = 1.0):
+        self.source = source
+        self.size = os.fstat(source.fileno()).st_size
+        self.interval = interval
+        self.started_at = time.perf_counter()
+        self._printed_at = 0.0
+
+    def update(self, rows: int, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self._printed_at < self.interval:
+            return
+        self._printed_at = now
+        elapsed = max(now - self.started_at, 1e-9)
+        percent = self.source.tell() / self.size * 100 if self.size else 100.0
+        print(
+            f"  загружено строк: {rows} ({percent:.0f}% файла), {rows / elapsed:.0f} строк/с",
+            file=sys.stderr,
+            flush=True
+        )
+
+
+def _batches(records: Iterator[Tuple], batch_size: int) -> Iterator[List[Tuple]]:
+    batch = []
+    for line_no, record in enumerate(records, 1):
+        batch.append((line_no, *record))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _count(status: str) -> int:
+    """Количество строк из статуса команды ("UPDATE 12", "INSERT 0 5")"""
+    return int(status.rsplit(" ", 1)[-1])
+
+
+STAGING_DDL = """
+    CREATE TEMP TABLE medicins_import (
+        line_no integer NOT NULL,
+        name varchar(255) NOT NULL,
+        international_name varchar(255) NOT NULL,
+        form varchar(100) NOT NULL,
+        atc_code varchar(20) NOT NULL,
+        instruction text NOT NULL
+    ) ON COMMIT DROP
+"""
+
+# Повторы препарата в выгрузке: остается последняя запись
+DEDUPLICATE_SQL = f"""
+    CREATE TEMP TABLE medicins_import_unique ON COMMIT DROP AS
+    SELECT DISTINCT ON ({KEY_COLUMNS}) {KEY_COLUMNS}, atc_code, instruction, line_no
+    FROM medicins_import
+    ORDER BY {KEY_COLUMNS}, line_no DESC
+"""
+
+UPDATE_SQL = """
+    UPDATE medicins m
+    SET atc_code = s.atc_code, instruction = s.instruction
+    FROM medicins_import_unique s
+    WHERE m.name = s.name AND m.international_name = s.international_name AND m.form = s.form
+      AND (m.atc_code, m.instruction) IS DISTINCT FROM (s.atc_code, s.instruction)
+"""
+
+INSERT_SQL = """
+    INSERT INTO medicins (name, international_name, form, atc_code, instruction)
+    SELECT s.name, s.international_name, s.form, s.atc_code, s.instruction
+    FROM medicins_import_unique s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM medicins m
+        WHERE m.name = s.name AND m.international_name = s.international_name AND m.form = s.form
+    )
+    ORDER BY s.line_no
+"""
+
+# Препараты, на которые ссылаются назначения, не удаляются (FK ondelete=RESTRICT)
+PRUNE_SQL = """
+    DELETE FROM medicins m
+    WHERE NOT EXISTS (
+        SELECT 1 FROM medicins_import_unique s
+        WHERE s.name = m.name AND s.international_name = m.international_name AND s.form = m.form
+    )
+    AND NOT EXISTS (SELECT 1 FROM medical_prescriptions p WHERE p.medicin_id = m.id)
+"""
+
+
+async def import_records(
+    records: Iterator[Tuple[str, str, str, str, str]],
+    progress: Progress,
+    batch_size: int = 5000,
+    prune: bool = False,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Загрузить строки в справочник medicins
+
+    Args:
+        records: Нормализованные строки (read_csv / read_xml)
+        progress: Вывод хода загрузки
+        batch_size: Строк в одной команде COPY
+        prune: Удалить препараты, которых нет в выгрузке
+        dry_run: Откатить изменения (только посчитать)
+
+    Returns:
+        Счетчики: read, unique, updated, inserted, deleted
+    """
+    connection = await asyncpg.connect(
+        host=settings.DB_HOST,
+        port=settings.DB_PORT,
+        user=settings.DB_USERNAME,
+        password=settings.DB_PASSWORD,
+        database=settings.DB_DATABASE,
+    )
+    stats = {"read": 0, "unique": 0, "updated": 0, "inserted": 0, "deleted": 0}
+    try:
+        transaction = connection.transaction()
+        await transaction.start()
+        try:
+            await connection.execute(STAGING_DDL)
+            # Чтение файла и COPY чередуются: в памяти не больше одной порции
+            for batch in _batches(records, batch_size):
+                await connection.copy_records_to_table(
+                    "medicins_import", records=batch, columns=("line_no", *FIELDS)
+                )
+                stats["read"] += len(batch)
+                progress.update(stats["read"])
+            progress.update(stats["read"], force=True)
+
+            stats["unique"] = _count(await connection.execute(DEDUPLICATE_SQL))
+            await connection.execute("ANALYZE medicins_import_unique")
+
+            # Запись в справочник не пересекается с параллельным импортом;
+            # чтение (поиск, индекс API) не блокируется
+            await connection.execute("LOCK TABLE medicins IN SHARE ROW EXCLUSIVE MODE")
+            stats["updated"] = _count(await connection.execute(UPDATE_SQL))
+            stats["inserted"] = _count(await connection.execute(INSERT_SQL))
+            if prune:
+                stats["deleted"] = _count(await connection.execute(PRUNE_SQL))
+        except BaseException:
+            await transaction.rollback()
+            raise
+
+        if dry_run:
+            await transaction.rollback()
+        else:
+            await transaction.commit()
+            await connection.execute("ANALYZE medicins")
+    finally:
+        await connection.close()
+    return stats
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Загрузка справочника препаратов из выгрузки реестра")
+    parser.add_argument("file", help="Файл выгрузки (.csv или .xml)")
+    parser.add_argument("--format", choices=("csv", "xml"), default=None,
+                        help="Формат файла (по умолчанию - по расширению)")
+    parser.add_argument("--encoding", default="utf-8-sig", help="Кодировка CSV (например, cp1251)")
+    parser.add_argument("--delimiter", default=None, help="Разделитель CSV (по умолчанию определяется по заголовку)")
+    parser.add_argument("--record-tag", default="record", help="Тег записи о препарате в XML")
+    parser.add_argument("--column", action="append", default=[], metavar="FIELD=HEADER",
+                        help=f"Колонка файла для поля справочника ({', '.join(FIELDS)}), можно повторять")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Строк в одной команде COPY")
+    parser.add_argument("--prune", action="store_true",
+                        help="Удалить препараты, которых нет в выгрузке (кроме используемых в назначениях)")
+    parser.add_argument("--dry-run", action="store_true", help="Посчитать изменения и откатить транзакцию")
+    return parser.parse_args(argv)
+
+
+def _parse_overrides(items: List[str]) -> Dict[str, str]:
+    overrides = {}
+    for item in items:
+        field, sep, header = item.partition("=")
+        if not sep or field not in FIELDS:
+            raise RegistryFormatError(f"Неверный --column {item!r}: ожидается FIELD=HEADER, FIELD из {', '.join(FIELDS)}")
+        overrides[field] = header
+    return overrides
+
+
+async def run(args: argparse.Namespace) -> Dict[str, int]:
+    overrides = _parse_overrides(args.column)
+    file_format = args.format or ("xml" if args.file.lower().endswith(".xml") else "csv")
+    with open(args.file, "rb") as source:
+        if file_format == "xml":
+            records = read_xml(source, args.record_tag, overrides)
+        else:
+            records = read_csv(source, args.encoding, args.delimiter, overrides)
+        # Ошибки формата (заголовки, кодировка) - до подключения к БД
+        first = next(records, None)
+        return await import_records(
+            itertools.chain([first] if first is not None else [], records),
+            Progress(source),
+            batch_size=args.batch_size,
+            prune=args.prune,
+            dry_run=args.dry_run,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    started_at = time.perf_counter()
+    try:
+        stats = asyncio.run(run(args))
+    except RegistryFormatError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+
+    print(
+        f"{'Проверка (изменения отменены)' if args.dry_run else 'Импорт завершен'} "
+        f"за {time.perf_counter() - started_at:.1f} с: прочитано {stats['read']}, "
+        f"уникальных {stats['unique']}, добавлено {stats['inserted']}, "
+        f"обновлено {stats['updated']}, удалено {stats['deleted']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -34,6 +34,7 @@ class Settings(BaseSettings):
     GC_AUTH_KEY: str
     GC_CLIENT_SECRET: str
     GIGACHAT_BASE_URL: Optional[str] = None  # Опционально, если не указано - используется реальный API GigaChat
+    GIGACHAT_AUTH_URL: Optional[str] = None  # Опционально, адрес OAuth (для gigachat_mock)
 
     # Yandex OAuth (из main-app/.env)
     YANDEX_CLIENT_ID: str
@@ -47,6 +48,80 @@ class Settings(BaseSettings):
     API_URL: str
     WEB_URL: str = ""
 
+    # Фоновая обработка (из main-app/.env)
+    PROCESS_POOL_SIZE: int = 0  # 0 - по количеству CPU
+    EXPORT_DIR: str = "uploads/exports"  # Кэш сгенерированных PDF планов
+    PDF_EXTRACTION_MODE: str = "layout"  # layout - с восстановлением таблиц, plain - сплошной текст
+    RULE_EXTRACTION_ENABLED: bool = True  # Разбор типовых шаблонов без LLM
+    RULE_EXTRACTION_MIN_CONFIDENCE: str = "высокая"  # Минимальная уверенность, при которой LLM не вызывается
+
+    # Справочник препаратов (из main-app/.env)
+    MEDICINE_INDEX_ENABLED: bool = True  # Индекс справочника в памяти для сопоставления лекарств из плана
+    MEDICINE_INDEX_REFRESH_SECONDS: int = 60  # Догрузка новых строк справочника
+    MEDICINE_INDEX_RELOAD_SECONDS: int = 3600  # Полная перезагрузка (изменения и удаления строк)
+    MEDICINE_INDEX_BATCH_SIZE: int = 5000  # Строк справочника за один запрос к БД
+    MEDICINE_MATCH_MIN_SCORE: float = 0.45  # Минимальная похожесть названия (0..1)
+    ATC_NAMES_PATH: Optional[str] = None  # CSV "код;название" классов АТХ (без него - только анатомические группы)
+    INTERACTION_CHECK_ENABLED: bool = True  # Проверка нового плана против действующих назначений
+    DRUG_INTERACTIONS_PATH: Optional[str] = None  # CSV правил "ключ_1;ключ_2;важность;описание" (без него - только дубли)
+
+    # Динамика симптомов по опросам (из main-app/.env)
+    SURVEY_STATS_TIMEZONE: str = "Europe/Moscow"  # Часовой пояс границ дней по умолчанию и дневных агрегатов
+    SURVEY_STATS_DEFAULT_DAYS: int = 90  # Период, если даты не указаны
+    SURVEY_STATS_MAX_DAYS: int = 731  # Максимальный период одного запроса
+    ROLLUPS_ENABLED: bool = True  # Фоновое обновление дневных агрегатов опросов и приема препаратов
+    ROLLUP_INTERVAL_SECONDS: int = 300  # Период обновления агрегатов
+    ROLLUP_BATCH_SIZE: int = 50000  # Опросов за один проход
+    ADHERENCE_SETTLE_HOURS: int = 24  # Через сколько часов напоминание о приеме попадает в агрегат
+
+    # Секции notifications и surveys по месяцам (из main-app/.env)
+    PARTITION_MAINTENANCE_ENABLED: bool = True  # Создание будущих и архивирование старых секций
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 21600
+    PARTITION_PREMAKE_MONTHS: int = 3  # На сколько месяцев вперед создавать секции
+    PARTITION_ARCHIVE_SCHEMA: str = "archive"  # Схема для отсоединенных секций (пусто - удалять)
+    NOTIFICATIONS_RETENTION_MONTHS: int = 12  # Сколько месяцев уведомлений хранить в таблице (0 - все)
+    SURVEYS_RETENTION_MONTHS: int = 36  # Сколько месяцев опросов хранить в таблице (0 - все)
+
+    # Планировщик опросов по симптомам (из main-app/.env)
+    SURVEY_SCHEDULER_ENABLED: bool = True  # Напоминания reminder об оценке симптомов
+    SURVEY_SCHEDULER_INTERVAL_SECONDS: int = 900  # Период запуска (напоминания ставятся на этот период вперед)
+    SURVEY_SCHEDULER_BATCH_SIZE: int = 1000  # Симптомов за один запрос
+    SURVEY_INTERVAL_MIN_HOURS: int = 24  # Между опросами, если оценки растут
+    SURVEY_INTERVAL_BASE_HOURS: int = 72  # Между опросами по умолчанию
+    SURVEY_INTERVAL_MAX_HOURS: int = 168  # Между опросами, если оценки стабильны
+    SURVEY_TREND_DAYS: int = 14  # За сколько дней оценивать тренд
+
+    # Поиск (из main-app/.env)
+    SEARCH_MIN_SIMILARITY: float = 0.3  # Порог word_similarity pg_trgm для /medicins/search и /plans/search
+
+    # OCR для PDF без текстового слоя (из main-app/.env)
+    OCR_ENABLED: bool = True
+    OCR_BACKEND: str = "tesseract"
+    OCR_DPI: int = 300
+    OCR_LANGUAGES: str = "rus+eng"
+
+    # Логирование (из main-app/.env)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json - по строке JSON на запись, text - для локальной разработки
+    LOG_MAX_FIELD_LENGTH: int = 4000  # Длинные поля записи обрезаются (0 - без ограничения)
+    LOG_PAYLOAD_SAMPLE_RATE: float = 0.1  # Доля больших тел (текст PDF, ответ GigaChat), логируемых целиком
+
+    # Диагностика (из main-app/.env)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_LAG_THRESHOLD_MS: int = 100  # Блокировка event loop дольше порога логируется со стеком
+    LOOP_MONITOR_INTERVAL_MS: int = 50
+    PROFILER_MAX_SECONDS: int = 60  # Максимальная длительность профилирования через /admin/profile
+
+    # Трассировка OpenTelemetry (из main-app/.env)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "file"  # file - JSONL в TRACING_FILE, otlp - коллектор по TRACING_OTLP_ENDPOINT
+    TRACING_FILE: str = "logs/traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_SAMPLE_RATIO: float = 1.0  # Доля трассируемых запросов без родительского спана
+
+    # Метрики Prometheus (из main-app/.env)
+    METRICS_ENABLED: bool = True  # Эндпоинт /metrics и замер времени запросов
+
     @property
     def DATABASE_URL(self) -> str:
         """Async PostgreSQL connection URL"""
@@ -0,0 +1,61 @@
+"""
+Пул процессов для CPU-bound задач (рендеринг и разбор PDF)
+
+PyMuPDF держит GIL на время работы, поэтому тяжёлые операции с PDF
+выполняются в отдельных процессах, чтобы не блокировать event loop.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.logging_config import configure_worker_logging
+
+logger = logging.getLogger(__name__)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Получить общий пул процессов (создаётся при первом обращении)
+
+    Returns:
+        Экземпляр ProcessPoolExecutor
+    """
+    global _process_pool
+    if _process_pool is None:
+        max_workers = settings.PROCESS_POOL_SIZE or os.cpu_count() or 1
+        _process_pool = ProcessPoolExecutor(max_workers=max_workers, initializer=configure_worker_logging)
+        logger.info(f"Пул процессов запущен (workers: {max_workers})")
+    return _process_pool
+
+
+async def run_in_process(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Выполнить функцию в пуле процессов, не блокируя event loop
+
+    Функция и аргументы должны быть сериализуемы через pickle
+    (функция уровня модуля, простые типы данных).
+
+    Args:
+        func: Функция для выполнения
+        *args: Позиционные аргументы функции
+        **kwargs: Именованные аргументы функции
+
+    Returns:
+        Результат выполнения функции
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_process_pool() -> None:
+    """Остановить пул процессов (вызывается при остановке приложения)"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
@@ -0,0 +1,239 @@
+"""
+Настройка логирования
+
+Записи из обработчиков запросов только кладутся в очередь (QueueHandler),
+а форматирование и вывод выполняет фоновый поток (QueueListener) - запись
+в stdout не добавляет задержку к запросу. Формат - JSON (по строке на запись)
+или обычный текст для локальной разработки.
+
+Большие тела (текст PDF, ответ GigaChat) логируются через log_payload:
+поле обрезается до LOG_MAX_FIELD_LENGTH, а большие тела попадают в лог
+целиком только для доли записей LOG_PAYLOAD_SAMPLE_RATE.
+"""
+
+import atexit
+import copy
+import logging
+import queue
+import random
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.core.tracing import current_trace_id
+
+# Атрибуты LogRecord, которые не относятся к extra-полям (color_message - копия сообщения от uvicorn)
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName", "color_message"}
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[QueueListener] = None
+
+
+def truncate(value: str, max_length: int) -> str:
+    """
+    Обрезать строку до max_length символов с пометкой об обрезке
+
+    Args:
+        value: Строка
+        max_length: Максимальная длина (0 - без ограничения)
+
+    Returns:
+        Строка не длиннее max_length (плюс пометка)
+    """
+    if not max_length or len(value) <= max_length:
+        return value
+    return f"{value[:max_length]}... [обрезано {len(value) - max_length} символов]"
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога в одну строку JSON с обрезкой длинных полей"""
+
+    def __init__(self, max_field_length: int = 0):
+        super().__init__()
+        self.max_field_length = max_field_length
+
+    def _cap(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return truncate(value, self.max_field_length)
+        return value
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": self._cap(record.getMessage()),
+            "source": f"{record.filename}:{record.lineno}",
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = self._cap(value)
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    """Текстовый формат с обрезкой длинных сообщений"""
+
+    def __init__(self, max_field_length: int = 0):
+        super().__init__(TEXT_FORMAT)
+        self.max_field_length = max_field_length
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = truncate(record.message, self.max_field_length)
+        return super().formatMessage(record)
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        payload = getattr(record, "payload", None)
+        if payload:
+            text += "\n" + truncate(payload, self.max_field_length)
+        return text
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    QueueHandler без форматирования в вызывающем потоке
+
+    Стандартный prepare() форматирует запись до постановки в очередь;
+    здесь в вызывающем потоке только подставляются аргументы сообщения,
+    а форматирование остается фоновому потоку. Контекст трассировки
+    доступен только в вызывающем потоке, поэтому trace_id добавляется здесь.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        trace_id = current_trace_id()
+        if trace_id:
+            record.trace_id = trace_id
+        # Аргументы могут измениться до записи - подставляем их сразу
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Трассировка держит ссылки на кадры стека - сохраняем только текст
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def create_formatter() -> logging.Formatter:
+    """Форматтер по настройкам LOG_FORMAT и LOG_MAX_FIELD_LENGTH"""
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter(settings.LOG_MAX_FIELD_LENGTH)
+    return TextFormatter(settings.LOG_MAX_FIELD_LENGTH)
+
+
+def _replace_root_handlers(handler: logging.Handler) -> None:
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+
+def setup_logging() -> None:
+    """
+    Настроить логирование через очередь с фоновой записью
+
+    Повторный вызов ничего не делает. Логгеры uvicorn переключаются
+    на корневой логгер, чтобы access-лог тоже писался через очередь.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(create_formatter())
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    _replace_root_handlers(BackgroundQueueHandler(log_queue))
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+
+def shutdown_logging() -> None:
+    """Дописать записи из очереди и остановить фоновый поток"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def reinit_logging_after_fork() -> None:
+    """
+    Перезапустить фоновую запись в дочернем процессе
+
+    Под gunicorn с preload приложение (и setup_logging) импортируется
+    в мастер-процессе, а поток записи не переживает fork - воркер
+    создает свою очередь и свой поток (хук post_fork).
+    """
+    global _listener
+    _listener = None
+    setup_logging()
+
+
+def configure_worker_logging() -> None:
+    """
+    Логирование в процессах пула (initializer ProcessPoolExecutor)
+
+    При fork процесс наследует QueueHandler, но не поток записи - записи
+    остались бы в очереди. Воркеры пишут в stdout напрямую: они выполняют
+    CPU-bound задачи и не обслуживают запросы.
+    """
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(create_formatter())
+    _replace_root_handlers(output)
+
+
+def log_payload(
+    logger: logging.Logger,
+    label: str,
+    payload: Optional[str],
+    level: int = logging.INFO
+) -> None:
+    """
+    Залогировать большое тело (текст документа, ответ модели)
+
+    Тело кладется в поле payload; тела длиннее LOG_MAX_FIELD_LENGTH
+    логируются только для доли записей LOG_PAYLOAD_SAMPLE_RATE, для
+    остальных пишется только длина.
+
+    Args:
+        logger: Логгер модуля
+        label: Описание тела (сообщение записи)
+        payload: Тело
+        level: Уровень записи
+
+    Example:
+        >>> log_payload(logger, "Ответ GigaChat", gigachat_response)
+    """
+    if not logger.isEnabledFor(level):
+        return
+
+    payload = payload or ""
+    extra: Dict[str, Any] = {"payload_length": len(payload)}
+    max_length = settings.LOG_MAX_FIELD_LENGTH
+    is_large = bool(max_length) and len(payload) > max_length
+    if not is_large or random.random() < settings.LOG_PAYLOAD_SAMPLE_RATE:
+        extra["payload"] = payload
+    extra["payload_sampled"] = is_large and "payload" in extra
+
+    logger.log(level, label, extra=extra, stacklevel=2)
@@ -0,0 +1,113 @@
+"""
+Контроль задержки event loop
+
+Синхронный код в обработчике (разбор PDF, тяжелый JSON, блокирующий
+клиент) останавливает все запросы процесса. Монитор состоит из двух частей:
+
+- корутина-пульс засыпает на interval и меряет, насколько позже
+  она проснулась (задержка цикла, пишется в метрики и лог);
+- сторожевой поток замечает, что пульс давно не обновлялся, и пока
+  цикл еще заблокирован, логирует стек потока event loop - видно,
+  какой код его держит.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import observe_loop_lag
+
+logger = logging.getLogger(__name__)
+
+STACK_LIMIT = 20
+
+
+class LoopLagMonitor:
+    """
+    Монитор блокировок event loop
+
+    Example:
+        >>> monitor = LoopLagMonitor(threshold=0.1)
+        >>> monitor.start()
+        >>> ...
+        >>> await monitor.stop()
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_lag = 0.0
+        self._heartbeat = time.perf_counter()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    async def _pulse(self) -> None:
+        while True:
+            started_at = time.perf_counter()
+            self._heartbeat = started_at
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started_at - self.interval, 0.0)
+            self._heartbeat = time.perf_counter()
+
+            observe_loop_lag(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                logger.warning(
+                    f"Event loop был заблокирован на {lag * 1000:.0f} мс",
+                    extra={"loop_lag_ms": round(lag * 1000, 1)}
+                )
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled_for = time.perf_counter() - heartbeat - self.interval
+            # Стек логируем один раз за блокировку
+            if stalled_for < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            reported_heartbeat = heartbeat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            # Ближайшие к блокирующему коду кадры
+            stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT))
+            logger.warning(f"Event loop заблокирован дольше {stalled_for * 1000:.0f} мс:\n{stack}")
+
+    def start(self) -> None:
+        """Запустить монитор (вызывается внутри работающего event loop)"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._pulse(), name="loop-lag-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Контроль event loop запущен (порог {self.threshold * 1000:.0f} мс)")
+
+    async def stop(self) -> None:
+        """Остановить монитор"""
+        if self._task is None:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._watchdog = None
+
+
+loop_monitor = LoopLagMonitor(
+    threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000,
+    interval=settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+)
@@ -0,0 +1,211 @@
+"""
+Метрики Prometheus: длительность этапов обработки плана, время ответа
+эндпоинтов, задержка event loop, состояние пула соединений БД и расход
+токенов GigaChat.
+
+Этапы приходят от app.core.stages (наблюдатель), поэтому обработка PDF
+и извлечение плана не зависят от prometheus-client. Эндпоинт /metrics
+подключается в main.py.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from fastapi import FastAPI
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.stages import add_stage_observer
+
+logger = logging.getLogger(__name__)
+
+# От миллисекунды (открытие PDF) до минуты (ответ GigaChat на длинный план)
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_DURATION = Histogram(
+    "health_assist_stage_duration_seconds",
+    "Длительность этапов обработки плана лечения",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "health_assist_http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=STAGE_BUCKETS,
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "health_assist_event_loop_lag_seconds",
+    "Задержка пробуждения корутин event loop (блокирующий код в обработчиках)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+GIGACHAT_TOKENS = Counter(
+    "health_assist_gigachat_tokens",
+    "Токены GigaChat (prompt, completion, total)",
+    ["type"],
+)
+
+GIGACHAT_REQUESTS = Counter(
+    "health_assist_gigachat_requests",
+    "Запросы к GigaChat",
+    ["method", "status"],
+)
+
+
+DB_POOL_CONNECTIONS = Gauge(
+    "health_assist_db_pool_connections",
+    "Соединения пула БД по состоянию",
+    ["state"],
+    # При нескольких воркерах - сумма по живым процессам
+    multiprocess_mode="livesum",
+)
+
+# Состояние пула -> метод QueuePool
+DB_POOL_STATES = (
+    ("size", "size"),
+    ("checked_in", "checkedin"),
+    ("checked_out", "checkedout"),
+    ("overflow", "overflow"),
+)
+
+
+def update_db_pool_metrics() -> None:
+    """
+    Обновить состояние пула соединений БД
+
+    Вызывается после каждого запроса и при сборе метрик: пул у каждого
+    воркера свой, и в режиме нескольких процессов /metrics отдает один
+    из них - значения остальных берутся из последнего обновления.
+    """
+    from app.core.database import engine
+
+    pool = engine.sync_engine.pool
+    for state, getter in DB_POOL_STATES:
+        # NullPool и другие пулы без счетчиков пропускаем
+        if hasattr(pool, getter):
+            DB_POOL_CONNECTIONS.labels(state=state).set(getattr(pool, getter)())
+
+
+def observe_stage(name: str, started_at: float, duration: float) -> None:
+    """Наблюдатель app.core.stages: записать длительность этапа"""
+    STAGE_DURATION.labels(stage=name).observe(duration)
+
+
+def observe_loop_lag(lag: float) -> None:
+    """Записать задержку event loop (app.core.loop_monitor)"""
+    EVENT_LOOP_LAG.observe(lag)
+
+
+def record_gigachat_request(method: str, status: str) -> None:
+    """
+    Учесть запрос к GigaChat
+
+    Args:
+        method: chat, achat, stream_chat, astream_chat
+        status: success или error
+    """
+    GIGACHAT_REQUESTS.labels(method=method, status=status).inc()
+
+
+def record_gigachat_usage(usage: Optional[Any]) -> None:
+    """
+    Учесть расход токенов по полю usage ответа GigaChat
+
+    Args:
+        usage: Объект Usage из ответа (None - ответ без статистики)
+    """
+    if usage is None:
+        return
+    GIGACHAT_TOKENS.labels(type="prompt").inc(usage.prompt_tokens or 0)
+    GIGACHAT_TOKENS.labels(type="completion").inc(usage.completion_tokens or 0)
+    GIGACHAT_TOKENS.labels(type="total").inc(usage.total_tokens or 0)
+
+
+class MetricsMiddleware:
+    """
+    Замер времени ответа по эндпоинтам
+
+    Чистый ASGI-middleware (без BaseHTTPMiddleware), чтобы не буферизовать
+    потоковые ответы. Маршрут берется из шаблона пути (/plans/{plan_id}),
+    а не из URL - иначе число меток растет с каждым id.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            ).observe(time.perf_counter() - started_at)
+            update_db_pool_metrics()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+    Метрики в текстовом формате Prometheus
+
+    Под gunicorn с несколькими воркерами (задан PROMETHEUS_MULTIPROC_DIR)
+    метрики собираются из файлов всех воркеров, а не только ответившего.
+    """
+    update_db_pool_metrics()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def setup_metrics(app: FastAPI) -> None:
+    """
+    Подключить метрики к приложению
+
+    Подписывает наблюдателя этапов, добавляет middleware замера запросов
+    и эндпоинт /metrics.
+
+    Args:
+        app: Приложение FastAPI
+
+    Example:
+        >>> if settings.METRICS_ENABLED:
+        ...     setup_metrics(app)
+    """
+    add_stage_observer(observe_stage)
+    app.add_middleware(MetricsMiddleware)
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+    logger.info("Метрики Prometheus доступны на /metrics")
@@ -0,0 +1,88 @@
+"""
+Замер времени этапов обработки (загрузка, разбор PDF, промпт, LLM, запись в БД).
+Наблюдатели подписываются на завершение этапов - так метрики и бенчмарки
+собирают время по этапам, не меняя код эндпоинтов.
+
+Каждый этап также становится спаном трассировки (OpenTelemetry). Пока
+трассировка не включена (app.core.tracing), спаны ничего не стоят.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from opentelemetry import trace
+
+logger = logging.getLogger(__name__)
+tracer = trace.get_tracer(__name__)
+
+# Наблюдатель: (этап, время начала по time.perf_counter(), длительность в секундах)
+StageObserver = Callable[[str, float, float], None]
+
+_observers: List[StageObserver] = []
+
+
+def add_stage_observer(observer: StageObserver) -> None:
+    """Подписать наблюдателя на завершение этапов"""
+    _observers.append(observer)
+
+
+def remove_stage_observer(observer: StageObserver) -> None:
+    """Отписать наблюдателя"""
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def _notify_observers(name: str, started_at: float, duration: float) -> None:
+    for observer in list(_observers):
+        try:
+            observer(name, started_at, duration)
+        except Exception as e:
+            logger.warning(f"Ошибка наблюдателя этапа {name}: {e}")
+
+
+def record_stage(name: str, started_at: float, duration: float) -> None:
+    """
+    Передать наблюдателям замер этапа, выполненного в другом месте
+
+    Используется для этапов из пула процессов: они замеряются в дочернем
+    процессе и передаются в основной вместе с результатом. Спан этапа
+    создается задним числом как дочерний к текущему.
+
+    Args:
+        name: Название этапа
+        started_at: Время начала по time.perf_counter()
+        duration: Длительность в секундах
+    """
+    # perf_counter (CLOCK_MONOTONIC) общий для процессов одной машины -
+    # переводим его в время эпохи для спана
+    offset_ns = time.time_ns() - time.perf_counter_ns()
+    start_ns = int(started_at * 1e9) + offset_ns
+    span = tracer.start_span(name, start_time=start_ns)
+    span.end(end_time=start_ns + int(duration * 1e9))
+
+    _notify_observers(name, started_at, duration)
+
+
+@contextmanager
+def track_stage(name: str) -> Iterator[None]:
+    """
+    Замерить длительность этапа
+
+    Работает и в синхронном, и в асинхронном коде: время считается
+    от входа в блок до выхода из него (включая ожидание await).
+
+    Args:
+        name: Название этапа
+
+    Example:
+        >>> with track_stage("parse"):
+        ...     pdf_result = await process_treatment_plan_pdf_async(path)
+    """
+    started_at = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(name):
+            yield
+    finally:
+        _notify_observers(name, started_at, time.perf_counter() - started_at)
@@ -0,0 +1,146 @@
+"""
+Распределенная трассировка (OpenTelemetry)
+
+Загрузка плана проходит через бот, API, пул обработки PDF, GigaChat
+и PostgreSQL. Трассировка связывает эти шаги в один trace:
+
+- бот передает контекст в заголовке traceparent (bot/tracing.py);
+- входящие запросы API, запросы SQLAlchemy и исходящие запросы httpx
+  (в том числе к GigaChat) инструментируются автоматически;
+- этапы обработки (app.core.stages) - дочерние спаны запроса.
+
+Спаны пишутся в JSONL-файл или отправляются в OTLP-коллектор
+(например, Jaeger из docker-compose с профилем tracing).
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+from fastapi import FastAPI
+from opentelemetry import trace
+from opentelemetry.sdk.trace.sampling import Decision, ParentBased, Sampler, SamplingResult, TraceIdRatioBased
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "health_assist_api"
+
+# Служебные эндпоинты не трассируем
+EXCLUDED_URLS = "/metrics,/health"
+
+_provider = None
+_trace_file = None
+
+
+class SkipASGIEventsSampler(Sampler):
+    """
+    Отбрасывает служебные спаны ASGI (http receive / http send)
+
+    Инструментация ASGI создает спан на каждое сообщение, а потоковая
+    загрузка плана отправляет ответ десятками сообщений.
+    """
+
+    def __init__(self, delegate: Sampler):
+        self.delegate = delegate
+
+    def should_sample(self, parent_context, trace_id, name, kind=None, attributes=None, links=None, trace_state=None):
+        if name.endswith((" http receive", " http send")):
+            return SamplingResult(Decision.DROP)
+        return self.delegate.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+
+    def get_description(self) -> str:
+        return f"SkipASGIEvents{{{self.delegate.get_description()}}}"
+
+
+def _create_exporter():
+    """Экспортер спанов по настройке TRACING_EXPORTER"""
+    global _trace_file
+
+    if settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    path = Path(settings.TRACING_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _trace_file = open(path, "a", encoding="utf-8")
+    # Один спан - одна строка JSON
+    return ConsoleSpanExporter(
+        service_name=SERVICE_NAME,
+        out=_trace_file,
+        formatter=lambda span: span.to_json(indent=None) + "\n",
+    )
+
+
+def setup_tracing(app: FastAPI) -> None:
+    """
+    Включить трассировку приложения
+
+    Спаны отправляются пакетами из фонового потока (BatchSpanProcessor),
+    поэтому экспорт не добавляет задержку к запросам.
+
+    Args:
+        app: Приложение FastAPI
+
+    Example:
+        >>> if settings.TRACING_ENABLED:
+        ...     setup_tracing(app)
+    """
+    global _provider
+    if _provider is not None:
+        return
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    from app.core.database import engine
+
+    _provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": SERVICE_NAME,
+            "service.version": settings.APP_VERSION,
+            "deployment.environment": settings.APP_ENV,
+        }),
+        # Решение о записи принимает бот (родительский спан), для запросов
+        # без родителя - доля TRACING_SAMPLE_RATIO
+        sampler=SkipASGIEventsSampler(ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO))),
+    )
+    _provider.add_span_processor(BatchSpanProcessor(_create_exporter()))
+    trace.set_tracer_provider(_provider)
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=_provider, excluded_urls=EXCLUDED_URLS)
+    SQLAlchemyInstrumentor().instrument(engine=engine.sync_engine, tracer_provider=_provider)
+    HTTPXClientInstrumentor().instrument(tracer_provider=_provider)
+
+    logger.info(f"Трассировка включена (экспорт: {settings.TRACING_EXPORTER})")
+
+
+def shutdown_tracing() -> None:
+    """Отправить накопленные спаны и остановить экспорт"""
+    global _provider, _trace_file
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
+
+
+def current_trace_id() -> Optional[str]:
+    """
+    Идентификатор текущего trace (для логов и ответов об ошибках)
+
+    Returns:
+        trace_id в hex или None, если трассировка не ведется
+    """
+    context = trace.get_current_span().get_span_context()
+    if not context.is_valid:
+        return None
+    return format(context.trace_id, "032x")
@@ -3,8 +3,14 @@ CRUD операции
 """
 from app.crud.user import user
 from app.crud.plan import plan
+from app.crud.medicin import medicin
+from app.crud.prescription import prescription
+from app.crud.survey import survey
 
 __all__ = [
     "user",
     "plan",
+    "medicin",
+    "prescription",
+    "survey",
 ]
\ No newline at end of file
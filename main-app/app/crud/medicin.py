@@ -0,0 +1,133 @@
+"""
+CRUD операции для Medicin
+"""
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import ColumnElement, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+
+from app.crud.base import CRUDBase
+from app.crud.search import (
+    Cursor,
+    after_cursor,
+    set_similarity_threshold,
+    split_page,
+    trigram_filter,
+    trigram_score,
+)
+from app.models.medicin import Medicin
+from app.schemas.medicin import MedicinCreate, MedicinUpdate
+from app.services.atc import atc_prefix_range
+
+
+def atc_class_filter(atc_code: str) -> ColumnElement:
+    """
+    Условие "препарат входит в класс АТХ"
+
+    Диапазон префикса вместо LIKE: границы - параметры запроса, а индекс
+    text_pattern_ops используется и в подготовленных (generic) планах asyncpg.
+    """
+    lower, upper = atc_prefix_range(atc_code)
+    return and_(Medicin.atc_code.op("~>=~")(lower), Medicin.atc_code.op("~<~")(upper))
+
+
+class CRUDMedicin(CRUDBase[Medicin, MedicinCreate, MedicinUpdate]):
+    """CRUD операции для модели Medicin"""
+
+    async def get_catalog_batch(
+        self, db: AsyncSession, *, after_id: int = 0, limit: int = 5000
+    ) -> List[Any]:
+        """
+        Получить порцию справочника для индекса поиска
+
+        Строки идут по возрастанию id (постраничная выборка по ключу),
+        без текста инструкции.
+
+        Args:
+            db: Database session
+            after_id: Вернуть строки с id больше указанного
+            limit: Размер порции
+
+        Returns:
+            Строки (id, name, international_name, form, atc_code)
+        """
+        result = await db.execute(
+            select(
+                Medicin.id,
+                Medicin.name,
+                Medicin.international_name,
+                Medicin.form,
+                Medicin.atc_code,
+            )
+            .where(Medicin.id > after_id)
+            .order_by(Medicin.id)
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def get_by_atc_class(
+        self, db: AsyncSession, *, atc_code: str, skip: int = 0, limit: int = 100
+    ) -> List[Medicin]:
+        """
+        Препараты класса АТХ (все уровни ниже atc_code), без текста инструкции
+
+        Args:
+            db: Database session
+            atc_code: Код класса любого уровня (J, J01, J01C, ...)
+            skip: Сколько строк пропустить
+            limit: Максимум строк
+        """
+        result = await db.execute(
+            select(Medicin)
+            .where(atc_class_filter(atc_code))
+            .options(defer(Medicin.instruction))
+            .order_by(Medicin.atc_code, Medicin.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[Cursor] = None,
+        min_score: float = 0.3
+    ) -> Tuple[List[Tuple[Medicin, float]], Optional[str]]:
+        """
+        Поиск препаратов по торговому и международному названию (pg_trgm)
+
+        Args:
+            db: Database session
+            query: Поисковый запрос (можно начало слова)
+            limit: Размер страницы
+            cursor: Курсор предыдущей страницы
+            min_score: Минимальная похожесть (0..1)
+
+        Returns:
+            Кортеж (пары (препарат, похожесть) по убыванию похожести, курсор следующей страницы или None)
+        """
+        columns = [Medicin.name, Medicin.international_name]
+        score = trigram_score(query, columns)
+
+        stmt = (
+            select(Medicin, score)
+            .where(trigram_filter(query, columns))
+            .options(defer(Medicin.instruction))
+            .order_by(score.desc(), Medicin.id)
+            .limit(limit + 1)
+        )
+        keyset = after_cursor(score, Medicin.id, cursor)
+        if keyset is not None:
+            stmt = stmt.where(keyset)
+
+        await set_similarity_threshold(db, min_score)
+        result = await db.execute(stmt)
+        return split_page(list(result.tuples().all()), limit)
+
+
+# Создаем глобальный экземпляр для использования в endpoints
+medicin = CRUDMedicin(Medicin)
@@ -1,15 +1,29 @@
 """
 CRUD операции для Plan
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.crud.base import CRUDBase
+from app.crud.search import (
+    Cursor,
+    after_cursor,
+    set_similarity_threshold,
+    split_page,
+    trigram_filter,
+    trigram_score,
+)
+from app.models.medicin import Medicin
 from app.models.plan import Plan
+from app.models.prescription import MedicalPrescription
 from app.schemas.plan import PlanCreate, PlanUpdate
 
+# Совпадение в описании весит меньше совпадения в названии плана
+DESCRIPTION_WEIGHT = 0.8
+
 
 class CRUDPlan(CRUDBase[Plan, PlanCreate, PlanUpdate]):
     """CRUD операции для модели Plan"""
@@ -36,17 +50,88 @@ class CRUDPlan(CRUDBase[Plan, PlanCreate, PlanUpdate]):
         )
         return result.scalar_one_or_none()
 
+    async def get_user_plan_with_details(
+        self, db: AsyncSession, *, user_id: int, plan_id: int
+    ) -> Optional[Plan]:
+        """Получить план лечения пользователя с врачом, назначениями, анализами и приёмами"""
+        result = await db.execute(
+            select(Plan)
+            .where(Plan.id == plan_id, Plan.user_id == user_id)
+            .options(
+                selectinload(Plan.doctor),
+                selectinload(Plan.prescriptions).selectinload(MedicalPrescription.medicin),
+                selectinload(Plan.tests),
+                selectinload(Plan.appointments),
+            )
+        )
+        return result.scalar_one_or_none()
+
     async def get_active_plans(
-        self, db: AsyncSession, *, user_id: int
+        self, db: AsyncSession, *, user_id: int, with_prescriptions: bool = False
     ) -> List[Plan]:
-        """Получить активные планы лечения пользователя"""
-        result = await db.execute(
+        """
+        Получить активные планы лечения пользователя
+
+        Args:
+            db: Database session
+            user_id: ID пользователя
+            with_prescriptions: Загрузить назначения с препаратами (без текста инструкции)
+        """
+        stmt = (
             select(Plan)
             .where(Plan.user_id == user_id, Plan.status == "active")
             .order_by(Plan.start_date.desc())
         )
+        if with_prescriptions:
+            stmt = stmt.options(
+                selectinload(Plan.prescriptions)
+                .selectinload(MedicalPrescription.medicin)
+                .defer(Medicin.instruction)
+            )
+        result = await db.execute(stmt)
         return list(result.scalars().all())
 
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[Cursor] = None,
+        min_score: float = 0.3
+    ) -> Tuple[List[Tuple[Plan, float]], Optional[str]]:
+        """
+        Поиск по названиям и описаниям планов лечения пользователя (pg_trgm)
+
+        Args:
+            db: Database session
+            user_id: ID пользователя
+            query: Поисковый запрос (можно начало слова)
+            limit: Размер страницы
+            cursor: Курсор предыдущей страницы
+            min_score: Минимальная похожесть (0..1)
+
+        Returns:
+            Кортеж (пары (план, похожесть) по убыванию похожести, курсор следующей страницы или None)
+        """
+        columns = [Plan.title, Plan.description]
+        score = trigram_score(query, columns, weights=[1.0, DESCRIPTION_WEIGHT])
+
+        stmt = (
+            select(Plan, score)
+            .where(Plan.user_id == user_id, trigram_filter(query, columns))
+            .order_by(score.desc(), Plan.id)
+            .limit(limit + 1)
+        )
+        keyset = after_cursor(score, Plan.id, cursor)
+        if keyset is not None:
+            stmt = stmt.where(keyset)
+
+        await set_similarity_threshold(db, min_score)
+        result = await db.execute(stmt)
+        return split_page(list(result.tuples().all()), limit)
+
 
 # Создаем глобальный экземпляр для использования в endpoints
 plan = CRUDPlan(Plan)
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+CRUD операции для MedicalPrescription
+"""
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Integer, cast, func, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+
+from app.crud.base import CRUDBase
+from app.crud.medicin import atc_class_filter
+from app.crud.rollup import adherence_watermark, local_day, prescription_reminders
+from app.models.medicin import Medicin
+from app.models.notification import Notification
+from app.models.plan import Plan
+from app.models.prescription import MedicalPrescription
+from app.models.rollup import AdherenceDailyRollup
+from app.schemas.prescription import PrescriptionCreate, PrescriptionUpdate
+from app.services.atc import ATC_LEVEL_LENGTHS
+
+
+class CRUDPrescription(CRUDBase[MedicalPrescription, PrescriptionCreate, PrescriptionUpdate]):
+    """CRUD операции для модели MedicalPrescription"""
+
+    async def get_user_prescriptions_in_class(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        atc_code: str,
+        statuses: Optional[Sequence[str]] = None
+    ) -> List[MedicalPrescription]:
+        """
+        Назначения пользователя по всем планам, препараты которых входят в класс АТХ
+
+        Планы отбираются по idx_plans_user_id, назначения - по
+        idx_medical_prescriptions_plan_id, класс проверяется по префиксу
+        кода (idx_medicins_atc_code_pattern), без просмотра всех назначений.
+
+        Args:
+            db: Database session
+            user_id: ID пользователя
+            atc_code: Код класса любого уровня (J, J01, J01C, J01CA, J01CA04)
+            statuses: Статусы назначений (по умолчанию - все)
+
+        Returns:
+            Назначения с загруженным препаратом (без текста инструкции)
+        """
+        stmt = (
+            select(MedicalPrescription)
+            .join(MedicalPrescription.plan)
+            .join(MedicalPrescription.medicin)
+            .where(Plan.user_id == user_id, atc_class_filter(atc_code))
+            .options(contains_eager(MedicalPrescription.medicin).defer(Medicin.instruction))
+            .order_by(Medicin.atc_code, MedicalPrescription.start_date.desc(), MedicalPrescription.id)
+        )
+        if statuses:
+            stmt = stmt.where(MedicalPrescription.status.in_(statuses))
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_user_class_overlaps(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        level: int = 4,
+        statuses: Optional[Sequence[str]] = ("active",)
+    ) -> List[Any]:
+        """
+        Классы АТХ, в которых у пользователя назначено больше одного препарата
+
+        Основа проверки дублирующей терапии: два разных препарата одной
+        химической группы (уровень 4) в планах разных врачей.
+
+        Args:
+            db: Database session
+            user_id: ID пользователя
+            level: Уровень класса АТХ (1..5)
+            statuses: Статусы назначений (None - все)
+
+        Returns:
+            Строки (atc_class, medicin_ids, prescription_ids) по коду класса
+        """
+        atc_class = func.substr(Medicin.atc_code, 1, ATC_LEVEL_LENGTHS[level - 1]).label("atc_class")
+        stmt = (
+            select(
+                atc_class,
+                func.array_agg(func.distinct(MedicalPrescription.medicin_id)).label("medicin_ids"),
+                func.array_agg(MedicalPrescription.id).label("prescription_ids"),
+            )
+            .join(MedicalPrescription.plan)
+            .join(MedicalPrescription.medicin)
+            # Коды короче уровня (класс без вещества) в группировку не попадают
+            .where(Plan.user_id == user_id, func.length(Medicin.atc_code) >= ATC_LEVEL_LENGTHS[level - 1])
+            .group_by(atc_class)
+            .having(func.count(func.distinct(MedicalPrescription.medicin_id)) > 1)
+            .order_by(atc_class)
+        )
+        if statuses:
+            stmt = stmt.where(MedicalPrescription.status.in_(statuses))
+        result = await db.execute(stmt)
+        return list(result.all())
+
+    async def get_user_prescription(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        prescription_id: int
+    ) -> Optional[MedicalPrescription]:
+        """
+        Назначение из плана пользователя
+
+        Returns:
+            Назначение или None (нет такого или план другого пользователя)
+        """
+        result = await db.execute(
+            select(MedicalPrescription)
+            .join(MedicalPrescription.plan)
+            .where(MedicalPrescription.id == prescription_id, Plan.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_adherence(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        prescription_id: int,
+        date_from: datetime,
+        date_to: datetime,
+        timezone: str = "UTC"
+    ) -> List[Any]:
+        """
+        Напоминания о приеме препарата по дням: отправлено и прочитано
+
+        Дни, уже учтенные в дневных агрегатах (adherence_daily_rollups, если
+        они построены в этом часовом поясе), читаются из агрегатов, из
+        notifications - только напоминания после водяного знака, уже отправленные
+        к текущему моменту.
+
+        Args:
+            db: Database session
+            user_id: ID пользователя (владельца плана)
+            prescription_id: ID назначения
+            date_from: Начало периода (полночь в timezone, включительно)
+            date_to: Конец периода (полночь в timezone, не включительно)
+            timezone: Часовой пояс для границ дней (имя IANA, проверено вызывающим кодом)
+
+        Returns:
+            Строки (day, sent, read) по дням с напоминаниями
+        """
+        zone = ZoneInfo(timezone)
+        watermark = adherence_watermark(timezone)
+
+        rolled_up = (
+            select(AdherenceDailyRollup.day, AdherenceDailyRollup.sent_count, AdherenceDailyRollup.read_count)
+            .where(
+                watermark.is_not(None),
+                AdherenceDailyRollup.prescription_id == prescription_id,
+                AdherenceDailyRollup.user_id == user_id,
+                AdherenceDailyRollup.day >= date_from.astimezone(zone).date(),
+                AdherenceDailyRollup.day < date_to.astimezone(zone).date(),
+            )
+        )
+        day = local_day(timezone, Notification.time)
+        tail = (
+            select(day, func.count(), func.count().filter(Notification.is_read))
+            .where(
+                prescription_reminders(),
+                Notification.medical_entity_id == prescription_id,
+                Notification.user_id == user_id,
+                Notification.time >= date_from,
+                Notification.time < date_to,
+                Notification.time <= func.now(),
+                or_(watermark.is_(None), Notification.time >= watermark),
+            )
+            .group_by(day)
+        )
+        days = union_all(rolled_up, tail).subquery()
+        stmt = (
+            select(
+                days.c.day,
+                cast(func.sum(days.c.sent_count), Integer).label("sent"),
+                cast(func.sum(days.c.read_count), Integer).label("read"),
+            )
+            .group_by(days.c.day)
+            .order_by(days.c.day)
+        )
+        result = await db.execute(stmt)
+        return list(result.all())
+
+
+# Создаем глобальный экземпляр для использования в endpoints
+prescription = CRUDPrescription(MedicalPrescription)
@@ -0,0 +1,229 @@
+"""
+Дневные агрегаты (rollup) опросов и напоминаний о приеме препаратов
+
+Агрегаты обновляются инкрементально фоновой задачей (app.services.rollups):
+каждый проход учитывает только строки после водяного знака (rollup_watermarks)
+и сдвигает его в той же транзакции. Запросы статистики читают агрегаты
+и досчитывают по исходной таблице только строки после водяного знака,
+поэтому результат не зависит от того, когда прошло последнее обновление.
+
+Опросы отслеживаются по id: проход агрегирует опросы до максимального id,
+увиденного предыдущим проходом, - вставки, которые на тот момент еще не
+были зафиксированы, успевают завершиться и не пропускаются. Предполагается,
+что опросы не изменяются после сохранения.
+
+Напоминания отслеживаются по времени отправки: в агрегат попадают
+напоминания старше ADHERENCE_SETTLE_HOURS, отметка о прочтении после
+этого срока не учитывается.
+"""
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import Date, cast, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.notification import Notification
+from app.models.plan import Plan
+from app.models.prescription import MedicalPrescription
+from app.models.rollup import AdherenceDailyRollup, RollupWatermark, SurveyDailyRollup
+from app.models.survey import Survey
+from app.models.symptom import Symptom
+
+# Имена водяных знаков (rollup_watermarks.name)
+SURVEYS_WATERMARK = "surveys"
+ADHERENCE_WATERMARK = "adherence"
+
+# Период напоминаний за один проход (первичное заполнение идет по частям)
+ADHERENCE_BATCH_PERIOD = timedelta(days=7)
+
+
+def local_day(timezone: str, column):
+    """
+    Дата в часовом поясе timezone
+
+    Литерал (а не параметр), чтобы выражение совпадало в SELECT и GROUP BY.
+    """
+    return cast(func.timezone(literal(timezone, literal_execute=True), column), Date)
+
+
+def prescription_reminders():
+    """
+    Условие "напоминание о приеме препарата"
+
+    Литерал - иначе в подготовленном запросе не применится частичный
+    индекс idx_notifications_prescription_time.
+    """
+    return Notification.type == literal("prescription", literal_execute=True)
+
+
+def survey_watermark(timezone: str):
+    """
+    Последний учтенный в агрегатах id опроса (скалярный подзапрос)
+
+    NULL, если агрегаты построены в другом часовом поясе или еще не строились:
+    тогда все опросы читаются из surveys.
+    """
+    return (
+        select(RollupWatermark.last_id)
+        .where(RollupWatermark.name == SURVEYS_WATERMARK, RollupWatermark.timezone == timezone)
+        .scalar_subquery()
+    )
+
+
+def adherence_watermark(timezone: str):
+    """
+    Время, до которого напоминания учтены в агрегатах (скалярный подзапрос)
+
+    NULL, если агрегаты построены в другом часовом поясе или еще не строились.
+    """
+    return (
+        select(RollupWatermark.last_time)
+        .where(RollupWatermark.name == ADHERENCE_WATERMARK, RollupWatermark.timezone == timezone)
+        .scalar_subquery()
+    )
+
+
+async def _lock_watermark(db: AsyncSession, name: str, timezone: str) -> Optional[RollupWatermark]:
+    """
+    Водяной знак с блокировкой строки до конца транзакции
+
+    Строку, заблокированную другим процессом (несколько воркеров API),
+    пропускаем - агрегаты обновит он. При смене часового пояса агрегаты
+    удаляются и строятся заново.
+    """
+    result = await db.execute(
+        select(RollupWatermark)
+        .where(RollupWatermark.name == name)
+        .with_for_update(skip_locked=True)
+    )
+    watermark = result.scalar_one_or_none()
+    if watermark is None or watermark.timezone == timezone:
+        return watermark
+
+    model = SurveyDailyRollup if name == SURVEYS_WATERMARK else AdherenceDailyRollup
+    await db.execute(delete(model))
+    watermark.last_id = watermark.next_id = watermark.last_time = None
+    watermark.timezone = timezone
+    return watermark
+
+
+async def rollup_surveys(db: AsyncSession, *, timezone: str, batch_size: int) -> bool:
+    """
+    Добавить в агрегаты опросы после водяного знака (не больше batch_size id)
+
+    Транзакцию фиксирует вызывающий код.
+
+    Args:
+        db: Database session
+        timezone: Часовой пояс границ дней
+        batch_size: Максимум id опросов за проход
+
+    Returns:
+        True, если остались необработанные опросы
+    """
+    watermark = await _lock_watermark(db, SURVEYS_WATERMARK, timezone)
+    if watermark is None:
+        return False
+
+    last_id = watermark.last_id or 0
+    horizon = watermark.next_id or 0
+    upper = min(horizon, last_id + batch_size)
+    if upper > last_id:
+        day = local_day(timezone, Survey.date)
+        source = (
+            select(
+                Survey.symptom_id,
+                day,
+                Plan.user_id,
+                func.count(),
+                func.sum(Survey.value),
+                func.min(Survey.value),
+                func.max(Survey.value),
+            )
+            .join(Symptom, Symptom.id == Survey.symptom_id)
+            .join(Plan, Plan.id == Symptom.plan_id)
+            .where(Survey.id > last_id, Survey.id <= upper)
+            .group_by(Survey.symptom_id, day, Plan.user_id)
+        )
+        stmt = insert(SurveyDailyRollup).from_select(
+            ["symptom_id", "day", "user_id", "value_count", "value_sum", "value_min", "value_max"],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SurveyDailyRollup.symptom_id, SurveyDailyRollup.day],
+            set_={
+                "value_count": SurveyDailyRollup.value_count + stmt.excluded.value_count,
+                "value_sum": SurveyDailyRollup.value_sum + stmt.excluded.value_sum,
+                "value_min": func.least(SurveyDailyRollup.value_min, stmt.excluded.value_min),
+                "value_max": func.greatest(SurveyDailyRollup.value_max, stmt.excluded.value_max),
+            },
+        )
+        await db.execute(stmt)
+        watermark.last_id = upper
+
+    if upper >= horizon:
+        # Граница следующего прохода - опросы, уже получившие id к этому моменту
+        watermark.next_id = await db.scalar(select(func.max(Survey.id))) or 0
+    watermark.updated_at = func.now()
+    return upper < horizon
+
+
+async def rollup_adherence(db: AsyncSession, *, timezone: str, settle: timedelta) -> bool:
+    """
+    Добавить в агрегаты напоминания о приеме препаратов после водяного знака
+
+    За проход учитывается не больше ADHERENCE_BATCH_PERIOD напоминаний,
+    отправленных раньше, чем settle назад. Транзакцию фиксирует вызывающий код.
+
+    Args:
+        db: Database session
+        timezone: Часовой пояс границ дней
+        settle: Сколько ждать отметки о прочтении
+
+    Returns:
+        True, если остались необработанные напоминания
+    """
+    watermark = await _lock_watermark(db, ADHERENCE_WATERMARK, timezone)
+    if watermark is None:
+        return False
+
+    reminders = prescription_reminders()
+    lower = watermark.last_time
+    if lower is None:
+        lower = await db.scalar(select(func.min(Notification.time)).where(reminders))
+    horizon = await db.scalar(select(func.now() - settle))
+    if lower is None or lower >= horizon:
+        if watermark.last_time is None:
+            watermark.last_time = horizon
+        return False
+
+    upper = min(horizon, lower + ADHERENCE_BATCH_PERIOD)
+    day = local_day(timezone, Notification.time)
+    source = (
+        select(
+            MedicalPrescription.id,
+            day,
+            Notification.user_id,
+            func.count(),
+            func.count().filter(Notification.is_read),
+        )
+        .join(MedicalPrescription, MedicalPrescription.id == Notification.medical_entity_id)
+        .where(reminders, Notification.time >= lower, Notification.time < upper)
+        .group_by(MedicalPrescription.id, day, Notification.user_id)
+    )
+    stmt = insert(AdherenceDailyRollup).from_select(
+        ["prescription_id", "day", "user_id", "sent_count", "read_count"],
+        source,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AdherenceDailyRollup.prescription_id, AdherenceDailyRollup.day],
+        set_={
+            "sent_count": AdherenceDailyRollup.sent_count + stmt.excluded.sent_count,
+            "read_count": AdherenceDailyRollup.read_count + stmt.excluded.read_count,
+        },
+    )
+    await db.execute(stmt)
+    watermark.last_time = upper
+    watermark.updated_at = func.now()
+    return upper < horizon
@@ -0,0 +1,89 @@
+"""
+Общие средства поиска по триграммам (pg_trgm) для CRUD классов
+
+Поиск использует оператор "<%" (word_similarity): запрос ищется как слово
+или начало слова внутри поля, поэтому "амокс" находит "Амоксициллин".
+Оператор поддерживается GIN-индексами gin_trgm_ops. Результаты
+упорядочены по похожести и id, страницы - по курсору (похожесть, id)
+последней строки, без OFFSET.
+"""
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import ColumnElement, and_, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Курсор: (похожесть, id) последней строки страницы
+Cursor = Tuple[float, int]
+
+
+def encode_cursor(score: float, id: int) -> str:
+    """Курсор следующей страницы"""
+    return base64.urlsafe_b64encode(json.dumps([score, id]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Разбор курсора из запроса
+
+    Raises:
+        ValueError: Курсор поврежден
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), int(id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def set_similarity_threshold(db: AsyncSession, threshold: float) -> None:
+    """Порог оператора "<%" до конца текущей транзакции"""
+    await db.execute(
+        select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True))
+    )
+
+
+def trigram_filter(query: str, columns: Sequence[ColumnElement]) -> ColumnElement:
+    """Условие поиска (использует GIN-индексы gin_trgm_ops по колонкам)"""
+    term = literal(query)
+    return or_(*(term.op("<%")(column) for column in columns))
+
+
+def trigram_score(query: str, columns: Sequence[ColumnElement], weights: Optional[Sequence[float]] = None) -> ColumnElement:
+    """
+    Похожесть строки на запрос: максимум word_similarity по колонкам
+
+    Args:
+        query: Поисковый запрос
+        columns: Колонки поиска
+        weights: Веса колонок (по умолчанию 1)
+    """
+    term = literal(query)
+    scores = [func.word_similarity(term, column) for column in columns]
+    if weights is not None:
+        scores = [score * weight for score, weight in zip(scores, weights)]
+    return func.greatest(*scores)
+
+
+def after_cursor(score: ColumnElement, id_column: ColumnElement, cursor: Optional[Cursor]) -> Optional[ColumnElement]:
+    """Условие строк после курсора при сортировке (похожесть DESC, id ASC)"""
+    if cursor is None:
+        return None
+    last_score, last_id = cursor
+    return or_(score < last_score, and_(score == last_score, id_column > last_id))
+
+
+def split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Страница и курсор следующей
+
+    Запрос выбирает limit + 1 строк: лишняя строка означает, что страница не последняя.
+    Строки - пары (объект с id, похожесть).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last, score = rows[-1]
+    return rows, encode_cursor(score, last.id)
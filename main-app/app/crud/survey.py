@@ -0,0 +1,287 @@
+"""
+CRUD операции для Survey
+"""
+from datetime import datetime, timedelta
+from typing import Any, List, Literal, NamedTuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import DateTime, Integer, and_, case, cast, func, literal, null, select, true, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.crud.rollup import local_day, survey_watermark
+from app.models.notification import Notification
+from app.models.plan import Plan
+from app.models.rollup import SurveyDailyRollup
+from app.models.survey import Survey
+from app.models.symptom import Symptom
+from app.schemas.survey import SurveyCreate, SurveyUpdate
+
+# Интервал агрегации: день или неделя (с понедельника)
+StatsBucket = Literal["day", "week"]
+
+SECONDS_PER_DAY = 86400
+
+# Напоминание об опросе (notifications.title ограничен 128 символами)
+SURVEY_REMINDER_TITLE = "Как вы себя чувствуете?"
+SURVEY_REMINDER_MESSAGE = "Оцените от 0 до 10: "
+
+
+class SurveySchedulePolicy(NamedTuple):
+    """
+    Как часто спрашивать об оценке симптома
+
+    Интервал выбирается по наклону оценок за trend_window (баллов в день):
+    симптом усиливается - rising_interval, оценки стабильны - stable_interval,
+    иначе (или ответов меньше min_answers) - base_interval.
+    """
+    rising_interval: timedelta = timedelta(hours=24)
+    base_interval: timedelta = timedelta(hours=72)
+    stable_interval: timedelta = timedelta(hours=168)
+    trend_window: timedelta = timedelta(days=14)
+    rising_slope: float = 0.2
+    stable_slope: float = 0.05
+    min_answers: int = 3
+
+
+class CRUDSurvey(CRUDBase[Survey, SurveyCreate, SurveyUpdate]):
+    """CRUD операции для модели Survey"""
+
+    async def get_plan_stats(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        plan_id: int,
+        date_from: datetime,
+        date_to: datetime,
+        bucket: StatsBucket = "day",
+        timezone: str = "UTC"
+    ) -> List[Any]:
+        """
+        Статистика опросов по симптомам плана за период одним запросом
+
+        Опросы группируются по симптому и дню (неделе) в часовом поясе
+        пациента: min / avg / max / количество. Оконные функции по каждому
+        симптому добавляют тренд (наклон регрессии среднего по времени,
+        баллов в день) и изменение относительно предыдущего интервала.
+
+        Дни, уже учтенные в дневных агрегатах (survey_daily_rollups, если они
+        построены в этом часовом поясе), читаются из агрегатов, из surveys -
+        только опросы после водяного знака (по индексу (symptom_id, date)).
+
+        Args:
+            db: Database session
+            user_id: ID пользователя (владельца плана)
+            plan_id: ID плана лечения
+            date_from: Начало периода (полночь в timezone, включительно)
+            date_to: Конец периода (полночь в timezone, не включительно)
+            bucket: Интервал агрегации
+            timezone: Часовой пояс для границ дней (имя IANA, проверено вызывающим кодом)
+
+        Returns:
+            Строки (symptom_id, description, bucket, min_value, avg_value, max_value,
+            count, slope, change) по симптому и времени
+        """
+        zone = ZoneInfo(timezone)
+        watermark = survey_watermark(timezone)
+
+        rolled_up = (
+            select(
+                SurveyDailyRollup.symptom_id,
+                SurveyDailyRollup.day,
+                SurveyDailyRollup.value_count,
+                SurveyDailyRollup.value_sum,
+                SurveyDailyRollup.value_min,
+                SurveyDailyRollup.value_max,
+            )
+            .join(Symptom, Symptom.id == SurveyDailyRollup.symptom_id)
+            .where(
+                watermark.is_not(None),
+                Symptom.plan_id == plan_id,
+                SurveyDailyRollup.user_id == user_id,
+                SurveyDailyRollup.day >= date_from.astimezone(zone).date(),
+                SurveyDailyRollup.day < date_to.astimezone(zone).date(),
+            )
+        )
+        # Одинаковые литералы в SELECT и GROUP BY - иначе PostgreSQL не сопоставит
+        # выражения с разными параметрами
+        day = local_day(timezone, Survey.date)
+        tail = (
+            select(
+                Survey.symptom_id,
+                day,
+                func.count(),
+                func.sum(Survey.value),
+                func.min(Survey.value),
+                func.max(Survey.value),
+            )
+            .join(Symptom, Symptom.id == Survey.symptom_id)
+            .join(Plan, Plan.id == Symptom.plan_id)
+            .where(
+                Symptom.plan_id == plan_id,
+                Plan.user_id == user_id,
+                Survey.date >= date_from,
+                Survey.date < date_to,
+                Survey.id > func.coalesce(watermark, 0),
+            )
+            .group_by(Survey.symptom_id, day)
+        )
+        days = union_all(rolled_up, tail).subquery()
+
+        # Дата -> timestamp без часового пояса: date_trunc от date перевел бы ее
+        # в часовой пояс сессии
+        bucket_start = func.date_trunc(
+            literal(bucket, literal_execute=True), cast(days.c.day, DateTime)
+        ).label("bucket")
+        value_count = func.sum(days.c.value_count)
+        buckets = (
+            select(
+                days.c.symptom_id,
+                Symptom.description,
+                bucket_start,
+                func.min(days.c.value_min).label("min_value"),
+                (func.sum(days.c.value_sum) / value_count).label("avg_value"),
+                func.max(days.c.value_max).label("max_value"),
+                cast(value_count, Integer).label("count"),
+            )
+            .join(Symptom, Symptom.id == days.c.symptom_id)
+            .group_by(days.c.symptom_id, Symptom.description, bucket_start)
+            .subquery()
+        )
+
+        per_symptom = {"partition_by": buckets.c.symptom_id}
+        day_number = func.extract("epoch", buckets.c.bucket) / SECONDS_PER_DAY
+        stmt = (
+            select(
+                buckets,
+                func.regr_slope(buckets.c.avg_value, day_number).over(**per_symptom).label("slope"),
+                (
+                    buckets.c.avg_value
+                    - func.lag(buckets.c.avg_value).over(**per_symptom, order_by=buckets.c.bucket)
+                ).label("change"),
+            )
+            .order_by(buckets.c.symptom_id, buckets.c.bucket)
+        )
+        result = await db.execute(stmt)
+        return list(result.all())
+
+    async def schedule_due(
+        self,
+        db: AsyncSession,
+        *,
+        policy: SurveySchedulePolicy,
+        lookahead: timedelta,
+        batch_size: int
+    ) -> List[Any]:
+        """
+        Поставить напоминания об опросе по симптомам, которым пора задать вопрос
+
+        Один запрос на пачку: симптомы со сроком опроса в ближайшие lookahead
+        (idx_symptoms_next_survey_at) блокируются, по каждому считается наклон
+        оценок за policy.trend_window (idx_surveys_symptom_id_date, только
+        последние секции surveys), для симптомов действующих планов
+        создаются уведомления reminder, и срок следующего опроса сдвигается
+        на интервал по тренду. Симптомам плана, который еще не начался, срок
+        переносится на начало плана; завершенных и отмененных планов -
+        сбрасывается в NULL, и они больше не читаются.
+
+        Симптомы, заблокированные другим процессом, пропускаются.
+        Транзакцию фиксирует вызывающий код.
+
+        Args:
+            db: Database session
+            policy: Интервалы и пороги тренда
+            lookahead: Насколько вперед планировать (период запуска планировщика)
+            batch_size: Максимум симптомов за запрос
+
+        Returns:
+            Строки (id, next_survey_at, reminded) по обработанным симптомам
+        """
+        now = func.now()
+        today = func.current_date()
+        due = (
+            select(
+                Symptom.id.label("symptom_id"),
+                Symptom.description,
+                Symptom.next_survey_at,
+                Plan.user_id,
+                Plan.status,
+                Plan.start_date,
+                Plan.end_date,
+            )
+            .join(Plan, Plan.id == Symptom.plan_id)
+            .where(Symptom.next_survey_at < now + lookahead)
+            .order_by(Symptom.next_survey_at)
+            .limit(batch_size)
+            .with_for_update(of=Symptom, skip_locked=True)
+            .cte("due")
+        )
+        recent = (
+            select(
+                func.regr_slope(Survey.value, func.extract("epoch", Survey.date) / SECONDS_PER_DAY).label("slope"),
+                func.count().label("answers"),
+            )
+            .where(Survey.symptom_id == due.c.symptom_id, Survey.date >= now - policy.trend_window)
+            .lateral("recent")
+        )
+        active = and_(due.c.status == "active", due.c.start_date <= today, due.c.end_date >= today)
+        interval = case(
+            (recent.c.answers < policy.min_answers, policy.base_interval),
+            (recent.c.slope >= policy.rising_slope, policy.rising_interval),
+            (func.abs(recent.c.slope) <= policy.stable_slope, policy.stable_interval),
+            else_=policy.base_interval,
+        )
+        ask_at = func.greatest(due.c.next_survey_at, now)
+        scheduled = (
+            select(
+                due.c.symptom_id,
+                due.c.user_id,
+                due.c.description,
+                ask_at.label("ask_at"),
+                case(
+                    (active, ask_at + interval),
+                    # План еще не начался или ждет подтверждения - вернемся к нему позже
+                    (
+                        and_(due.c.status.in_(("active", "pending")), due.c.end_date >= today),
+                        case(
+                            (due.c.start_date > today, cast(due.c.start_date, DateTime(timezone=True))),
+                            else_=now + policy.base_interval,
+                        ),
+                    ),
+                    else_=null(),
+                ).label("next_survey_at"),
+                active.label("reminded"),
+            )
+            .select_from(due.join(recent, true()))
+            .cte("scheduled")
+        )
+        reminders = (
+            insert(Notification)
+            .from_select(
+                ["type", "time", "title", "message", "user_id", "medical_entity_id"],
+                select(
+                    literal("reminder"),
+                    scheduled.c.ask_at,
+                    literal(SURVEY_REMINDER_TITLE),
+                    func.concat(SURVEY_REMINDER_MESSAGE, scheduled.c.description),
+                    scheduled.c.user_id,
+                    scheduled.c.symptom_id,
+                ).where(scheduled.c.reminded),
+            )
+            .cte("reminders")
+        )
+        stmt = (
+            update(Symptom)
+            .where(Symptom.id == scheduled.c.symptom_id)
+            .values(next_survey_at=scheduled.c.next_survey_at)
+            .returning(Symptom.id, Symptom.next_survey_at, scheduled.c.reminded)
+            .add_cte(reminders)
+        )
+        result = await db.execute(stmt)
+        return list(result.all())
+
+
+# Создаем глобальный экземпляр для использования в endpoints
+survey = CRUDSurvey(Survey)
@@ -7,15 +7,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.executor import shutdown_process_pool
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import setup_metrics
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.services.medicine_resolver import medicine_resolver
+from app.services.partitions import partition_maintenance
+from app.services.rollups import rollup_job
+from app.services.survey_scheduler import survey_scheduler
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+# Настройка логирования (запись в фоновом потоке)
+setup_logging()
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -33,18 +36,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Метрики Prometheus (/metrics)
+if settings.METRICS_ENABLED:
+    setup_metrics(app)
+
+# Трассировка OpenTelemetry
+if settings.TRACING_ENABLED:
+    setup_tracing(app)
+
 
 @app.on_event("startup")
 async def startup_event():
     """Действия при запуске приложения"""
     print(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     print(f"Environment: {settings.APP_ENV}")
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    if settings.MEDICINE_INDEX_ENABLED:
+        await medicine_resolver.start()
+    if settings.ROLLUPS_ENABLED:
+        await rollup_job.start()
+    if settings.PARTITION_MAINTENANCE_ENABLED:
+        await partition_maintenance.start()
+    if settings.SURVEY_SCHEDULER_ENABLED:
+        await survey_scheduler.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Действия при остановке приложения"""
     print("Shutting down...")
+    await loop_monitor.stop()
+    await medicine_resolver.stop()
+    await rollup_job.stop()
+    await partition_maintenance.stop()
+    await survey_scheduler.stop()
+    shutdown_process_pool()
+    shutdown_tracing()
+    shutdown_logging()
 
 
 @app.get("/")
@@ -68,8 +97,11 @@ async def health_check():
 
 
 # Подключение роутов API v1
-from app.api.v1 import auth, users, plans
+from app.api.v1 import admin, auth, medicins, prescriptions, users, plans
 
 app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1", tags=["users"])
-app.include_router(plans.router, prefix="/api/v1/plans", tags=["plans"])
\ No newline at end of file
+app.include_router(plans.router, prefix="/api/v1/plans", tags=["plans"])
+app.include_router(medicins.router, prefix="/api/v1/medicins", tags=["medicins"])
+app.include_router(prescriptions.router, prefix="/api/v1/prescriptions", tags=["prescriptions"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
@@ -12,6 +12,7 @@ from app.models.test import MedicalTest
 from app.models.symptom import Symptom
 from app.models.survey import Survey
 from app.models.notification import Notification
+from app.models.rollup import RollupWatermark, SurveyDailyRollup, AdherenceDailyRollup
 
 # Все модели должны быть импортированы здесь для Alembic autogenerate
 
@@ -28,4 +29,7 @@ __all__ = [
     "Symptom",
     "Survey",
     "Notification",
+    "RollupWatermark",
+    "SurveyDailyRollup",
+    "AdherenceDailyRollup",
 ]
\ No newline at end of file
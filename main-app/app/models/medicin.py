@@ -22,5 +22,12 @@ class Medicin(Base):
     prescriptions = relationship("MedicalPrescription", back_populates="medicin")
 
     __table_args__ = (
-        Index("idx_medicins_atc_code", "atc_code"),
+        # Поиск по классу АТХ - по префиксу кода (диапазон ~>=~ / ~<~, app.services.atc)
+        Index("idx_medicins_atc_code_pattern", "atc_code", postgresql_ops={"atc_code": "text_pattern_ops"}),
+        # Нечеткий поиск по названиям (pg_trgm)
+        Index("idx_medicins_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "idx_medicins_international_name_trgm", "international_name",
+            postgresql_using="gin", postgresql_ops={"international_name": "gin_trgm_ops"}
+        ),
     )
\ No newline at end of file
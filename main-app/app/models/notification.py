@@ -3,7 +3,7 @@
 """
 from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, CheckConstraint, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 from app.models.base import Base
 
@@ -12,13 +12,14 @@ class Notification(Base):
     """Уведомления для пользователей"""
     __tablename__ = "notifications"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
     type = Column(
         String(50),
         nullable=False,
         comment="appointment, prescription, test, reminder, alert"
     )
-    time = Column(DateTime(timezone=True), nullable=False, comment="Время отправки уведомления")
+    # Ключ секционирования (секции по месяцам, app.services.partitions) - входит в первичный ключ
+    time = Column(DateTime(timezone=True), primary_key=True, nullable=False, comment="Время отправки уведомления")
     title = Column(String(128), nullable=False)
     message = Column(Text, nullable=True)
     is_read = Column(Boolean, nullable=False, server_default="false")
@@ -26,7 +27,7 @@ class Notification(Base):
     medical_entity_id = Column(
         Integer,
         nullable=True,
-        comment="ID связанной сущности (appointment/prescription/test)"
+        comment="ID связанной сущности (appointment/prescription/test; reminder - symptom)"
     )
     created_at = Column(
         DateTime(timezone=True),
@@ -41,6 +42,12 @@ class Notification(Base):
             name="check_notification_type"
         ),
         Index("idx_notifications_user_id", "user_id"),
+        Index(
+            "idx_notifications_prescription_time",
+            "time",
+            postgresql_where=text("type = 'prescription'")
+        ),
+        {"postgresql_partition_by": "RANGE (time)"},
     )
 
     # Relationships
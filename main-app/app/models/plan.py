@@ -40,6 +40,12 @@ class Plan(Base):
         ),
         Index("idx_plans_user_id", "user_id"),
         Index("idx_plans_doctor_id", "doctor_id"),
+        # Нечеткий поиск по названию и описанию (pg_trgm)
+        Index("idx_plans_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index(
+            "idx_plans_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}
+        ),
     )
 
     # Relationships
@@ -0,0 +1,51 @@
+"""
+Модели агрегатов (rollup) статистики по дням
+"""
+from sqlalchemy import BigInteger, Column, Date, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class RollupWatermark(Base):
+    """Позиция фоновой агрегации: до какой строки исходной таблицы учтены агрегаты"""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True, comment="surveys, adherence")
+    last_id = Column(BigInteger, nullable=True, comment="Последний учтенный id (опросы)")
+    next_id = Column(BigInteger, nullable=True, comment="Максимальный id на момент прошлого прохода")
+    last_time = Column(DateTime(timezone=True), nullable=True, comment="Учтены строки раньше этого времени (уведомления)")
+    timezone = Column(String(64), nullable=True, comment="Часовой пояс границ дней агрегатов")
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class SurveyDailyRollup(Base):
+    """Оценки симптома за день (из surveys)"""
+    __tablename__ = "survey_daily_rollups"
+
+    symptom_id = Column(Integer, ForeignKey("symptoms.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    value_count = Column(Integer, nullable=False, comment="Количество опросов")
+    value_sum = Column(Integer, nullable=False, comment="Сумма оценок")
+    value_min = Column(Integer, nullable=False)
+    value_max = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("idx_survey_daily_rollups_user_id_day", "user_id", "day"),
+    )
+
+
+class AdherenceDailyRollup(Base):
+    """Напоминания о приеме препарата за день: отправлено и прочитано (из notifications)"""
+    __tablename__ = "adherence_daily_rollups"
+
+    prescription_id = Column(Integer, ForeignKey("medical_prescriptions.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    sent_count = Column(Integer, nullable=False, comment="Отправлено напоминаний")
+    read_count = Column(Integer, nullable=False, comment="Прочитано напоминаний")
+
+    __table_args__ = (
+        Index("idx_adherence_daily_rollups_user_id_day", "user_id", "day"),
+    )
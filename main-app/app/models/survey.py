@@ -12,9 +12,11 @@ class Survey(Base):
     """Опросы пациентов по симптомам"""
     __tablename__ = "surveys"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Ключ секционирования (секции по месяцам, app.services.partitions) - входит в первичный ключ
     date = Column(
         DateTime(timezone=True),
+        primary_key=True,
         nullable=False,
         server_default=func.now()
     )
@@ -25,7 +27,9 @@ class Survey(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint("value >= 0 AND value <= 10", name="check_survey_value_range"),
-        Index("idx_surveys_symptom_id", "symptom_id"),
+        # Опросы симптома за период (динамика симптомов); value в индексе - без чтения таблицы
+        Index("idx_surveys_symptom_id_date", "symptom_id", "date", postgresql_include=["value"]),
+        {"postgresql_partition_by": "RANGE (date)"},
     )
 
     # Relationships
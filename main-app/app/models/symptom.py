@@ -20,10 +20,18 @@ class Symptom(Base):
         nullable=False,
         server_default=func.now()
     )
+    next_survey_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        server_default=func.now(),
+        comment="Когда спросить об оценке симптома (NULL - план завершен)"
+    )
 
     # Constraints
     __table_args__ = (
         Index("idx_symptoms_plan_id", "plan_id"),
+        # Планировщик опросов читает только симптомы, которым пора задать вопрос
+        Index("idx_symptoms_next_survey_at", "next_survey_at"),
     )
 
     # Relationships
@@ -2,7 +2,6 @@
 Модуль для работы с промптами
 """
 from pathlib import Path
-import yaml
 from typing import Dict, Any
 
 
@@ -35,6 +34,9 @@ class PromptLoader:
         if not prompt_path.exists():
             raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
 
+        # PyYAML нужен только при сборке промпта - не замедляет старт API
+        import yaml
+
         with open(prompt_path, 'r', encoding='utf-8') as f:
             prompt_config = yaml.safe_load(f)
 
@@ -56,6 +58,22 @@ class PromptLoader:
 
         return user_prompt_template.format(**kwargs)
 
+    def format_repair_prompt(self, prompt_name: str, **kwargs) -> str:
+        """
+        Форматировать промпт для исправления невалидного ответа
+
+        Args:
+            prompt_name: Имя промпта
+            **kwargs: Параметры для подстановки в шаблон (response, error)
+
+        Returns:
+            Отформатированный промпт исправления
+        """
+        prompt_config = self.load_prompt(prompt_name)
+        repair_prompt_template = prompt_config.get('repair_prompt_template', '')
+
+        return repair_prompt_template.format(**kwargs)
+
     def get_system_prompt(self, prompt_name: str) -> str:
         """
         Получить системный промпт
@@ -130,4 +148,26 @@ def load_treatment_plan_prompt(treatment_plan_text: str) -> tuple[str, str, Dict
     )
     llm_parameters = prompt_loader.get_llm_parameters('extract_treatment_plan')
 
-    return system_prompt, user_prompt, llm_parameters
\ No newline at end of file
+    return system_prompt, user_prompt, llm_parameters
+
+
+def load_treatment_plan_repair_prompt(response: str, error: str) -> tuple[str, str, Dict[str, Any]]:
+    """
+    Загрузить промпт для исправления ответа с извлеченным планом лечения
+
+    Args:
+        response: Ответ LLM, не прошедший проверку
+        error: Описание ошибки разбора или проверки по схеме
+
+    Returns:
+        Кортеж (system_prompt, repair_prompt, llm_parameters)
+    """
+    system_prompt = prompt_loader.get_system_prompt('extract_treatment_plan')
+    repair_prompt = prompt_loader.format_repair_prompt(
+        'extract_treatment_plan',
+        response=response,
+        error=error
+    )
+    llm_parameters = prompt_loader.get_llm_parameters('extract_treatment_plan')
+
+    return system_prompt, repair_prompt, llm_parameters
@@ -17,6 +17,39 @@ from app.schemas.plan import (
     PlanUpdate,
     PlanRead,
     PlanFileUpload,
+    PlanSearchResult,
+    PlanSearchPage,
+)
+from app.schemas.medicin import (
+    MedicinBase,
+    MedicinCreate,
+    MedicinUpdate,
+    MedicinRead,
+    MedicinSearchResult,
+    MedicinSearchPage,
+    AtcClassBrief,
+    AtcClassRead,
+)
+from app.schemas.prescription import (
+    PrescriptionBase,
+    PrescriptionCreate,
+    PrescriptionUpdate,
+    PrescriptionRead,
+    PrescriptionWithMedicin,
+    AtcClassOverlap,
+    InteractionDrug,
+    InteractionWarning,
+    AdherenceDay,
+    PrescriptionAdherence,
+)
+from app.schemas.survey import (
+    SurveyBase,
+    SurveyCreate,
+    SurveyUpdate,
+    SurveyRead,
+    SurveyStatsBucket,
+    SymptomStats,
+    PlanSymptomStats,
 )
 
 __all__ = [
@@ -33,4 +66,31 @@ __all__ = [
     "PlanUpdate",
     "PlanRead",
     "PlanFileUpload",
+    "PlanSearchResult",
+    "PlanSearchPage",
+    "MedicinBase",
+    "MedicinCreate",
+    "MedicinUpdate",
+    "MedicinRead",
+    "MedicinSearchResult",
+    "MedicinSearchPage",
+    "AtcClassBrief",
+    "AtcClassRead",
+    "PrescriptionBase",
+    "PrescriptionCreate",
+    "PrescriptionUpdate",
+    "PrescriptionRead",
+    "PrescriptionWithMedicin",
+    "AtcClassOverlap",
+    "InteractionDrug",
+    "InteractionWarning",
+    "AdherenceDay",
+    "PrescriptionAdherence",
+    "SurveyBase",
+    "SurveyCreate",
+    "SurveyUpdate",
+    "SurveyRead",
+    "SurveyStatsBucket",
+    "SymptomStats",
+    "PlanSymptomStats",
 ]
\ No newline at end of file
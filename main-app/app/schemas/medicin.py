@@ -0,0 +1,59 @@
+"""
+Pydantic схемы для Medicin
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class MedicinBase(BaseModel):
+    """Базовая схема препарата справочника"""
+    name: str = Field(..., max_length=255)
+    international_name: str = Field(..., max_length=255)
+    form: str = Field(..., max_length=100)
+    atc_code: str = Field(..., max_length=20)
+
+
+class MedicinCreate(MedicinBase):
+    """Схема для создания препарата"""
+    instruction: str
+
+
+class MedicinUpdate(BaseModel):
+    """Схема для обновления препарата"""
+    name: Optional[str] = Field(None, max_length=255)
+    international_name: Optional[str] = Field(None, max_length=255)
+    form: Optional[str] = Field(None, max_length=100)
+    atc_code: Optional[str] = Field(None, max_length=20)
+    instruction: Optional[str] = None
+
+
+class MedicinRead(MedicinBase):
+    """Схема для чтения препарата"""
+    id: int
+
+    model_config = {"from_attributes": True}
+
+
+class MedicinSearchResult(MedicinRead):
+    """Препарат в результатах поиска"""
+    score: float = Field(..., description="Похожесть на запрос (0..1)")
+
+
+class MedicinSearchPage(BaseModel):
+    """Страница результатов поиска препаратов"""
+    items: List[MedicinSearchResult]
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (None - последняя)")
+
+
+class AtcClassBrief(BaseModel):
+    """Класс АТХ"""
+    code: str
+    level: int = Field(..., ge=1, le=5, description="1 - анатомическая группа, 5 - действующее вещество")
+    name: Optional[str] = None
+
+
+class AtcClassRead(AtcClassBrief):
+    """Класс АТХ с предками и подклассами из справочника"""
+    path: List[AtcClassBrief] = Field(..., description="Классы-предки от анатомической группы")
+    children: List[AtcClassBrief]
@@ -2,10 +2,12 @@
 Pydantic схемы для Plan
 """
 from datetime import date, datetime
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
+from app.schemas.prescription import InteractionWarning
+
 
 class PlanBase(BaseModel):
     """Базовая схема плана лечения"""
@@ -51,5 +53,20 @@ class PlanFileUpload(BaseModel):
     title: str
     file_path: str
     message: str
+    interactions: List[InteractionWarning] = Field(
+        default_factory=list,
+        description="Взаимодействия лекарств плана с действующими назначениями и дублирующая терапия"
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class PlanSearchResult(PlanRead):
+    """План лечения в результатах поиска"""
+    score: float = Field(..., description="Похожесть на запрос (0..1)")
+
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+class PlanSearchPage(BaseModel):
+    """Страница результатов поиска планов лечения"""
+    items: List[PlanSearchResult]
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (None - последняя)")
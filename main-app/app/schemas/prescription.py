@@ -0,0 +1,101 @@
+"""
+Pydantic схемы для MedicalPrescription
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.medicin import AtcClassBrief, MedicinRead
+
+PrescriptionStatus = Literal["active", "completed", "cancelled", "expired"]
+
+
+class PrescriptionBase(BaseModel):
+    """Базовая схема назначения"""
+    dosage: Decimal = Field(..., gt=0)
+    quantity: Decimal = Field(..., gt=0)
+    duration_days: int = Field(..., gt=0)
+    start_date: date
+    description: Optional[str] = None
+    status: PrescriptionStatus = "active"
+    repeat: str = Field(..., max_length=100, description="Частота приёма")
+    medicin_id: int
+
+
+class PrescriptionCreate(PrescriptionBase):
+    """Схема для создания назначения"""
+    plan_id: int
+
+
+class PrescriptionUpdate(BaseModel):
+    """Схема для обновления назначения"""
+    dosage: Optional[Decimal] = Field(None, gt=0)
+    quantity: Optional[Decimal] = Field(None, gt=0)
+    duration_days: Optional[int] = Field(None, gt=0)
+    start_date: Optional[date] = None
+    description: Optional[str] = None
+    status: Optional[PrescriptionStatus] = None
+    repeat: Optional[str] = Field(None, max_length=100)
+
+
+class PrescriptionRead(PrescriptionBase):
+    """Схема для чтения назначения"""
+    id: int
+    plan_id: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class PrescriptionWithMedicin(PrescriptionRead):
+    """Назначение с препаратом справочника"""
+    medicin: MedicinRead
+
+
+class AtcClassOverlap(BaseModel):
+    """Несколько разных препаратов пациента из одного класса АТХ"""
+    atc_class: AtcClassBrief
+    medicin_ids: List[int]
+    prescription_ids: List[int]
+
+
+class InteractionDrug(BaseModel):
+    """Препарат в предупреждении о взаимодействии"""
+    name: str
+    medicin_id: Optional[int] = None
+    atc_code: str = ""
+    source: Literal["plan", "prescription"] = Field(
+        ..., description="plan - лекарство загруженного плана, prescription - действующее назначение"
+    )
+    prescription_id: Optional[int] = None
+    plan_id: Optional[int] = None
+
+
+class InteractionWarning(BaseModel):
+    """Предупреждение о лекарственном взаимодействии или дублирующей терапии"""
+    kind: Literal["interaction", "duplicate"]
+    severity: Literal["minor", "moderate", "major", "contraindicated"]
+    description: str
+    atc_class: Optional[str] = Field(None, description="Общий класс АТХ (для дублирующей терапии)")
+    items: List[InteractionDrug]
+
+
+class AdherenceDay(BaseModel):
+    """Напоминания о приеме препарата за день"""
+    day: date
+    sent: int = Field(..., description="Отправлено напоминаний")
+    read: int = Field(..., description="Прочитано напоминаний")
+
+
+class PrescriptionAdherence(BaseModel):
+    """Соблюдение назначения за период по напоминаниям о приеме"""
+    prescription_id: int
+    timezone: str
+    date_from: date
+    date_to: date
+    sent: int
+    read: int
+    rate: Optional[float] = Field(None, description="Доля прочитанных напоминаний (нет напоминаний - null)")
+    days: List[AdherenceDay]
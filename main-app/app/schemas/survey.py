@@ -0,0 +1,64 @@
+"""
+Pydantic схемы для Survey
+"""
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SurveyBase(BaseModel):
+    """Базовая схема ответа на опрос по симптому"""
+    value: int = Field(..., ge=0, le=10, description="Оценка от 0 до 10")
+    user_answer: Optional[str] = None
+    symptom_id: int
+
+
+class SurveyCreate(SurveyBase):
+    """Схема для создания ответа на опрос"""
+    date: Optional[datetime] = None
+
+
+class SurveyUpdate(BaseModel):
+    """Схема для обновления ответа на опрос"""
+    value: Optional[int] = Field(None, ge=0, le=10)
+    user_answer: Optional[str] = None
+
+
+class SurveyRead(SurveyBase):
+    """Схема для чтения ответа на опрос"""
+    id: int
+    date: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class SurveyStatsBucket(BaseModel):
+    """Оценки симптома за день или неделю"""
+    start: date = Field(..., description="Начало интервала (день или понедельник недели)")
+    min: int
+    avg: float
+    max: int
+    count: int
+    change: Optional[float] = Field(None, description="Изменение среднего относительно предыдущего интервала")
+    smoothed: Optional[float] = Field(None, description="Скользящее среднее (при smooth > 1)")
+
+
+class SymptomStats(BaseModel):
+    """Динамика симптома"""
+    symptom_id: int
+    description: str
+    trend: Optional[float] = Field(
+        None, description="Наклон линейного тренда среднего, баллов в день (> 0 - симптом усиливается)"
+    )
+    buckets: List[SurveyStatsBucket]
+
+
+class PlanSymptomStats(BaseModel):
+    """Динамика симптомов плана лечения"""
+    plan_id: int
+    bucket: Literal["day", "week"]
+    timezone: str
+    date_from: date
+    date_to: date
+    symptoms: List[SymptomStats]
@@ -0,0 +1,213 @@
+"""
+Модуль анатомо-терапевтическо-химической классификации (АТХ / ATC).
+Код АТХ имеет пять уровней, каждый следующий продлевает предыдущий:
+J (анатомическая группа) -> J01 (терапевтическая) -> J01C (фармакологическая)
+-> J01CA (химическая) -> J01CA04 (действующее вещество). Поэтому класс -
+это префикс кода, а все препараты класса лежат в диапазоне строк
+[префикс, следующий префикс): такие запросы обслуживает индекс
+text_pattern_ops по medicins.atc_code без полного просмотра таблицы.
+"""
+
+import bisect
+import csv
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Длина кода на уровнях 1..5
+ATC_LEVEL_LENGTHS = (1, 3, 4, 5, 7)
+
+ATC_CODE_RE = re.compile(r"^[A-Z](?:\d{2}(?:[A-Z](?:[A-Z](?:\d{2})?)?)?)?$")
+
+# Уровень 1 - анатомические группы (остальные названия - из файла ATC_NAMES_PATH)
+ANATOMICAL_GROUPS = {
+    "A": "Пищеварительный тракт и обмен веществ",
+    "B": "Кроветворение и кровь",
+    "C": "Сердечно-сосудистая система",
+    "D": "Дерматология",
+    "G": "Мочеполовая система и половые гормоны",
+    "H": "Гормоны для системного использования (исключая половые гормоны и инсулины)",
+    "J": "Противомикробные препараты для системного использования",
+    "L": "Противоопухолевые препараты и иммуномодуляторы",
+    "M": "Костно-мышечная система",
+    "N": "Нервная система",
+    "P": "Противопаразитарные препараты, инсектициды и репелленты",
+    "R": "Дыхательная система",
+    "S": "Органы чувств",
+    "V": "Прочие препараты",
+}
+
+
+def atc_level(code: Optional[str]) -> int:
+    """
+    Уровень кода АТХ
+
+    Returns:
+        1..5 или 0, если код некорректный
+
+    Example:
+        >>> atc_level("J01CA")
+        4
+    """
+    if not code or not ATC_CODE_RE.match(code):
+        return 0
+    return ATC_LEVEL_LENGTHS.index(len(code)) + 1
+
+
+@lru_cache(maxsize=16384)
+def atc_ancestors(code: str) -> Tuple[str, ...]:
+    """
+    Классы, в которые входит код, от анатомической группы до самого кода
+
+    Кэшируется: кодов в справочнике - тысячи, а проверки назначений
+    разбирают одни и те же коды.
+
+    Example:
+        >>> atc_ancestors("J01CA04")
+        ('J', 'J01', 'J01C', 'J01CA', 'J01CA04')
+    """
+    level = atc_level(code)
+    return tuple(code[:length] for length in ATC_LEVEL_LENGTHS[:level])
+
+
+def atc_prefix_range(code: str) -> Tuple[str, str]:
+    """
+    Диапазон кодов класса: [нижняя граница, верхняя граница)
+
+    Сравнение побайтовое (операторы ~>=~ и ~<~, индекс text_pattern_ops).
+
+    Example:
+        >>> atc_prefix_range("J01C")
+        ('J01C', 'J01D')
+    """
+    return code, code[:-1] + chr(ord(code[-1]) + 1)
+
+
+def atc_common_class(first: str, second: str) -> Optional[str]:
+    """
+    Самый узкий общий класс двух кодов (None, если анатомические группы разные)
+
+    Example:
+        >>> atc_common_class("J01CA04", "J01CR02")
+        'J01C'
+    """
+    common = None
+    for a, b in zip(atc_ancestors(first), atc_ancestors(second)):
+        if a != b:
+            break
+        common = a
+    return common
+
+
+class AtcNode:
+    """Класс АТХ"""
+
+    __slots__ = ("code", "level", "name", "parent", "children")
+
+    def __init__(self, code: str, name: Optional[str] = None):
+        self.code = code
+        self.level = atc_level(code)
+        self.name = name
+        self.parent: Optional[str] = atc_ancestors(code)[-2] if self.level > 1 else None
+        self.children: List[str] = []
+
+    def to_dict(self) -> Dict[str, object]:
+        """Преобразование в словарь"""
+        return {"code": self.code, "level": self.level, "name": self.name}
+
+
+class AtcTree:
+    """
+    Дерево классов АТХ
+
+    Строится по кодам справочника medicins (и названиям классов из файла);
+    коды хранятся отсортированными, поэтому подклассы любого класса -
+    непрерывный отрезок, который находится двоичным поиском.
+
+    Example:
+        >>> tree = AtcTree.build(["J01CA04", "J01CR02", "N02BE01"])
+        >>> [node.code for node in tree.path("J01CA04")]
+        ['J', 'J01', 'J01C', 'J01CA', 'J01CA04']
+        >>> tree.descendants("J01C", level=5)
+        ['J01CA04', 'J01CR02']
+    """
+
+    def __init__(self, names: Optional[Dict[str, str]] = None):
+        self.names = {**ANATOMICAL_GROUPS, **(names or {})}
+        self.nodes: Dict[str, AtcNode] = {}
+        self._codes: List[str] = []
+
+    @classmethod
+    def build(cls, codes: Iterable[str], names: Optional[Dict[str, str]] = None) -> "AtcTree":
+        """Построить дерево по кодам (некорректные коды пропускаются)"""
+        tree = cls(names)
+        for code in codes:
+            for ancestor in atc_ancestors(code):
+                if ancestor not in tree.nodes:
+                    tree.nodes[ancestor] = AtcNode(ancestor, tree.names.get(ancestor))
+        tree._codes = sorted(tree.nodes)
+        for code in tree._codes:
+            node = tree.nodes[code]
+            if node.parent is not None:
+                tree.nodes[node.parent].children.append(code)
+        return tree
+
+    @staticmethod
+    def load_names(path: str) -> Dict[str, str]:
+        """
+        Названия классов из CSV (код, название; разделитель - запятая или точка с запятой)
+
+        Example:
+            >>> AtcTree.load_names("atc.csv")["J01CA"]
+            'Пенициллины широкого спектра действия'
+        """
+        names = {}
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            try:
+                delimiter = csv.Sniffer().sniff(f.readline(), delimiters=",;\t").delimiter
+            except csv.Error:
+                delimiter = ";"
+            f.seek(0)
+            for row in csv.reader(f, delimiter=delimiter):
+                if len(row) >= 2 and atc_level(row[0].strip().upper()):
+                    names[row[0].strip().upper()] = row[1].strip()
+        return names
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.nodes
+
+    def add(self, code: str) -> None:
+        """Добавить код (вместе с недостающими классами-предками)"""
+        parent = None
+        for ancestor in atc_ancestors(code):
+            if ancestor not in self.nodes:
+                self.nodes[ancestor] = AtcNode(ancestor, self.names.get(ancestor))
+                bisect.insort(self._codes, ancestor)
+                if parent is not None:
+                    bisect.insort(self.nodes[parent].children, ancestor)
+            parent = ancestor
+
+    def get(self, code: str) -> Optional[AtcNode]:
+        """Класс по коду"""
+        return self.nodes.get(code)
+
+    def path(self, code: str) -> List[AtcNode]:
+        """Класс и его предки, от анатомической группы"""
+        return [self.nodes[ancestor] for ancestor in atc_ancestors(code) if ancestor in self.nodes]
+
+    def descendants(self, code: str, level: Optional[int] = None) -> List[str]:
+        """
+        Коды подклассов (включая сам класс)
+
+        Args:
+            code: Код класса
+            level: Вернуть только коды этого уровня (5 - действующие вещества)
+        """
+        lower, upper = atc_prefix_range(code)
+        codes = self._codes[bisect.bisect_left(self._codes, lower):bisect.bisect_left(self._codes, upper)]
+        if level is not None:
+            codes = [item for item in codes if len(item) == ATC_LEVEL_LENGTHS[level - 1]]
+        return codes
@@ -3,12 +3,15 @@
 """
 import os
 import logging
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional
 
-from gigachat import GigaChat
-from gigachat.models import Chat, Messages, MessagesRole
+from app.core.metrics import record_gigachat_request, record_gigachat_usage
 
 
+if TYPE_CHECKING:
+    from gigachat import GigaChat
+    from gigachat.models import Chat
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,18 +35,30 @@ class GigaChatService:
         self.credentials = credentials or os.getenv('GC_AUTH_KEY')
         self.scope = scope or os.getenv('GC_SCOPE', 'GIGACHAT_API_CORP')
         self.verify_ssl_certs = verify_ssl_certs
+        # Адреса API (например, локальный gigachat_mock), по умолчанию - реальный GigaChat
+        self.base_url = os.getenv('GIGACHAT_BASE_URL') or None
+        self.auth_url = os.getenv('GIGACHAT_AUTH_URL') or None
         self._client = None
 
         if not self.credentials:
             raise ValueError("GigaChat credentials not provided. Set GC_AUTH_KEY environment variable.")
 
-    def __enter__(self):
-        """Вход в контекстный менеджер"""
-        self._client = GigaChat(
+    def _create_client(self) -> "GigaChat":
+        """Создание клиента GigaChat SDK"""
+        # SDK импортируется при первом запросе, а не при старте API
+        from gigachat import GigaChat
+
+        return GigaChat(
             credentials=self.credentials,
             scope=self.scope,
+            base_url=self.base_url,
+            auth_url=self.auth_url,
             verify_ssl_certs=self.verify_ssl_certs
         )
+
+    def __enter__(self):
+        """Вход в контекстный менеджер"""
+        self._client = self._create_client()
         self._client.__enter__()
         return self
 
@@ -53,6 +68,45 @@ class GigaChatService:
             self._client.__exit__(exc_type, exc_val, exc_tb)
             self._client = None
 
+    async def __aenter__(self):
+        """Вход в асинхронный контекстный менеджер"""
+        self._client = self._create_client()
+        await self._client.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Выход из асинхронного контекстного менеджера"""
+        if self._client:
+            await self._client.__aexit__(exc_type, exc_val, exc_tb)
+            self._client = None
+
+    @staticmethod
+    def _build_chat(
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        top_p: float
+    ) -> "Chat":
+        """Конвертация словарей сообщений в запрос GigaChat SDK"""
+        from gigachat.models import Chat, Messages, MessagesRole
+
+        role_map = {
+            "user": MessagesRole.USER,
+            "system": MessagesRole.SYSTEM,
+            "assistant": MessagesRole.ASSISTANT
+        }
+        gigachat_messages = [
+            Messages(role=role_map.get(msg["role"], MessagesRole.USER), content=msg["content"])
+            for msg in messages
+        ]
+
+        return Chat(
+            messages=gigachat_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p
+        )
+
     def chat(
         self,
         messages: List[Dict[str, str]],
@@ -88,35 +142,126 @@ class GigaChatService:
             raise RuntimeError("GigaChat client not initialized. Use 'with' statement.")
 
         try:
-            # Конвертируем словари в Messages объекты
-            gigachat_messages = []
-            for msg in messages:
-                role_map = {
-                    "user": MessagesRole.USER,
-                    "system": MessagesRole.SYSTEM,
-                    "assistant": MessagesRole.ASSISTANT
-                }
-                role = role_map.get(msg["role"], MessagesRole.USER)
-                gigachat_messages.append(Messages(role=role, content=msg["content"]))
-
-            # Создаем чат
-            chat = Chat(
-                messages=gigachat_messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                top_p=top_p
-            )
+            chat = self._build_chat(messages, temperature, max_tokens, top_p)
 
             # Отправляем запрос
             response = self._client.chat(chat)
+            record_gigachat_request("chat", "success")
+            record_gigachat_usage(response.usage)
 
             # Возвращаем ответ
             return response.choices[0].message.content
 
         except Exception as e:
+            record_gigachat_request("chat", "error")
+            logger.error(f"Error calling GigaChat API: {e}")
+            raise
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        top_p: float = 0.95
+    ) -> str:
+        """
+        Асинхронно отправить сообщения в чат и получить ответ
+
+        Параметры и результат такие же, как у chat().
+
+        Example:
+            >>> async with GigaChatService() as giga:
+            ...     response = await giga.achat([{"role": "user", "content": "Привет!"}])
+        """
+        if not self._client:
+            raise RuntimeError("GigaChat client not initialized. Use 'async with' statement.")
+
+        try:
+            chat = self._build_chat(messages, temperature, max_tokens, top_p)
+            response = await self._client.achat(chat)
+            record_gigachat_request("achat", "success")
+            record_gigachat_usage(response.usage)
+            return response.choices[0].message.content
+
+        except Exception as e:
+            record_gigachat_request("achat", "error")
             logger.error(f"Error calling GigaChat API: {e}")
             raise
 
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        top_p: float = 0.95
+    ) -> Iterator[str]:
+        """
+        Отправить сообщения в чат и получать ответ по частям (streaming API)
+
+        Параметры такие же, как у chat().
+
+        Yields:
+            Фрагменты текста ответа по мере генерации
+
+        Example:
+            >>> with GigaChatService() as giga:
+            ...     for chunk in giga.stream_chat([{"role": "user", "content": "Привет!"}]):
+            ...         print(chunk, end="")
+        """
+        if not self._client:
+            raise RuntimeError("GigaChat client not initialized. Use 'with' statement.")
+
+        try:
+            chat = self._build_chat(messages, temperature, max_tokens, top_p)
+            for chunk in self._client.stream(chat):
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    yield content
+            # Чанки потока не содержат usage - учитываем только сам запрос
+            record_gigachat_request("stream_chat", "success")
+
+        except Exception as e:
+            record_gigachat_request("stream_chat", "error")
+            logger.error(f"Error streaming from GigaChat API: {e}")
+            raise
+
+    async def astream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        top_p: float = 0.95
+    ) -> AsyncIterator[str]:
+        """
+        Асинхронно получать ответ по частям (streaming API)
+
+        Параметры такие же, как у chat().
+
+        Yields:
+            Фрагменты текста ответа по мере генерации
+
+        Example:
+            >>> async with GigaChatService() as giga:
+            ...     async for chunk in giga.astream_chat([{"role": "user", "content": "Привет!"}]):
+            ...         print(chunk, end="")
+        """
+        if not self._client:
+            raise RuntimeError("GigaChat client not initialized. Use 'async with' statement.")
+
+        try:
+            chat = self._build_chat(messages, temperature, max_tokens, top_p)
+            async for chunk in self._client.astream(chat):
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    yield content
+            # Чанки потока не содержат usage - учитываем только сам запрос
+            record_gigachat_request("astream_chat", "success")
+
+        except Exception as e:
+            record_gigachat_request("astream_chat", "error")
+            logger.error(f"Error streaming from GigaChat API: {e}")
+            raise
+
     def simple_chat(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """
         Простой чат с одним сообщением
@@ -0,0 +1,345 @@
+"""
+Модуль проверки лекарственных взаимодействий.
+Правила взаимодействий задаются парами ключей: класс АТХ любого уровня
+(взаимодействие действует на все препараты класса) или id препарата
+справочника. Матрица правил хранится в памяти; при проверке ключи
+препаратов пациента нумеруются битами: у каждого препарата - маска ключей,
+в которые он входит, и маска ключей-партнеров, поэтому все пары назначений
+проверяются за один проход операциями над целыми числами, без обращений к БД.
+Помимо правил, проверяется дублирующая терапия: одно действующее вещество
+или одна химическая группа АТХ в разных назначениях.
+"""
+
+import csv
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from app import crud
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.services.atc import atc_ancestors, atc_level
+
+logger = logging.getLogger(__name__)
+
+# По возрастанию опасности
+SEVERITIES = ("minor", "moderate", "major", "contraindicated")
+
+# Ключ препарата справочника в файле правил: id:<medicin_id>
+MEDICIN_KEY_PREFIX = "id:"
+
+# Дублирующая терапия: уровень АТХ -> (важность, описание)
+DUPLICATE_LEVELS = {
+    5: ("major", "Одно действующее вещество в нескольких назначениях"),
+    4: ("moderate", "Препараты одной химической группы АТХ в нескольких назначениях"),
+}
+
+
+class InteractionRule(NamedTuple):
+    """Правило взаимодействия двух классов АТХ (или препаратов справочника)"""
+    first: str
+    second: str
+    severity: str
+    description: str
+
+
+class DrugItem(NamedTuple):
+    """Препарат для проверки: лекарство нового плана или действующее назначение"""
+    name: str
+    medicin_id: Optional[int]
+    atc_code: str
+    source: str  # plan - лекарство из загруженного плана, prescription - действующее назначение
+    prescription_id: Optional[int] = None
+    plan_id: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразование в словарь"""
+        return self._asdict()
+
+
+def _rule_key(value: str) -> Optional[str]:
+    value = value.strip()
+    if value.lower().startswith(MEDICIN_KEY_PREFIX):
+        medicin_id = value[len(MEDICIN_KEY_PREFIX):].strip()
+        return f"{MEDICIN_KEY_PREFIX}{int(medicin_id)}" if medicin_id.isdigit() else None
+    value = value.upper()
+    return value if atc_level(value) else None
+
+
+def load_rules(path: str) -> List[InteractionRule]:
+    """
+    Правила из CSV: ключ_1;ключ_2;важность;описание
+
+    Ключ - код класса АТХ любого уровня или id:<id препарата справочника>.
+    Строки с некорректными ключами или важностью пропускаются с предупреждением.
+
+    Example:
+        B01AA;M01A;major;Повышение риска кровотечений
+    """
+    rules = []
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for line_no, row in enumerate(csv.reader(f, delimiter=";"), 1):
+            if not row or row[0].startswith("#"):
+                continue
+            if len(row) < 3:
+                logger.warning(f"{path}:{line_no}: ожидается ключ_1;ключ_2;важность;описание")
+                continue
+            first, second = _rule_key(row[0]), _rule_key(row[1])
+            severity = row[2].strip().lower()
+            if first is None or second is None or severity not in SEVERITIES:
+                # Заголовок файла сюда тоже попадает - без предупреждения
+                if line_no > 1:
+                    logger.warning(f"{path}:{line_no}: некорректное правило {row!r}")
+                continue
+            rules.append(InteractionRule(first, second, severity, row[3].strip() if len(row) > 3 else ""))
+    return rules
+
+
+def drug_keys(medicin_id: Optional[int], atc_code: Optional[str]) -> List[str]:
+    """
+    Ключи правил, под которые попадает препарат
+
+    Example:
+        >>> drug_keys(12, "B01AA03")
+        ['id:12', 'B', 'B01', 'B01A', 'B01AA', 'B01AA03']
+    """
+    keys = [f"{MEDICIN_KEY_PREFIX}{medicin_id}"] if medicin_id is not None else []
+    if atc_code:
+        keys.extend(atc_ancestors(atc_code))
+    return keys
+
+
+class InteractionMatrix:
+    """
+    Матрица взаимодействий в битовых масках
+
+    Example:
+        >>> matrix = InteractionMatrix([InteractionRule("B01AA", "M01A", "major", "Кровотечения")])
+        >>> warnings = matrix.check([warfarin, ibuprofen])
+        >>> warnings[0]["severity"]
+        'major'
+    """
+
+    def __init__(self, rules: Iterable[InteractionRule] = ()):
+        # Ключ -> ключи, с которыми есть правило
+        self._partners: Dict[str, Set[str]] = defaultdict(set)
+        self._rules: Dict[Tuple[str, str], InteractionRule] = {}
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self) -> int:
+        return len({id(rule) for rule in self._rules.values()})
+
+    def add(self, rule: InteractionRule) -> None:
+        """Добавить правило (из двух правил для одной пары остается более опасное)"""
+        self._partners[rule.first].add(rule.second)
+        self._partners[rule.second].add(rule.first)
+        current = self._rules.get((rule.first, rule.second))
+        if current is None or SEVERITIES.index(rule.severity) > SEVERITIES.index(current.severity):
+            self._rules[(rule.first, rule.second)] = rule
+            self._rules[(rule.second, rule.first)] = rule
+
+    def _masks(self, items: List[DrugItem]) -> List[Tuple[int, int]]:
+        """
+        (маска ключей препарата, маска ключей-партнеров) для каждого препарата
+
+        Биты - только ключи правил, встречающиеся у этих препаратов (не больше
+        шести на препарат), поэтому маски короткие при любом размере матрицы.
+        """
+        item_keys = [
+            [key for key in drug_keys(item.medicin_id, item.atc_code) if key in self._partners]
+            for item in items
+        ]
+        present = {key for keys in item_keys for key in keys}
+        bits = {key: 1 << position for position, key in enumerate(present)}
+        partner_bits = {}
+        for key in present:
+            mask = 0
+            for partner in self._partners[key] & present:
+                mask |= bits[partner]
+            partner_bits[key] = mask
+
+        masks = []
+        for keys in item_keys:
+            mask = partners = 0
+            for key in keys:
+                mask |= bits[key]
+                partners |= partner_bits[key]
+            masks.append((mask, partners))
+        return masks
+
+    def _rule_for(self, first: DrugItem, second: DrugItem) -> Optional[InteractionRule]:
+        # Пара найдена по маскам - ищем самое опасное из сработавших правил
+        best = None
+        for a in drug_keys(first.medicin_id, first.atc_code):
+            for b in drug_keys(second.medicin_id, second.atc_code):
+                rule = self._rules.get((a, b))
+                if rule is not None and (best is None or SEVERITIES.index(rule.severity) > SEVERITIES.index(best.severity)):
+                    best = rule
+        return best
+
+    def check(self, items: List[DrugItem]) -> List[Dict[str, Any]]:
+        """
+        Взаимодействия между препаратами
+
+        Пары из двух действующих назначений не проверяются: предупреждения
+        касаются только лекарств нового плана.
+
+        Returns:
+            Предупреждения (kind="interaction") по убыванию важности
+        """
+        masks = self._masks(items)
+        warnings = []
+        for i, (_, partners) in enumerate(masks):
+            if not partners:
+                continue
+            for j in range(i + 1, len(items)):
+                if not partners & masks[j][0]:
+                    continue
+                if items[i].source != "plan" and items[j].source != "plan":
+                    continue
+                rule = self._rule_for(items[i], items[j])
+                if rule is not None:
+                    warnings.append({
+                        "kind": "interaction",
+                        "severity": rule.severity,
+                        "description": rule.description,
+                        "atc_class": None,
+                        "items": [items[i].to_dict(), items[j].to_dict()],
+                    })
+        warnings.sort(key=lambda warning: -SEVERITIES.index(warning["severity"]))
+        return warnings
+
+
+def find_duplicates(items: List[DrugItem]) -> List[Dict[str, Any]]:
+    """
+    Дублирующая терапия: препараты одного вещества (уровень 5) или одной
+    химической группы АТХ (уровень 4), среди которых есть лекарство нового плана
+
+    Returns:
+        Предупреждения (kind="duplicate"), по одному на класс
+    """
+    warnings = []
+    reported = set()
+    for level in sorted(DUPLICATE_LEVELS, reverse=True):
+        groups: Dict[str, List[int]] = {}
+        for index, item in enumerate(items):
+            ancestors = atc_ancestors(item.atc_code) if item.atc_code else ()
+            if len(ancestors) >= level:
+                groups.setdefault(ancestors[level - 1], []).append(index)
+            elif level == 5 and item.medicin_id is not None:
+                # Препарат справочника без кода АТХ - дубликат только сам с собой
+                groups.setdefault(f"{MEDICIN_KEY_PREFIX}{item.medicin_id}", []).append(index)
+
+        severity, description = DUPLICATE_LEVELS[level]
+        for atc_class, indexes in groups.items():
+            if len(indexes) < 2 or all(items[i].source != "plan" for i in indexes):
+                continue
+            # Группа уже целиком вошла в предупреждение о том же веществе
+            members = frozenset(indexes)
+            if any(members <= previous for previous in reported):
+                continue
+            reported.add(members)
+            warnings.append({
+                "kind": "duplicate",
+                "severity": severity,
+                "description": description,
+                "atc_class": None if atc_class.startswith(MEDICIN_KEY_PREFIX) else atc_class,
+                "items": [items[i].to_dict() for i in indexes],
+            })
+    return warnings
+
+
+class InteractionChecker:
+    """
+    Проверка лекарств нового плана против действующих назначений пациента
+
+    Файл правил загружается при первой проверке.
+
+    Example:
+        >>> interaction_checker.check(plan_items + prescription_items)
+        [{'kind': 'interaction', 'severity': 'major', ...}]
+    """
+
+    def __init__(self, rules_path: Optional[str] = None):
+        self.rules_path = rules_path
+        self._matrix: Optional[InteractionMatrix] = None
+        self._lock = threading.Lock()
+
+    @property
+    def matrix(self) -> InteractionMatrix:
+        if self._matrix is None:
+            with self._lock:
+                if self._matrix is None:
+                    rules = load_rules(self.rules_path) if self.rules_path else []
+                    self._matrix = InteractionMatrix(rules)
+                    logger.info(f"Загружено правил лекарственных взаимодействий: {len(self._matrix)}")
+        return self._matrix
+
+    def check(self, items: List[DrugItem]) -> List[Dict[str, Any]]:
+        """
+        Все предупреждения: взаимодействия по правилам и дублирующая терапия
+
+        Returns:
+            Предупреждения по убыванию важности
+        """
+        warnings = self.matrix.check(items) + find_duplicates(items)
+        warnings.sort(key=lambda warning: -SEVERITIES.index(warning["severity"]))
+        return warnings
+
+
+# Глобальный экземпляр сервиса
+interaction_checker = InteractionChecker(settings.DRUG_INTERACTIONS_PATH)
+
+
+def plan_drug_items(medications: List[Dict[str, Any]]) -> List[DrugItem]:
+    """
+    Лекарства извлеченного плана (после сопоставления со справочником)
+
+    Example:
+        >>> plan_drug_items(parsed_response.get("medications") or [])
+        [DrugItem(name='Варфарин', medicin_id=12, atc_code='B01AA03', source='plan', ...)]
+    """
+    items = []
+    for medication in medications:
+        match = medication.get("medicin_match") or {}
+        items.append(DrugItem(
+            name=medication.get("name") or match.get("name") or "",
+            medicin_id=medication.get("medicin_id"),
+            atc_code=match.get("atc_code") or "",
+            source="plan",
+        ))
+    return items
+
+
+def prescription_drug_items(plans: Iterable[Any]) -> List[DrugItem]:
+    """
+    Действующие назначения из активных планов (CRUDPlan.get_active_plans с назначениями)
+    """
+    return [
+        DrugItem(
+            name=prescription.medicin.name,
+            medicin_id=prescription.medicin_id,
+            atc_code=prescription.medicin.atc_code,
+            source="prescription",
+            prescription_id=prescription.id,
+            plan_id=plan.id,
+        )
+        for plan in plans
+        for prescription in plan.prescriptions
+        if prescription.status == "active"
+    ]
+
+
+async def load_active_prescriptions(user_id: int) -> List[DrugItem]:
+    """
+    Действующие назначения пациента по всем активным планам (один запрос планов
+    и по одному запросу назначений и препаратов)
+
+    Args:
+        user_id: ID пользователя
+    """
+    async with async_session_maker() as db:
+        plans = await crud.plan.get_active_plans(db, user_id=user_id, with_prescriptions=True)
+    return prescription_drug_items(plans)
@@ -0,0 +1,121 @@
+"""
+Модуль для инкрементального разбора JSON из потокового ответа LLM.
+Отдает каждый элемент массивов верхнего уровня (лекарство, обследование)
+сразу после его закрытия, не дожидаясь конца ответа.
+"""
+
+from typing import Any, Iterable, List, Optional, Tuple
+
+import orjson
+
+from app.services.response_parser import remove_trailing_commas
+
+
+class IncrementalJSONParser:
+    """
+    Потоковый разбор JSON-объекта с выделением элементов массивов
+
+    Отслеживаются только массивы верхнего уровня корневого объекта
+    (например, "medications"): каждый их элемент возвращается из feed(),
+    как только закрывается. Текст до первой "{" (markdown, пояснения)
+    пропускается.
+
+    Example:
+        >>> parser = IncrementalJSONParser(["medications"])
+        >>> for chunk in chunks:
+        ...     for key, item in parser.feed(chunk):
+        ...         print(key, item)
+    """
+
+    def __init__(self, watch_keys: Optional[Iterable[str]] = None):
+        """
+        Инициализация парсера
+
+        Args:
+            watch_keys: Ключи массивов, элементы которых нужно отдавать
+                (если None, отдаются элементы всех массивов верхнего уровня)
+        """
+        self.watch_keys = set(watch_keys) if watch_keys is not None else None
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._array_key: Optional[str] = None
+        self._item_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """Весь полученный текст ответа"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Передать очередной фрагмент ответа
+
+        Args:
+            chunk: Фрагмент текста ответа
+
+        Returns:
+            Список пар (ключ массива, элемент), закрывшихся в этом фрагменте
+        """
+        self._text += chunk
+
+        items: List[Tuple[str, Any]] = []
+        text = self._text
+        for index in range(self._pos, len(text)):
+            char = text[index]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = self._parse_item(text[self._string_start:index + 1])
+                continue
+
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in "{[":
+                if self._depth == 1 and char == "[":
+                    self._array_key = self._last_key
+                elif self._depth == 2 and self._is_watched():
+                    self._item_start = index
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._item_start is not None:
+                    item = self._parse_item(text[self._item_start:index + 1])
+                    if item is not None:
+                        items.append((self._array_key, item))
+                    self._item_start = None
+                elif self._depth == 1:
+                    self._array_key = None
+
+        self._pos = len(text)
+        return items
+
+    def _is_watched(self) -> bool:
+        """Отслеживается ли текущий массив"""
+        if self._array_key is None:
+            return False
+        return self.watch_keys is None or self._array_key in self.watch_keys
+
+    @staticmethod
+    def _parse_item(item_text: str) -> Optional[Any]:
+        """Разбор фрагмента JSON; некорректный фрагмент пропускается"""
+        try:
+            return orjson.loads(remove_trailing_commas(item_text))
+        except orjson.JSONDecodeError:
+            return None
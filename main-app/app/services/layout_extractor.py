@@ -0,0 +1,188 @@
+"""
+Модуль для извлечения текста из PDF с учетом верстки.
+Восстанавливает порядок чтения и таблицы (например, колонки
+препарат / дозировка / частота) по координатам слов PyMuPDF
+и выдает компактный markdown для отправки в LLM.
+"""
+
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
+
+# Слово: (x0, y0, x1, y1, текст)
+Word = Tuple[float, float, float, float, str]
+
+
+class _Line:
+    """Визуальная строка страницы, разбитая на ячейки по крупным разрывам"""
+
+    def __init__(self, words: List[Word], column_gap: float):
+        words = sorted(words, key=lambda w: w[0])
+        self.y0 = min(w[1] for w in words)
+        self.y1 = max(w[3] for w in words)
+        self.height = self.y1 - self.y0
+
+        # Ячейки: (x0, текст)
+        self.cells: List[Tuple[float, str]] = []
+        current = [words[0]]
+        for prev, word in zip(words, words[1:]):
+            if word[0] - prev[2] > column_gap * self.height:
+                self.cells.append(self._make_cell(current))
+                current = []
+            current.append(word)
+        self.cells.append(self._make_cell(current))
+
+    @staticmethod
+    def _make_cell(words: List[Word]) -> Tuple[float, str]:
+        return words[0][0], " ".join(w[4] for w in words)
+
+    @property
+    def text(self) -> str:
+        return " ".join(text for _, text in self.cells)
+
+
+class LayoutExtractor:
+    """Извлечение текста страницы PDF в порядке чтения с восстановлением таблиц"""
+
+    LINE_OVERLAP = 0.5  # Минимальное вертикальное перекрытие слова со строкой (доля высоты)
+    COLUMN_GAP = 0.8  # Разрыв между словами (в высотах строки), начинающий новую ячейку
+    COLUMN_TOLERANCE = 0.75  # Допуск выравнивания колонок (в высотах строки)
+    PARAGRAPH_GAP = 1.0  # Вертикальный отступ (в высотах строки), начинающий новый абзац
+    MIN_TABLE_ROWS = 2  # Минимум строк, чтобы считать блок таблицей
+
+    def extract(self, page: "fitz.Page") -> str:
+        """
+        Извлечение текста страницы в виде компактного markdown
+
+        Args:
+            page: Страница PDF
+
+        Returns:
+            Текст страницы; таблицы оформлены как markdown-таблицы
+        """
+        lines = self._build_lines(page)
+        if not lines:
+            return ""
+
+        output: List[str] = []
+        prev: Optional[_Line] = None
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            if prev is not None and line.y0 - prev.y1 > self.PARAGRAPH_GAP * line.height:
+                output.append("")
+
+            table_end, rows = self._collect_table(lines, i)
+            if table_end - i >= self.MIN_TABLE_ROWS:
+                output.append(self._format_table(rows))
+                prev = lines[table_end - 1]
+                i = table_end
+                continue
+
+            output.append(line.text)
+            prev = line
+            i += 1
+
+        return "\n".join(output)
+
+    def _build_lines(self, page: "fitz.Page") -> List[_Line]:
+        """Группировка слов страницы в визуальные строки сверху вниз"""
+        words = [w[:5] for w in page.get_text("words") if w[4].strip()]
+        words.sort(key=lambda w: (w[3], w[0]))
+
+        groups: List[List[Word]] = []
+        for word in words:
+            height = word[3] - word[1]
+            group = groups[-1] if groups else None
+            if group is not None:
+                y0 = min(w[1] for w in group)
+                y1 = max(w[3] for w in group)
+                overlap = min(y1, word[3]) - max(y0, word[1])
+                if overlap >= self.LINE_OVERLAP * min(height, y1 - y0):
+                    group.append(word)
+                    continue
+            groups.append([word])
+
+        return [_Line(group, self.COLUMN_GAP) for group in groups]
+
+    def _collect_table(self, lines: List[_Line], start: int) -> Tuple[int, List[List[str]]]:
+        """
+        Сбор строк таблицы, начиная с заданной строки
+
+        Заголовок таблицы задает колонки: первая строка должна состоять
+        минимум из двух ячеек. Последующие строки с ячейками, выровненными
+        по колонкам, становятся строками таблицы; строка из одной ячейки
+        под колонкой, отличной от первой, считается переносом текста в ячейке.
+
+        Returns:
+            Кортеж (индекс строки после таблицы, строки таблицы)
+        """
+        header = lines[start]
+        if len(header.cells) < 2:
+            return start, []
+
+        columns = [x0 for x0, _ in header.cells]
+        rows = [[text for _, text in header.cells]]
+
+        end = start + 1
+        while end < len(lines):
+            line = lines[end]
+            tolerance = self.COLUMN_TOLERANCE * line.height
+            indexes = [self._column_index(columns, x0, tolerance) for x0, _ in line.cells]
+            if None in indexes or indexes != sorted(set(indexes)):
+                break
+
+            if len(line.cells) == 1:
+                # Перенос строки внутри ячейки
+                if indexes[0] == 0:
+                    break
+                rows[-1][indexes[0]] = f"{rows[-1][indexes[0]]} {line.cells[0][1]}".strip()
+            else:
+                row = [""] * len(columns)
+                for index, (_, text) in zip(indexes, line.cells):
+                    row[index] = text
+                rows.append(row)
+            end += 1
+
+        if len(rows) < self.MIN_TABLE_ROWS:
+            return start, []
+        return end, rows
+
+    @staticmethod
+    def _column_index(columns: List[float], x0: float, tolerance: float) -> Optional[int]:
+        """Индекс колонки, с которой выровнена ячейка, или None"""
+        for index, column_x0 in enumerate(columns):
+            if abs(column_x0 - x0) <= tolerance:
+                return index
+        return None
+
+    @staticmethod
+    def _format_table(rows: List[List[str]]) -> str:
+        """Оформление строк таблицы как markdown"""
+        def format_row(row: List[str]) -> str:
+            return "| " + " | ".join(cell.replace("|", "/") for cell in row) + " |"
+
+        separator = "|" + "|".join(" --- " for _ in rows[0]) + "|"
+        return "\n".join([format_row(rows[0]), separator] + [format_row(row) for row in rows[1:]])
+
+
+# Глобальный экземпляр экстрактора
+layout_extractor = LayoutExtractor()
+
+
+def extract_layout_text(page: "fitz.Page") -> str:
+    """
+    Извлечь текст страницы с учетом верстки и таблиц
+
+    Args:
+        page: Страница PDF
+
+    Returns:
+        Текст страницы в компактном markdown
+
+    Example:
+        >>> with fitz.open("/path/to/plan.pdf") as doc:
+        ...     print(extract_layout_text(doc[0]))
+    """
+    return layout_extractor.extract(page)
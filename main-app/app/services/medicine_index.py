@@ -0,0 +1,290 @@
+"""
+Модуль поиска препаратов справочника medicins по названию.
+Названия из плана лечения (ответ GigaChat, разбор по правилам) приводятся
+к единому ключу: нижний регистр, транслитерация кириллицы и латиницы
+в общий алфавит ("Amoxicillin" и "Амоксициллин" дают один ключ), без
+дозировок и лекарственных форм. Нечеткий поиск - по спискам триграмм ключей
+с отсечением кандидатов по самым редким триграммам запроса, поэтому
+поиск занимает доли миллисекунды и не обращается к БД.
+"""
+
+import math
+import re
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from app.services.rule_extractor import FORMS
+
+# Кириллица -> латиница; е/ё/э, и/й/ы сводятся к одной букве, чтобы
+# ключ не зависел от варианта написания
+CYRILLIC_TO_LATIN = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "h", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "",
+    "ы": "i", "ь": "", "э": "e", "ю": "iu", "я": "ia",
+})
+
+# Латинские буквы, совпадающие по начертанию с кириллическими (OCR, ручной ввод)
+HOMOGLYPHS = str.maketrans("aceopxyk", "асеорхук")
+
+# Латинское написание МНН -> произношение, как его передает русская транслитерация
+LATIN_RULES = [
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"th"), "t"),
+    (re.compile(r"[ck]h"), "h"),
+    (re.compile(r"ck"), "k"),
+    (re.compile(r"x"), "ks"),
+    (re.compile(r"qu"), "kv"),
+    (re.compile(r"q"), "k"),
+    (re.compile(r"c(?=[eiy])"), "ts"),
+    (re.compile(r"c"), "k"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"[jy]"), "i"),
+    (re.compile(r"[ao]e"), "e"),
+    # omeprazole / омепразол, amlodipine / амлодипин
+    (re.compile(r"(?<=\w[^aeiou])e$"), ""),
+]
+
+DOUBLE_LETTER_RE = re.compile(r"(.)\1+")
+WORD_RE = re.compile(r"[a-zа-яё]+")
+CYRILLIC_RE = re.compile(r"[а-яё]")
+
+# Единицы дозировки и сокращения форм выпуска, не входящие в название
+UNIT_WORDS = {
+    "мг", "мкг", "мл", "г", "ед", "ме", "тыс", "табл", "таб", "капс", "амп", "фл",
+    "р", "д", "для", "по", "шт", "уп", "mg", "mcg", "ml", "g", "iu", "tab", "caps",
+}
+
+MIN_TOKEN_LENGTH = 4  # Отдельные слова короче не ищутся
+TOKEN_MATCH_PENALTY = 0.9  # Совпадение по одному слову названия весит меньше совпадения целиком
+
+
+def _word_key(word: str) -> str:
+    if CYRILLIC_RE.search(word):
+        word = word.translate(HOMOGLYPHS).translate(CYRILLIC_TO_LATIN)
+    else:
+        for pattern, replacement in LATIN_RULES:
+            word = pattern.sub(replacement, word)
+    return DOUBLE_LETTER_RE.sub(r"\1", word)
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """
+    Ключ названия препарата для поиска
+
+    Args:
+        name: Торговое или международное название в любой раскладке
+
+    Returns:
+        Нормализованный ключ (пустая строка, если в названии нет букв)
+
+    Example:
+        >>> normalize_name("Амоксициллин 500 мг, капсулы") == normalize_name("Amoxicillin")
+        True
+    """
+    if not name:
+        return ""
+    words = WORD_RE.findall(name.lower())
+    significant = [
+        word for word in words
+        if word not in UNIT_WORDS and not word.startswith(tuple(FORMS))
+    ]
+    # Название целиком из служебных слов ("Мазь") оставляем как есть
+    return " ".join(_word_key(word) for word in significant or words)
+
+
+def trigrams(key: str) -> FrozenSet[str]:
+    """Триграммы ключа с границами слов"""
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class MedicineEntry:
+    """Препарат справочника (поля, нужные для поиска и ответа)"""
+
+    __slots__ = ("id", "name", "international_name", "form", "atc_code")
+
+    def __init__(self, id: int, name: str, international_name: str, form: str, atc_code: str):
+        self.id = id
+        self.name = name
+        self.international_name = international_name
+        self.form = form
+        self.atc_code = atc_code
+
+
+class MedicineMatch:
+    """Найденный препарат"""
+
+    def __init__(self, entry: MedicineEntry, score: float, matched_by: str):
+        self.entry = entry
+        self.score = score
+        self.matched_by = matched_by  # name - по торговому названию, international_name - по МНН
+
+    @property
+    def medicin_id(self) -> int:
+        return self.entry.id
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразование в словарь"""
+        return {
+            "medicin_id": self.entry.id,
+            "name": self.entry.name,
+            "international_name": self.entry.international_name,
+            "form": self.entry.form,
+            "atc_code": self.entry.atc_code,
+            "score": round(self.score, 3),
+            "matched_by": self.matched_by,
+        }
+
+
+class MedicineIndex:
+    """
+    Индекс справочника препаратов в памяти
+
+    Для каждой строки индексируются два ключа: торговое название (name)
+    и МНН (international_name), так что торговое название связано с МНН,
+    а поиск по МНН находит все препараты с этим действующим веществом.
+
+    Example:
+        >>> index = MedicineIndex.build(entries)
+        >>> index.lookup("Амоксиклав 875 мг")[0].entry.international_name
+        'Амоксициллин + Клавулановая кислота'
+    """
+
+    def __init__(self):
+        self.entries: Dict[int, MedicineEntry] = {}
+        self.max_id = 0
+        # Ключ -> {id строки: поле, по которому совпал ключ}
+        self._ids_by_key: Dict[str, Dict[int, str]] = defaultdict(dict)
+        self._grams_by_key: Dict[str, FrozenSet[str]] = {}
+        self._keys_by_gram: Dict[str, Set[str]] = defaultdict(set)
+
+    @classmethod
+    def build(cls, entries: Iterable[MedicineEntry]) -> "MedicineIndex":
+        """Построить индекс по строкам справочника"""
+        index = cls()
+        for entry in entries:
+            index.add(entry)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _add_key(self, key: str, entry_id: int, field: str) -> None:
+        if not key:
+            return
+        ids = self._ids_by_key[key]
+        # Строка-дженерик (название = МНН) считается совпадением по названию
+        if ids.get(entry_id) != "name":
+            ids[entry_id] = field
+        if key not in self._grams_by_key:
+            grams = trigrams(key)
+            self._grams_by_key[key] = grams
+            for gram in grams:
+                self._keys_by_gram[gram].add(key)
+
+    def _remove_key(self, key: str, entry_id: int) -> None:
+        ids = self._ids_by_key.get(key)
+        if ids is None:
+            return
+        ids.pop(entry_id, None)
+        if ids:
+            return
+        del self._ids_by_key[key]
+        for gram in self._grams_by_key.pop(key, ()):
+            keys = self._keys_by_gram[gram]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_gram[gram]
+
+    def add(self, entry: MedicineEntry) -> None:
+        """Добавить или обновить строку справочника"""
+        self.discard(entry.id)
+        self.entries[entry.id] = entry
+        self.max_id = max(self.max_id, entry.id)
+
+        self._add_key(normalize_name(entry.name), entry.id, "name")
+        self._add_key(normalize_name(entry.international_name), entry.id, "international_name")
+
+    def discard(self, entry_id: int) -> None:
+        """Удалить строку справочника из индекса"""
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        self._remove_key(normalize_name(entry.name), entry_id)
+        self._remove_key(normalize_name(entry.international_name), entry_id)
+
+    def _similar_keys(self, key: str, min_score: float) -> Dict[str, float]:
+        """Ключи индекса с похожестью по Жаккару на триграммах не ниже min_score"""
+        grams = trigrams(key)
+        needed = max(1, math.ceil(min_score * len(grams)))
+        # Ключ с похожестью >= min_score делит с запросом не меньше needed триграмм,
+        # значит, встречается хотя бы в одном из (len - needed + 1) самых редких списков
+        postings = sorted((self._keys_by_gram.get(gram, ()) for gram in grams), key=len)
+        candidates = set().union(*postings[:len(grams) - needed + 1])
+
+        scores = {}
+        for candidate in candidates:
+            candidate_grams = self._grams_by_key[candidate]
+            # Похожесть не больше отношения размеров - длину сравниваем до пересечения
+            if min(len(grams), len(candidate_grams)) < min_score * max(len(grams), len(candidate_grams)):
+                continue
+            shared = len(grams & candidate_grams)
+            score = shared / (len(grams) + len(candidate_grams) - shared)
+            if score >= min_score:
+                scores[candidate] = score
+        return scores
+
+    def lookup(self, query: Optional[str], limit: int = 5, min_score: float = 0.45) -> List[MedicineMatch]:
+        """
+        Найти препараты по названию
+
+        Args:
+            query: Торговое или международное название (можно с дозировкой и формой)
+            limit: Максимум результатов
+            min_score: Минимальная похожесть (0..1) по триграммам
+
+        Returns:
+            Препараты по убыванию похожести; при равной похожести совпадения
+            по торговому названию идут раньше совпадений по МНН
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+
+        if key in self._ids_by_key:
+            scores = {key: 1.0}
+        else:
+            scores = self._similar_keys(key, min_score)
+            if not scores:
+                # Лишние слова в названии ("Нурофен Экспресс Форте") - ищем по отдельным словам
+                for token in key.split():
+                    if len(token) < MIN_TOKEN_LENGTH or token == key:
+                        continue
+                    for token_key, score in self._similar_keys(token, min_score).items():
+                        scores[token_key] = max(scores.get(token_key, 0.0), score * TOKEN_MATCH_PENALTY)
+
+        best: Dict[int, MedicineMatch] = {}
+        for matched_key, score in scores.items():
+            for entry_id, field in self._ids_by_key[matched_key].items():
+                current = best.get(entry_id)
+                if current is None or (score, field == "name") > (current.score, current.matched_by == "name"):
+                    best[entry_id] = MedicineMatch(self.entries[entry_id], score, field)
+
+        ranked = sorted(
+            best.values(),
+            key=lambda match: (-match.score, match.matched_by != "name", match.entry.id)
+        )
+        return ranked[:limit]
+
+    def international_name_for(self, query: Optional[str], min_score: float = 0.45) -> Optional[str]:
+        """
+        МНН по торговому названию (или само МНН, если передано оно)
+
+        Example:
+            >>> index.international_name_for("Нурофен")
+            'Ибупрофен'
+        """
+        matches = self.lookup(query, limit=1, min_score=min_score)
+        return matches[0].entry.international_name if matches else None
@@ -0,0 +1,199 @@
+"""
+Сервис сопоставления лекарств из плана лечения со справочником medicins.
+Справочник загружается в индекс в памяти (app.services.medicine_index)
+при старте API и обновляется в фоне: новые строки догружаются по id,
+а полная перезагрузка с заменой индекса подхватывает изменения и удаления.
+Вместе с индексом строится дерево классов АТХ кодов справочника (app.services.atc).
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import crud
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.services.atc import AtcTree
+from app.services.medicine_index import MedicineEntry, MedicineIndex, MedicineMatch
+
+logger = logging.getLogger(__name__)
+
+# Сколько старт API ждет загрузки справочника, дальше - загрузка в фоне
+STARTUP_TIMEOUT = 10
+
+
+class MedicineResolver:
+    """
+    Поиск препаратов справочника по названиям из плана лечения
+
+    Example:
+        >>> await medicine_resolver.start()
+        >>> match = medicine_resolver.resolve("Амоксициллин 500 мг")
+        >>> match.medicin_id if match else None
+        12
+    """
+
+    def __init__(
+        self,
+        min_score: float = 0.45,
+        refresh_interval: float = 60,
+        reload_interval: float = 3600,
+        batch_size: int = 5000,
+        atc_names_path: Optional[str] = None
+    ):
+        self.min_score = min_score
+        self.refresh_interval = refresh_interval
+        self.reload_interval = reload_interval
+        self.batch_size = batch_size
+        self.atc_names_path = atc_names_path
+        self.index = MedicineIndex()
+        self.atc_tree = AtcTree()
+        self._atc_names: Optional[Dict[str, str]] = None
+        self.loaded = False
+        self._reloaded_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._loading: Optional[asyncio.Task] = None
+
+    async def _fetch(self, after_id: int) -> List[MedicineEntry]:
+        """Строки справочника с id больше after_id (порциями по batch_size)"""
+        entries = []
+        async with async_session_maker() as db:
+            while True:
+                rows = await crud.medicin.get_catalog_batch(db, after_id=after_id, limit=self.batch_size)
+                entries.extend(MedicineEntry(*row) for row in rows)
+                if len(rows) < self.batch_size:
+                    return entries
+                after_id = rows[-1].id
+
+    def _build(self, entries: List[MedicineEntry]) -> Tuple[MedicineIndex, AtcTree]:
+        if self._atc_names is None:
+            self._atc_names = AtcTree.load_names(self.atc_names_path) if self.atc_names_path else {}
+        tree = AtcTree.build((entry.atc_code for entry in entries), self._atc_names)
+        return MedicineIndex.build(entries), tree
+
+    async def reload(self) -> None:
+        """Полная загрузка справочника с заменой индекса"""
+        started_at = time.perf_counter()
+        entries = await self._fetch(0)
+        # Построение занимает сотни миллисекунд на большом справочнике - не в event loop
+        self.index, self.atc_tree = await asyncio.to_thread(self._build, entries)
+        self.loaded = True
+        self._reloaded_at = time.monotonic()
+        logger.info(
+            f"Индекс справочника препаратов загружен: {len(self.index)} строк "
+            f"за {(time.perf_counter() - started_at) * 1000:.0f} мс"
+        )
+
+    async def refresh(self) -> int:
+        """
+        Догрузить строки, добавленные после последней загрузки
+
+        Returns:
+            Количество добавленных строк
+        """
+        entries = await self._fetch(self.index.max_id)
+        for entry in entries:
+            self.index.add(entry)
+            self.atc_tree.add(entry.atc_code)
+        if entries:
+            logger.info(f"В индекс справочника препаратов добавлено строк: {len(entries)}")
+        return len(entries)
+
+    async def _load(self) -> None:
+        try:
+            await self.reload()
+        except Exception as e:
+            # API работает и без справочника: лекарства остаются несопоставленными
+            logger.warning(f"Справочник препаратов не загружен, повтор через {self.refresh_interval:.0f} с: {e!r}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            if not self._loading.done():
+                # Первая загрузка еще идет - не запускаем вторую параллельно
+                continue
+            try:
+                if not self.loaded or time.monotonic() - self._reloaded_at >= self.reload_interval:
+                    await self.reload()
+                else:
+                    await self.refresh()
+            except Exception as e:
+                logger.warning(f"Не удалось обновить индекс справочника препаратов: {e}")
+
+    async def start(self) -> None:
+        """Загрузить справочник и запустить фоновое обновление"""
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._loading = loop.create_task(self._load(), name="medicine-index-load")
+        # По таймауту загрузка не отменяется: API стартует, индекс догружается в фоне
+        done, _ = await asyncio.wait({self._loading}, timeout=STARTUP_TIMEOUT)
+        if not done:
+            logger.warning(f"Справочник препаратов загружается дольше {STARTUP_TIMEOUT} с, загрузка продолжается в фоне")
+        self._task = loop.create_task(self._run(), name="medicine-index-refresh")
+
+    async def stop(self) -> None:
+        """Остановить фоновое обновление"""
+        if self._task is None:
+            return
+        for task in (self._loading, self._task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._loading = None
+        self._task = None
+
+    def search(self, name: Optional[str], limit: int = 5) -> List[MedicineMatch]:
+        """Препараты справочника, похожие на name, по убыванию похожести"""
+        return self.index.lookup(name, limit=limit, min_score=self.min_score)
+
+    def resolve(self, name: Optional[str]) -> Optional[MedicineMatch]:
+        """Лучшее совпадение для названия (None, если похожих препаратов нет)"""
+        matches = self.search(name, limit=1)
+        return matches[0] if matches else None
+
+    def annotate_medication(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Дополнить лекарство из плана ссылкой на справочник
+
+        Добавляет поля medicin_id (None, если препарат не найден)
+        и medicin_match (найденная строка справочника и похожесть).
+        """
+        match = self.resolve(item.get("name"))
+        item["medicin_id"] = match.medicin_id if match else None
+        item["medicin_match"] = match.to_dict() if match else None
+        return item
+
+
+# Глобальный экземпляр сервиса
+medicine_resolver = MedicineResolver(
+    min_score=settings.MEDICINE_MATCH_MIN_SCORE,
+    refresh_interval=settings.MEDICINE_INDEX_REFRESH_SECONDS,
+    reload_interval=settings.MEDICINE_INDEX_RELOAD_SECONDS,
+    batch_size=settings.MEDICINE_INDEX_BATCH_SIZE,
+    atc_names_path=settings.ATC_NAMES_PATH,
+)
+
+
+def resolve_medications(medications: List[Dict[str, Any]]) -> int:
+    """
+    Сопоставить лекарства плана со справочником
+
+    Args:
+        medications: Раздел medications извлеченного плана (дополняется на месте)
+
+    Returns:
+        Количество лекарств, найденных в справочнике
+
+    Example:
+        >>> resolve_medications(parsed_response.get("medications") or [])
+        3
+    """
+    matched = 0
+    for item in medications:
+        if medicine_resolver.annotate_medication(item)["medicin_id"] is not None:
+            matched += 1
+    return matched
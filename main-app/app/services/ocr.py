@@ -0,0 +1,157 @@
+"""
+Модуль распознавания текста (OCR) для PDF-файлов без текстового слоя.
+Страницы растеризуются через PyMuPDF и распознаются параллельно в пуле процессов.
+"""
+
+import asyncio
+import io
+import logging
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Type
+
+from app.core.config import settings
+from app.core.executor import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+
+class OCRBackend(ABC):
+    """Базовый класс движка распознавания текста"""
+
+    name: str = ""
+
+    def __init__(self, languages: Optional[str] = None):
+        """
+        Инициализация движка
+
+        Args:
+            languages: Языки распознавания (если None, берется из настроек OCR_LANGUAGES)
+        """
+        self.languages = languages or settings.OCR_LANGUAGES
+
+    @abstractmethod
+    def recognize(self, image: bytes) -> str:
+        """
+        Распознать текст на изображении
+
+        Args:
+            image: Изображение страницы в формате PNG
+
+        Returns:
+            Распознанный текст
+        """
+
+
+class TesseractOCRBackend(OCRBackend):
+    """Распознавание через локально установленный Tesseract"""
+
+    name = "tesseract"
+
+    def recognize(self, image: bytes) -> str:
+        """Распознать текст на изображении через pytesseract"""
+        try:
+            import pytesseract
+            from PIL import Image
+        except ImportError as e:
+            raise RuntimeError(
+                "Tesseract backend requires pytesseract and Pillow. "
+                "Install them with 'pip install pytesseract Pillow'."
+            ) from e
+
+        return pytesseract.image_to_string(Image.open(io.BytesIO(image)), lang=self.languages)
+
+
+# Реестр доступных движков OCR
+OCR_BACKENDS: Dict[str, Type[OCRBackend]] = {
+    TesseractOCRBackend.name: TesseractOCRBackend,
+}
+
+
+def get_ocr_backend(name: Optional[str] = None) -> OCRBackend:
+    """
+    Получить экземпляр движка OCR по имени
+
+    Args:
+        name: Имя движка (если None, берется из настроек OCR_BACKEND)
+
+    Returns:
+        Экземпляр OCRBackend
+
+    Raises:
+        ValueError: Если движок с таким именем не зарегистрирован
+    """
+    name = name or settings.OCR_BACKEND
+    backend_class = OCR_BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown OCR backend: {name}. Available: {', '.join(OCR_BACKENDS)}")
+    return backend_class()
+
+
+def ocr_page(pdf_path: str, page_num: int, dpi: int, backend_name: str) -> Tuple[int, str]:
+    """
+    Растеризовать и распознать одну страницу PDF
+
+    Выполняется в пуле процессов: документ открывается в рабочем процессе,
+    поэтому между процессами передаётся только путь и номер страницы.
+
+    Args:
+        pdf_path: Путь к PDF-файлу
+        page_num: Номер страницы (с нуля)
+        dpi: Разрешение растеризации
+        backend_name: Имя движка OCR
+
+    Returns:
+        Кортеж (номер страницы, распознанный текст)
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        pixmap = doc[page_num].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        image = pixmap.tobytes("png")
+
+    return page_num, get_ocr_backend(backend_name).recognize(image)
+
+
+async def recognize_pages(
+    pdf_path: str,
+    page_numbers: List[int],
+    dpi: Optional[int] = None,
+    backend_name: Optional[str] = None
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Распознать страницы PDF параллельно, отдавая результаты по мере готовности
+
+    Все страницы сразу ставятся в пул процессов, результаты отдаются
+    в порядке страниц: следующая страница возвращается, как только она
+    и все предыдущие распознаны.
+
+    Args:
+        pdf_path: Путь к PDF-файлу
+        page_numbers: Номера страниц для распознавания (с нуля)
+        dpi: Разрешение растеризации (если None, берется из настроек OCR_DPI)
+        backend_name: Имя движка OCR (если None, берется из настроек OCR_BACKEND)
+
+    Yields:
+        Кортежи (номер страницы, распознанный текст)
+
+    Example:
+        >>> async for page_num, text in recognize_pages("/path/to/scan.pdf", [0, 1, 2]):
+        ...     print(page_num, len(text))
+    """
+    dpi = dpi or settings.OCR_DPI
+    backend_name = backend_name or settings.OCR_BACKEND
+
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    futures = [
+        loop.run_in_executor(pool, ocr_page, pdf_path, page_num, dpi, backend_name)
+        for page_num in page_numbers
+    ]
+
+    try:
+        for future in futures:
+            yield await future
+    finally:
+        # Если потребитель прервал итерацию, не держим пул ненужной работой
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,213 @@
+"""
+Обслуживание секций notifications и surveys.
+Таблицы секционированы по месяцам (границы - полночь 1-го числа по UTC),
+секции называются <таблица>_pYYYYMM, строки вне секций попадают в
+<таблица>_default. Фоновая задача заранее создает секции на
+PARTITION_PREMAKE_MONTHS месяцев вперед, а секции старше срока хранения
+отсоединяет и переносит в схему PARTITION_ARCHIVE_SCHEMA (или удаляет,
+если схема не задана). Запросы по времени затрагивают только нужные секции,
+а очистка и VACUUM работают с небольшими таблицами.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+# Таблица -> столбец секционирования
+PARTITIONED_TABLES: Dict[str, str] = {
+    "surveys": "date",
+    "notifications": "time",
+}
+
+PARTITION_NAME_RE = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+# DDL не ждет дольше долгих транзакций, держащих таблицу - повтор в следующем проходе
+LOCK_TIMEOUT = "5s"
+
+
+def add_months(month: date, count: int) -> date:
+    """
+    Первое число месяца через count месяцев
+
+    Example:
+        >>> add_months(date(2026, 11, 1), 3)
+        datetime.date(2027, 2, 1)
+    """
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Имя секции месяца: surveys_p202610"""
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_bounds(month: date) -> Tuple[str, str]:
+    """Границы секции месяца (литералы timestamptz)"""
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    end = datetime.combine(add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc)
+    return start.isoformat(), end.isoformat()
+
+
+async def get_partition_months(db: AsyncSession, table: str) -> List[date]:
+    """Месяцы присоединенных секций таблицы (кроме секции по умолчанию)"""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": table},
+    )
+    months = []
+    for name in result.scalars():
+        match = PARTITION_NAME_RE.match(name)
+        if match and match["table"] == table:
+            months.append(date(int(match["year"]), int(match["month"]), 1))
+    return sorted(months)
+
+
+async def create_partition(db: AsyncSession, table: str, month: date) -> None:
+    """
+    Создать секцию месяца
+
+    Строки этого месяца, уже попавшие в секцию по умолчанию, переносятся
+    в новую секцию - иначе PostgreSQL не даст ее создать.
+    """
+    key = PARTITIONED_TABLES[table]
+    name = partition_name(table, month)
+    start, end = partition_bounds(month)
+    in_range = f"{key} >= '{start}' AND {key} < '{end}'"
+
+    misplaced = await db.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_range})"))
+    if not misplaced:
+        await db.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        return
+
+    await db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    await db.execute(text(
+        f"WITH moved AS (DELETE FROM {table}_default WHERE {in_range} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    await db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    logger.warning(f"Строки {name} перенесены из секции {table}_default")
+
+
+async def archive_partition(db: AsyncSession, table: str, month: date, schema: Optional[str]) -> None:
+    """Отсоединить секцию месяца и перенести в схему schema (None - удалить)"""
+    name = partition_name(table, month)
+    await db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    if schema:
+        await db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+        await db.execute(text(f"ALTER TABLE {name} SET SCHEMA {schema}"))
+    else:
+        await db.execute(text(f"DROP TABLE {name}"))
+
+
+class PartitionMaintenance:
+    """
+    Создание будущих и архивирование старых секций
+
+    Example:
+        >>> await partition_maintenance.run_once()
+    """
+
+    def __init__(
+        self,
+        interval: float = 21600,
+        premake_months: int = 3,
+        retention_months: Optional[Dict[str, int]] = None,
+        archive_schema: Optional[str] = "archive"
+    ):
+        self.interval = interval
+        self.premake_months = premake_months
+        self.retention_months = retention_months or {}
+        self.archive_schema = archive_schema
+        self._task: Optional[asyncio.Task] = None
+
+    async def maintain(self, db: AsyncSession, table: str, today: date) -> None:
+        """
+        Обслужить секции одной таблицы (транзакцию фиксирует вызывающий код)
+
+        При нескольких воркерах API таблицу обслуживает тот, кто первым
+        получил advisory-блокировку.
+        """
+        locked = await db.scalar(
+            text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"partition_maintenance:{table}"},
+        )
+        if not locked:
+            return
+        await db.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+
+        current = today.replace(day=1)
+        existing = await get_partition_months(db, table)
+        for offset in range(self.premake_months + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                await create_partition(db, table, month)
+                logger.info(f"Создана секция {partition_name(table, month)}")
+
+        retention = self.retention_months.get(table, 0)
+        if retention > 0:
+            oldest = add_months(current, -retention)
+            for month in existing:
+                if month < oldest:
+                    await archive_partition(db, table, month, self.archive_schema)
+                    logger.info(f"Секция {partition_name(table, month)} отсоединена от {table}")
+
+    async def run_once(self) -> None:
+        """Обслужить все секционированные таблицы, каждую в своей транзакции"""
+        today = datetime.now(timezone.utc).date()
+        for table in PARTITIONED_TABLES:
+            try:
+                async with async_session_maker() as db:
+                    await self.maintain(db, table, today)
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Не удалось обслужить секции {table}: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """Запустить фоновое обслуживание (первый проход - сразу)"""
+        if self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="partition-maintenance")
+
+    async def stop(self) -> None:
+        """Остановить фоновое обслуживание"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Глобальный экземпляр сервиса
+partition_maintenance = PartitionMaintenance(
+    interval=settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+    premake_months=settings.PARTITION_PREMAKE_MONTHS,
+    retention_months={
+        "surveys": settings.SURVEYS_RETENTION_MONTHS,
+        "notifications": settings.NOTIFICATIONS_RETENTION_MONTHS,
+    },
+    archive_schema=settings.PARTITION_ARCHIVE_SCHEMA or None,
+)
@@ -3,11 +3,25 @@
 Извлекает текстовое содержимое из PDF и определяет тип документа.
 """
 
-from typing import Dict, Any, Optional
+import logging
+import random
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Tuple
 from enum import Enum
-import fitz  # PyMuPDF
 from pathlib import Path
 
+from app.core.config import settings
+from app.core.executor import run_in_process
+from app.core.stages import record_stage
+from app.services.layout_extractor import extract_layout_text
+from app.services.ocr import recognize_pages
+
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
 
 class ProcessingStatus(str, Enum):
     """Статусы обработки PDF-документа"""
@@ -40,6 +54,11 @@ class PDFProcessor:
     MIN_TEXT_LENGTH = 50  # Минимальное количество символов на странице
     MIN_TEXT_RATIO = 0.1  # Минимальное соотношение текстовых символов к общему объему
 
+    # Параметры выборочной классификации
+    SAMPLE_PAGES = 5  # Максимум проверяемых страниц независимо от размера документа
+    CONFIDENT_VOTES = 2  # Столько согласных страниц без возражений достаточно для решения
+    MIN_IMAGE_COVERAGE = 0.5  # Доля площади страницы под изображениями для скана
+
     def __init__(self, pdf_path: str):
         """
         Инициализация обработчика
@@ -49,6 +68,17 @@ class PDFProcessor:
         """
         self.pdf_path = Path(pdf_path)
         self.doc = None
+        # Замеры этапов: (этап, время начала по perf_counter, длительность)
+        self.stage_timings: List[Tuple[str, float, float]] = []
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        """Замер этапа обработки (передается в основной процесс с результатом)"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_timings.append((name, started_at, time.perf_counter() - started_at))
 
     def _open_pdf(self) -> PDFProcessorResponse:
         """Открытие PDF-файла"""
@@ -65,6 +95,9 @@ class PDFProcessor:
                     message=f"Файл должен быть в формате PDF, получен: {self.pdf_path.suffix}"
                 )
 
+            # PyMuPDF импортируется при разборе (в пуле процессов), а не при старте API
+            import fitz  # PyMuPDF
+
             self.doc = fitz.open(self.pdf_path)
             return PDFProcessorResponse(
                 status=ProcessingStatus.SUCCESS,
@@ -76,49 +109,151 @@ class PDFProcessor:
                 message=f"Ошибка при открытии PDF-файла: {str(e)}"
             )
 
+    def _sample_pages(self) -> List[int]:
+        """
+        Выборка страниц для классификации: первая, средняя, последняя и случайные
+
+        Генератор случайных чисел инициализируется числом страниц,
+        чтобы решение для одного и того же файла было воспроизводимым.
+
+        Returns:
+            Номера страниц в порядке проверки
+        """
+        total_pages = len(self.doc)
+        sample = list(dict.fromkeys([0, total_pages // 2, total_pages - 1]))
+
+        # Случайные страницы без построения списка всех страниц - время
+        # не зависит от размера документа
+        rng = random.Random(total_pages)
+        target = min(self.SAMPLE_PAGES, total_pages)
+        while len(sample) < target:
+            page_num = rng.randrange(total_pages)
+            if page_num not in sample:
+                sample.append(page_num)
+
+        return sample[:self.SAMPLE_PAGES]
+
+    def _get_image_coverage(self, page: "fitz.Page") -> float:
+        """
+        Доля площади страницы, занятая изображениями
+
+        Args:
+            page: Страница PDF
+
+        Returns:
+            Значение от 0 до 1
+        """
+        import fitz  # PyMuPDF
+
+        page_area = abs(page.rect)
+        if not page_area:
+            return 0.0
+
+        image_area = sum(
+            abs(fitz.Rect(info["bbox"]) & page.rect)
+            for info in page.get_image_info()
+        )
+        return min(image_area / page_area, 1.0)
+
+    def _classify_page(self, page_num: int) -> Optional[bool]:
+        """
+        Классификация одной страницы по дешевым признакам
+
+        Страница без шрифтов не имеет текстового слоя, поэтому текст
+        извлекается только для страниц со шрифтами.
+
+        Args:
+            page_num: Номер страницы
+
+        Returns:
+            True - картинка, False - текст, None - пустая страница (не голосует)
+        """
+        page = self.doc[page_num]
+
+        if page.get_fonts():
+            text_length = len(''.join(page.get_text().split()))
+            if text_length >= self.MIN_TEXT_LENGTH:
+                return False
+
+        if self._get_image_coverage(page) >= self.MIN_IMAGE_COVERAGE:
+            return True
+
+        # Мало текста и нет крупных изображений - пустая или служебная страница
+        return None
+
     def _is_image_based_pdf(self) -> bool:
         """
         Определение, является ли PDF картинкой (требует OCR)
 
+        Проверяется ограниченная выборка страниц, проверка прекращается,
+        как только CONFIDENT_VOTES страниц дали одинаковый ответ без возражений,
+        поэтому время не зависит от количества страниц.
+
         Returns:
             True, если PDF является картинкой, False - если структурированный
         """
-        if not self.doc:
+        if not self.doc or len(self.doc) == 0:
             return True
 
-        total_text_length = 0
-        total_pages = len(self.doc)
-
-        # Проверяем все страницы
-        for page_num in range(total_pages):
-            page = self.doc[page_num]
-            text = page.get_text().strip()
-
-            # Убираем пробелы и переносы строк для более точного подсчета
-            text_without_spaces = ''.join(text.split())
-            total_text_length += len(text_without_spaces)
-
-        # Если на всех страницах очень мало текста, скорее всего это картинка
-        avg_text_per_page = total_text_length / total_pages if total_pages > 0 else 0
-
-        # Также проверяем наличие изображений
-        has_images = False
-        for page_num in range(min(3, total_pages)):  # Проверяем первые 3 страницы
-            page = self.doc[page_num]
-            image_list = page.get_images()
-            if image_list:
-                has_images = True
-                break
-
-        # Если много изображений и мало текста - это картинка
-        if has_images and avg_text_per_page < self.MIN_TEXT_LENGTH:
+        image_votes = 0
+        text_votes = 0
+        for page_num in self._sample_pages():
+            is_image = self._classify_page(page_num)
+            if is_image is True:
+                image_votes += 1
+            elif is_image is False:
+                text_votes += 1
+
+            if image_votes >= self.CONFIDENT_VOTES and not text_votes:
+                return True
+            if text_votes >= self.CONFIDENT_VOTES and not image_votes:
+                return False
+
+        # Если ни одна страница не содержит текста - это картинка
+        if not text_votes:
             return True
 
-        # Если очень мало текста - это картинка
-        if avg_text_per_page < self.MIN_TEXT_LENGTH:
-            return True
+        return image_votes > text_votes
+
+    def _extract_page_texts(self) -> List[str]:
+        """
+        Извлечение текстового слоя каждой страницы
+
+        В режиме "layout" (PDF_EXTRACTION_MODE) текст собирается по координатам
+        слов с восстановлением таблиц в markdown, в режиме "plain" - как есть.
+
+        Returns:
+            Список текстов страниц
+        """
+        if not self.doc:
+            return []
+
+        if settings.PDF_EXTRACTION_MODE == "layout":
+            return [extract_layout_text(self.doc[page_num]) for page_num in range(len(self.doc))]
+
+        return [self.doc[page_num].get_text() for page_num in range(len(self.doc))]
+
+    def _get_ocr_pages(self, page_texts: List[str]) -> List[int]:
+        """
+        Определение страниц, которые требуют OCR
+
+        Страница отправляется на распознавание, только если её текстовый слой
+        короче MIN_TEXT_LENGTH и на ней есть изображения (пустые страницы
+        распознавать нечего).
 
-        return False
+        Args:
+            page_texts: Тексты страниц из _extract_page_texts
+
+        Returns:
+            Номера страниц (с нуля)
+        """
+        ocr_pages = []
+        for page_num, text in enumerate(page_texts):
+            if len(''.join(text.split())) >= self.MIN_TEXT_LENGTH:
+                continue
+            if self.doc[page_num].get_images():
+                ocr_pages.append(page_num)
+        return ocr_pages
 
     def _extract_text(self) -> str:
         """
@@ -127,16 +262,7 @@ class PDFProcessor:
         Returns:
             Извлеченный текст из всех страниц
         """
-        if not self.doc:
-            return ""
-
-        all_text = []
-        for page_num in range(len(self.doc)):
-            page = self.doc[page_num]
-            text = page.get_text()
-            all_text.append(f"--- Страница {page_num + 1} ---\n{text}")
-
-        return "\n\n".join(all_text)
+        return format_page_texts(self._extract_page_texts())
 
     def _get_metadata(self) -> Dict[str, Any]:
         """
@@ -168,13 +294,16 @@ class PDFProcessor:
             Словарь с результатами обработки
         """
         # Открываем PDF
-        open_result = self._open_pdf()
+        with self._stage("pdf_open"):
+            open_result = self._open_pdf()
         if open_result.status == ProcessingStatus.ERROR:
             return open_result.to_dict()
 
         try:
             # Проверяем, является ли PDF картинкой
-            if self._is_image_based_pdf():
+            with self._stage("classify"):
+                is_image_based = self._is_image_based_pdf()
+            if is_image_based and not settings.OCR_ENABLED:
                 return PDFProcessorResponse(
                     status=ProcessingStatus.ERROR,
                     message="Переданный PDF-файл является картинкой и требует OCR. "
@@ -186,15 +315,32 @@ class PDFProcessor:
                     }
                 ).to_dict()
 
-            # Извлекаем текст
-            extracted_text = self._extract_text()
+            with self._stage("extract_text"):
+                page_texts = self._extract_page_texts()
+            ocr_pages = self._get_ocr_pages(page_texts)
+
+            # Часть страниц без текстового слоя - передаем на OCR
+            if ocr_pages and settings.OCR_ENABLED:
+                return PDFProcessorResponse(
+                    status=ProcessingStatus.PROCESS,
+                    message=f"Требуется OCR для {len(ocr_pages)} из {len(page_texts)} страниц",
+                    data={
+                        "pdf_type": "image_based" if is_image_based else "mixed",
+                        "requires_ocr": True,
+                        "ocr_pages": ocr_pages,
+                        "page_texts": page_texts,
+                        "metadata": self._get_metadata()
+                    }
+                ).to_dict()
 
-            if not extracted_text.strip():
+            # Заголовки страниц добавляются всегда - проверяем сами страницы
+            if not any(text.strip() for text in page_texts):
                 return PDFProcessorResponse(
                     status=ProcessingStatus.ERROR,
                     message="Не удалось извлечь текст из PDF-файла. Возможно, файл поврежден или зашифрован.",
                     data={"metadata": self._get_metadata()}
                 ).to_dict()
+            extracted_text = format_page_texts(page_texts)
 
             # Успешная обработка
             return PDFProcessorResponse(
@@ -220,6 +366,22 @@ class PDFProcessor:
                 self.doc.close()
 
 
+def format_page_texts(page_texts: List[str]) -> str:
+    """
+    Объединение текстов страниц в единый текст с разделителями
+
+    Args:
+        page_texts: Тексты страниц
+
+    Returns:
+        Текст документа
+    """
+    return "\n\n".join(
+        f"--- Страница {page_num + 1} ---\n{text}"
+        for page_num, text in enumerate(page_texts)
+    )
+
+
 def process_treatment_plan_pdf(pdf_path: str) -> Dict[str, Any]:
     """
     Функция-обертка для обработки PDF с планом лечения
@@ -237,7 +399,8 @@ def process_treatment_plan_pdf(pdf_path: str) -> Dict[str, Any]:
                 "text": "Извлеченный текст",
                 "metadata": {...},
                 ...
-            }
+            },
+            "stage_timings": [("pdf_open", начало, длительность), ...]
         }
 
     Example:
@@ -248,4 +411,66 @@ def process_treatment_plan_pdf(pdf_path: str) -> Dict[str, Any]:
         >>>     print(result["message"])
     """
     processor = PDFProcessor(pdf_path)
-    return processor.process()
\ No newline at end of file
+    result = processor.process()
+    result["stage_timings"] = processor.stage_timings
+    return result
+
+
+async def process_treatment_plan_pdf_async(pdf_path: str) -> Dict[str, Any]:
+    """
+    Обработка PDF с планом лечения вне event loop с OCR страниц без текста
+
+    Разбор PDF выполняется в пуле процессов. Если часть страниц не имеет
+    текстового слоя, они распознаются параллельно, остальные страницы
+    берутся из текстового слоя как есть.
+
+    Args:
+        pdf_path: Путь к PDF-файлу с планом лечения
+
+    Returns:
+        Словарь с результатами обработки (формат как у process_treatment_plan_pdf)
+    """
+    result = await run_in_process(process_treatment_plan_pdf, pdf_path)
+
+    # Этапы из пула процессов передаем наблюдателям основного процесса
+    for name, started_at, duration in result.pop("stage_timings", []):
+        record_stage(name, started_at, duration)
+
+    if result["status"] != ProcessingStatus.PROCESS.value:
+        return result
+
+    data = result["data"]
+    page_texts = data.pop("page_texts")
+    ocr_pages = data["ocr_pages"]
+
+    try:
+        async for page_num, text in recognize_pages(pdf_path, ocr_pages):
+            page_texts[page_num] = text
+            logger.info(f"OCR страницы {page_num + 1} завершен ({len(text)} символов)")
+    except Exception as e:
+        logger.error(f"Ошибка OCR для {pdf_path}: {e}", exc_info=True)
+        return PDFProcessorResponse(
+            status=ProcessingStatus.ERROR,
+            message=f"Ошибка при распознавании текста (OCR): {str(e)}",
+            data=data
+        ).to_dict()
+
+    # Заголовки страниц добавляются всегда - проверяем сами страницы
+    if not any(text.strip() for text in page_texts):
+        return PDFProcessorResponse(
+            status=ProcessingStatus.ERROR,
+            message="Не удалось распознать текст на страницах PDF-файла.",
+            data=data
+        ).to_dict()
+
+    extracted_text = format_page_texts(page_texts)
+
+    return PDFProcessorResponse(
+        status=ProcessingStatus.SUCCESS,
+        message=f"PDF-файл успешно обработан (OCR страниц: {len(ocr_pages)})",
+        data={
+            **data,
+            "text": extracted_text,
+            "text_length": len(extracted_text)
+        }
+    ).to_dict()
@@ -0,0 +1,240 @@
+"""
+Модуль для экспорта планов лечения в PDF.
+Рендерит план с назначениями, анализами и приёмами через PyMuPDF
+и кэширует результат на диске по версии содержимого плана.
+"""
+
+import hashlib
+import html
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.executor import run_in_process
+from app.models.plan import Plan
+
+logger = logging.getLogger(__name__)
+
+# Версия шаблона: при изменении вёрстки старые файлы кэша перестают совпадать
+RENDER_VERSION = 1
+
+EXPORT_DIR = Path(settings.EXPORT_DIR)
+
+# Устаревшая версия удаляется не раньше, чем через столько секунд после
+# появления новой - параллельный запрос мог только что получить ее путь
+STALE_EXPORT_GRACE_SECONDS = 300
+
+PLAN_STATUSES = {
+    "active": "Активный",
+    "completed": "Завершён",
+    "cancelled": "Отменён",
+    "pending": "Ожидает подтверждения",
+}
+
+STYLESHEET = """
+body { font-family: sans-serif; font-size: 11px; }
+h1 { font-size: 18px; margin-bottom: 6px; }
+h2 { font-size: 14px; margin-top: 14px; margin-bottom: 4px; }
+p { margin: 2px 0; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #888888; padding: 3px; text-align: left; }
+th { background-color: #eeeeee; }
+"""
+
+
+def plan_to_export_data(plan: Plan) -> Dict[str, Any]:
+    """
+    Преобразование плана с загруженными связями в сериализуемый словарь
+
+    Args:
+        plan: План лечения с загруженными doctor, prescriptions, tests, appointments
+
+    Returns:
+        Словарь с данными для рендеринга (передаётся в пул процессов)
+    """
+    return {
+        "id": plan.id,
+        "title": plan.title,
+        "description": plan.description,
+        "status": plan.status,
+        "start_date": plan.start_date.isoformat(),
+        "end_date": plan.end_date.isoformat(),
+        "doctor": {
+            "full_name": plan.doctor.full_name,
+            "specialization": plan.doctor.specialization,
+        } if plan.doctor else None,
+        "prescriptions": [
+            {
+                "medicin": p.medicin.name if p.medicin else "",
+                "dosage": str(p.dosage),
+                "quantity": str(p.quantity),
+                "repeat": p.repeat,
+                "duration_days": p.duration_days,
+                "start_date": p.start_date.isoformat(),
+                "description": p.description or "",
+            }
+            for p in sorted(plan.prescriptions, key=lambda p: p.id)
+        ],
+        "tests": [
+            {
+                "title": t.title,
+                "date": t.date.strftime("%Y-%m-%d %H:%M"),
+                "description": t.description or "",
+            }
+            for t in sorted(plan.tests, key=lambda t: t.id)
+        ],
+        "appointments": [
+            {
+                "doctor_specialization": a.doctor_specialization,
+                "date": a.date.strftime("%Y-%m-%d %H:%M"),
+                "status": a.status,
+            }
+            for a in sorted(plan.appointments, key=lambda a: a.id)
+        ],
+    }
+
+
+def get_export_version(data: Dict[str, Any]) -> str:
+    """
+    Вычисление версии плана по его содержимому
+
+    Любое изменение плана или связанных записей меняет версию,
+    поэтому отдельная инвалидация кэша не требуется.
+
+    Args:
+        data: Данные плана из plan_to_export_data
+
+    Returns:
+        Короткий хэш содержимого
+    """
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(f"{RENDER_VERSION}:{payload}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _table(headers: List[str], rows: List[List[Any]]) -> str:
+    """Формирование HTML-таблицы с экранированием значений"""
+    head = "".join(f"<th>{html.escape(h)}</th>" for h in headers)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in row) + "</tr>"
+        for row in rows
+    )
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+
+def _build_html(data: Dict[str, Any]) -> str:
+    """Формирование HTML-разметки плана лечения"""
+    esc = html.escape
+    parts = [
+        f"<h1>{esc(data['title'])}</h1>",
+        f"<p>{esc(data['description'])}</p>",
+        f"<p><b>Период:</b> {esc(data['start_date'])} — {esc(data['end_date'])}</p>",
+        f"<p><b>Статус:</b> {esc(PLAN_STATUSES.get(data['status'], data['status']))}</p>",
+    ]
+
+    if data["doctor"]:
+        parts.append(
+            f"<p><b>Врач:</b> {esc(data['doctor']['full_name'])}, "
+            f"{esc(data['doctor']['specialization'])}</p>"
+        )
+
+    if data["prescriptions"]:
+        parts.append("<h2>Назначения</h2>")
+        parts.append(_table(
+            ["Препарат", "Дозировка", "Количество", "Частота", "Дней", "Начало", "Примечание"],
+            [
+                [p["medicin"], p["dosage"], p["quantity"], p["repeat"],
+                 p["duration_days"], p["start_date"], p["description"]]
+                for p in data["prescriptions"]
+            ]
+        ))
+
+    if data["tests"]:
+        parts.append("<h2>Анализы и обследования</h2>")
+        parts.append(_table(
+            ["Название", "Дата", "Описание"],
+            [[t["title"], t["date"], t["description"]] for t in data["tests"]]
+        ))
+
+    if data["appointments"]:
+        parts.append("<h2>Приёмы у врачей</h2>")
+        parts.append(_table(
+            ["Специализация", "Дата"],
+            [[a["doctor_specialization"], a["date"]] for a in data["appointments"]]
+        ))
+
+    return "".join(parts)
+
+
+def render_plan_pdf(data: Dict[str, Any], output_path: str) -> str:
+    """
+    Рендеринг плана лечения в PDF-файл
+
+    Выполняется в пуле процессов. Файл сначала пишется во временный путь
+    и атомарно переименовывается, чтобы параллельные запросы не получили
+    недописанный документ.
+
+    Args:
+        data: Данные плана из plan_to_export_data
+        output_path: Путь для сохранения PDF
+
+    Returns:
+        Путь к сохранённому файлу
+    """
+    import fitz  # PyMuPDF
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+
+    story = fitz.Story(html=_build_html(data), user_css=STYLESHEET)
+    writer = fitz.DocumentWriter(tmp_path)
+    mediabox = fitz.paper_rect("a4")
+    where = mediabox + (36, 36, -36, -36)
+
+    more = True
+    while more:
+        device = writer.begin_page(mediabox)
+        more, _ = story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+async def export_plan_pdf(plan: Plan) -> Path:
+    """
+    Получить PDF плана лечения из кэша или отрендерить его
+
+    Args:
+        plan: План лечения с загруженными связями
+
+    Returns:
+        Путь к PDF-файлу
+    """
+    data = plan_to_export_data(plan)
+    version = get_export_version(data)
+    output_path = EXPORT_DIR / f"plan_{plan.id}_{version}.pdf"
+
+    if output_path.exists():
+        logger.info(f"PDF плана {plan.id} взят из кэша: {output_path}")
+        return output_path
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    await run_in_process(render_plan_pdf, data, str(output_path))
+    logger.info(f"PDF плана {plan.id} сгенерирован: {output_path}")
+
+    # Удаляем версии этого плана, которые старше только что записанной.
+    # Более новые (параллельный рендер после правки) и недавно отданные не трогаем
+    stale_before = output_path.stat().st_mtime - STALE_EXPORT_GRACE_SECONDS
+    for stale in EXPORT_DIR.glob(f"plan_{plan.id}_*.pdf"):
+        try:
+            if stale != output_path and stale.stat().st_mtime < stale_before:
+                stale.unlink()
+        except FileNotFoundError:
+            pass
+
+    return output_path
@@ -0,0 +1,170 @@
+"""
+Сервис извлечения структурированной информации из текста плана лечения.
+Типовые шаблоны разбираются по правилам, остальные документы - через
+потоковый ответ GigaChat с выдачей элементов (лекарств, обследований)
+по мере генерации.
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging_config import log_payload
+from app.core.stages import track_stage
+from app.prompts import load_treatment_plan_prompt, load_treatment_plan_repair_prompt
+from app.services.gigachat_service import get_gigachat_service
+from app.services.json_stream import IncrementalJSONParser
+from app.services.response_parser import LLMResponseError, dump_json, parse_llm_response
+from app.services.rule_extractor import extract_treatment_plan_by_rules
+
+logger = logging.getLogger(__name__)
+
+PROMPT_NAME = 'extract_treatment_plan'
+
+# Массивы ответа, элементы которых отдаются по мере генерации
+STREAMED_SECTIONS = ("medications", "examinations", "referrals", "symptoms")
+
+# Обработчик элемента: (раздел, элемент) -> None
+ItemCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def log_extracted_plan(parsed_response: Dict[str, Any]) -> None:
+    """Логирование структурированных данных, извлеченных из плана лечения"""
+    log_payload(logger, "Структурированные данные", dump_json(parsed_response))
+
+    # Логируем ключевые данные
+    if 'doctor' in parsed_response:
+        logger.info(f"Врач: {parsed_response['doctor']}")
+    if 'symptoms' in parsed_response:
+        logger.info(f"Симптомов: {len(parsed_response['symptoms'])}")
+    if 'medications' in parsed_response:
+        logger.info(f"Лекарств назначено: {len(parsed_response['medications'])}")
+    if 'examinations' in parsed_response:
+        logger.info(f"Обследований: {len(parsed_response['examinations'])}")
+    if 'referrals' in parsed_response:
+        logger.info(f"Направлений к врачам: {len(parsed_response['referrals'])}")
+
+
+async def _extract_with_gigachat(
+    extracted_text: str,
+    on_item: Optional[ItemCallback]
+) -> Optional[Dict[str, Any]]:
+    """Извлечение через потоковый ответ GigaChat с исправлением невалидного ответа"""
+    logger.info("=" * 80)
+    logger.info("Начало извлечения структурированной информации с помощью GigaChat")
+    logger.info("=" * 80)
+
+    # Загружаем промпт
+    with track_stage("prompt_build"):
+        system_prompt, user_prompt, llm_params = load_treatment_plan_prompt(extracted_text)
+
+    logger.info(f"Системный промпт загружен (длина: {len(system_prompt)} символов)")
+    logger.info(f"Пользовательский промпт сформирован (длина: {len(user_prompt)} символов)")
+    logger.info(f"Параметры LLM: {llm_params}")
+
+    chat_params = {
+        "temperature": llm_params.get('temperature', 0.1),
+        "max_tokens": llm_params.get('max_tokens', 2000),
+        "top_p": llm_params.get('top_p', 0.95),
+    }
+
+    async with get_gigachat_service() as giga:
+        logger.info("Отправка потокового запроса к GigaChat API...")
+
+        # Элементы массивов отдаем, как только они закрылись в потоке
+        parser = IncrementalJSONParser(STREAMED_SECTIONS)
+        with track_stage("gigachat_call"):
+            async for chunk in giga.astream_chat(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                **chat_params
+            ):
+                for section, item in parser.feed(chunk):
+                    logger.info(f"Получен элемент раздела {section}")
+                    if on_item is not None:
+                        await on_item(section, item)
+
+        gigachat_response = parser.text
+        log_payload(logger, "Ответ GigaChat", gigachat_response)
+
+        # Разбираем JSON и проверяем по схеме промпта
+        try:
+            with track_stage("json_parse"):
+                return parse_llm_response(gigachat_response, PROMPT_NAME)
+        except LLMResponseError as e:
+            error_message = e.message
+            logger.warning(f"Ответ GigaChat не прошел проверку: {error_message}")
+            logger.info("Отправка запроса на исправление ответа...")
+
+        # Исправляем только ответ, без повторного извлечения из текста плана
+        system_prompt, repair_prompt, _ = load_treatment_plan_repair_prompt(gigachat_response, error_message)
+        with track_stage("gigachat_call"):
+            repaired_response = await giga.achat(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": repair_prompt}
+                ],
+                **chat_params
+            )
+
+        try:
+            with track_stage("json_parse"):
+                return parse_llm_response(repaired_response, PROMPT_NAME)
+        except LLMResponseError as repair_error:
+            logger.warning(f"Исправленный ответ не прошел проверку: {repair_error.message}")
+            logger.warning("Ответ будет обработан как текст")
+            return None
+
+
+async def extract_plan_structure(
+    extracted_text: str,
+    on_item: Optional[ItemCallback] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Извлечь структурированную информацию из текста плана лечения
+
+    Args:
+        extracted_text: Текст плана лечения
+        on_item: Асинхронный обработчик, вызываемый для каждого элемента
+            разделов medications, examinations, referrals, symptoms сразу
+            после его получения (до завершения ответа LLM)
+
+    Returns:
+        Данные в формате response_schema или None, если извлечь не удалось
+
+    Example:
+        >>> async def on_item(section, item):
+        ...     print(section, item)
+        >>> data = await extract_plan_structure(text, on_item=on_item)
+    """
+    # Типовые шаблоны разбираем по правилам, без обращения к LLM
+    if settings.RULE_EXTRACTION_ENABLED:
+        with track_stage("rules"):
+            rule_result = extract_treatment_plan_by_rules(extracted_text)
+        if rule_result.is_sufficient:
+            logger.info(f"План разобран по шаблону (уверенность: {rule_result.confidence}), GigaChat не вызывается")
+            if on_item is not None:
+                for section in STREAMED_SECTIONS:
+                    for item in rule_result.data.get(section) or []:
+                        await on_item(section, item)
+            log_extracted_plan(rule_result.data)
+            return rule_result.data
+
+        logger.info(
+            f"Разбор по шаблону недостаточен (уверенность: {rule_result.confidence}, "
+            f"не найдено: {rule_result.missing_fields}), используем GigaChat"
+        )
+
+    # Извлекаем структурированную информацию с помощью GigaChat
+    try:
+        parsed_response = await _extract_with_gigachat(extracted_text, on_item)
+    except Exception as e:
+        logger.error(f"Ошибка при работе с GigaChat: {e}", exc_info=True)
+        logger.warning("Продолжаем без извлечения структурированной информации")
+        return None
+
+    if parsed_response is not None:
+        log_extracted_plan(parsed_response)
+    return parsed_response
@@ -0,0 +1,187 @@
+"""
+Сэмплирующий профайлер работающего процесса API
+
+Фоновый поток с заданным интервалом снимает стеки всех потоков процесса
+(sys._current_frames) и стеки ожидающих asyncio-задач, а результат
+отдается в collapsed-формате ("кадр;кадр;кадр вес" построчно), который
+читают flamegraph.pl, speedscope и inferno.
+
+Режимы:
+- wall - каждый снимок весит 1, видно и ожидание (I/O, блокировки);
+- cpu - снимок потока весит потраченное им процессорное время
+  (мкс с прошлого снимка), простаивающие потоки не попадают в профиль.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from enum import Enum
+from types import FrameType
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Корневой кадр для стеков ожидающих asyncio-задач
+ASYNC_TASKS_ROOT = "[asyncio tasks]"
+
+MAX_STACK_DEPTH = 128
+
+# Одновременно в процессе работает только один профайлер
+_lock = threading.Lock()
+
+
+class ProfileMode(str, Enum):
+    """Режим профилирования"""
+    WALL = "wall"
+    CPU = "cpu"
+
+
+class ProfilerBusyError(RuntimeError):
+    """Профилирование уже запущено в этом процессе"""
+
+
+_prefixes = sorted({p for p in sys.path if p and os.path.isdir(p)}, key=len, reverse=True)
+
+
+def _short_path(path: str) -> str:
+    for prefix in _prefixes:
+        if path.startswith(prefix):
+            return path[len(prefix):].lstrip(os.sep)
+    return path
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    # Строка начала функции, а не текущая - иначе одна функция
+    # распадается на много узлов flamegraph
+    label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+    # ";" - разделитель кадров в collapsed-формате
+    return label.replace(";", ":")
+
+
+def _collapse(frame: Optional[FrameType]) -> List[str]:
+    """Кадры стека от корня к текущему"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def cpu_mode_supported() -> bool:
+    """Доступно ли процессорное время отдельных потоков (Linux и другие POSIX)"""
+    return hasattr(time, "pthread_getcpuclockid")
+
+
+class SamplingProfiler:
+    """
+    Профайлер процесса на время duration секунд
+
+    Example:
+        >>> profiler = SamplingProfiler(ProfileMode.WALL, interval=0.005, loop=asyncio.get_running_loop())
+        >>> await profiler.run(10)
+        >>> collapsed = profiler.collapsed()
+    """
+
+    def __init__(
+        self,
+        mode: ProfileMode = ProfileMode.WALL,
+        interval: float = 0.005,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        include_tasks: bool = True
+    ):
+        self.mode = mode
+        self.interval = interval
+        self.loop = loop
+        self.include_tasks = include_tasks and loop is not None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._cpu_times: Dict[int, float] = {}
+        self._stop = threading.Event()
+
+    def _thread_weight(self, ident: int) -> int:
+        """Вес снимка потока: 1 для wall, мкс процессорного времени для cpu"""
+        if self.mode == ProfileMode.WALL:
+            return 1
+        try:
+            cpu_time = time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (OSError, ValueError):
+            return 0
+        previous = self._cpu_times.get(ident)
+        self._cpu_times[ident] = cpu_time
+        if previous is None:
+            return 0
+        return int((cpu_time - previous) * 1_000_000)
+
+    def _sample_threads(self, own_ident: int) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            weight = self._thread_weight(ident)
+            if weight <= 0:
+                continue
+            stack = [f"[thread {names.get(ident, ident)}]"] + _collapse(frame)
+            self.stacks[";".join(stack)] += weight
+
+    def _sample_tasks(self) -> None:
+        # Стеки приостановленных задач: где корутины ждут await
+        try:
+            tasks = asyncio.all_tasks(self.loop)
+        except RuntimeError:
+            # Набор задач изменился во время обхода - пропускаем снимок
+            return
+        for task in tasks:
+            coro = task.get_coro()
+            # Выполняющаяся задача уже есть в стеке потока event loop
+            if getattr(coro, "cr_running", False):
+                continue
+            frames = task.get_stack(limit=MAX_STACK_DEPTH)
+            if frames:
+                stack = [ASYNC_TASKS_ROOT] + [_frame_label(frame) for frame in frames]
+                self.stacks[";".join(stack)] += 1
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.is_set():
+            started_at = time.perf_counter()
+            self._sample_threads(own_ident)
+            # Задачи в cpu-режиме не снимаем: ожидание не тратит процессор
+            if self.include_tasks and self.mode == ProfileMode.WALL:
+                self._sample_tasks()
+            self.samples += 1
+            self._stop.wait(max(self.interval - (time.perf_counter() - started_at), 0))
+
+    async def run(self, duration: float) -> None:
+        """
+        Снимать стеки duration секунд, не блокируя event loop
+
+        Raises:
+            ProfilerBusyError: Профилирование уже идет
+        """
+        if not _lock.acquire(blocking=False):
+            raise ProfilerBusyError("Профилирование уже запущено")
+        try:
+            thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            thread.start()
+            try:
+                await asyncio.sleep(duration)
+            finally:
+                self._stop.set()
+                await asyncio.to_thread(thread.join)
+        finally:
+            _lock.release()
+
+        logger.info(
+            f"Профилирование ({self.mode.value}) завершено: {self.samples} снимков, "
+            f"{len(self.stacks)} уникальных стеков"
+        )
+
+    def collapsed(self) -> str:
+        """Профиль в collapsed-формате (самые тяжелые стеки первыми)"""
+        return "".join(f"{stack} {weight}\n" for stack, weight in self.stacks.most_common())
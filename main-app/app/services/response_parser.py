@@ -0,0 +1,248 @@
+"""
+Модуль для разбора и проверки JSON-ответов LLM.
+Находит JSON-объект в ответе (markdown, пояснения вокруг, висячие запятые),
+разбирает его через orjson и проверяет по response_schema промпта
+валидатором, скомпилированным один раз.
+"""
+
+import copy
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+import fastjsonschema
+import orjson
+
+from app.prompts import prompt_loader
+
+FENCED_JSON_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+# Ключи OpenAPI-диалекта в YAML-схемах, которых нет в JSON Schema
+SCHEMA_ANNOTATIONS = ("nullable", "example")
+
+
+class LLMResponseError(Exception):
+    """Ответ LLM не удалось разобрать или он не соответствует схеме"""
+
+    def __init__(self, message: str, response: str, data: Optional[Any] = None):
+        super().__init__(message)
+        self.message = message
+        self.response = response
+        self.data = data
+
+
+def _find_json_object(text: str) -> Optional[str]:
+    """
+    Поиск JSON-объекта верхнего уровня с учетом строк
+
+    Если в тексте несколько объектов (например, фигурные скобки в пояснениях),
+    возвращается самый длинный.
+    """
+    best = None
+    depth = 0
+    start = 0
+    in_string = False
+    escaped = False
+
+    for index, char in enumerate(text):
+        if depth == 0:
+            if char == "{":
+                depth = 1
+                start = index
+            continue
+
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0 and (best is None or index + 1 - start > len(best)):
+                best = text[start:index + 1]
+
+    return best
+
+
+def remove_trailing_commas(text: str) -> str:
+    """Удаление висячих запятых перед } и ] вне строк"""
+    result = []
+    in_string = False
+    escaped = False
+    pending_comma = None
+
+    for char in text:
+        if in_string:
+            result.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if pending_comma is not None:
+            if char.isspace():
+                pending_comma.append(char)
+                continue
+            if char not in "}]":
+                result.append(",")
+            result.extend(pending_comma)
+            pending_comma = None
+
+        if char == ",":
+            pending_comma = []
+        else:
+            result.append(char)
+            if char == '"':
+                in_string = True
+
+    if pending_comma is not None:
+        result.append(",")
+        result.extend(pending_comma)
+    return "".join(result)
+
+
+def extract_json_text(response: str) -> str:
+    """
+    Выделить JSON-объект из ответа LLM
+
+    Args:
+        response: Ответ LLM (может содержать markdown и пояснения)
+
+    Returns:
+        Текст JSON-объекта без висячих запятых
+
+    Raises:
+        LLMResponseError: Если JSON-объект в ответе не найден
+    """
+    candidates = FENCED_JSON_RE.findall(response) + [response]
+    for candidate in candidates:
+        json_text = _find_json_object(candidate)
+        if json_text is not None:
+            return remove_trailing_commas(json_text)
+
+    raise LLMResponseError("JSON object not found in response", response)
+
+
+def parse_llm_json(response: str) -> Any:
+    """
+    Разобрать JSON из ответа LLM
+
+    Args:
+        response: Ответ LLM
+
+    Returns:
+        Разобранные данные
+
+    Raises:
+        LLMResponseError: Если JSON не найден или некорректен
+    """
+    json_text = extract_json_text(response)
+    try:
+        return orjson.loads(json_text)
+    except orjson.JSONDecodeError as e:
+        raise LLMResponseError(f"Invalid JSON: {e}", response) from e
+
+
+def dump_json(data: Any, indent: bool = False) -> str:
+    """
+    Сериализовать данные в JSON через orjson
+
+    Args:
+        data: Данные для сериализации
+        indent: Форматировать с отступами
+
+    Returns:
+        JSON-строка (кириллица не экранируется)
+    """
+    option = orjson.OPT_INDENT_2 if indent else 0
+    return orjson.dumps(data, option=option).decode("utf-8")
+
+
+def to_json_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Преобразовать схему из YAML промпта в JSON Schema
+
+    nullable: true превращается в допустимый null (в type и enum),
+    аннотации без смысла для JSON Schema удаляются.
+
+    Args:
+        schema: response_schema из YAML промпта
+
+    Returns:
+        Схема в формате JSON Schema
+    """
+    schema = copy.deepcopy(schema)
+
+    def convert(node: Any) -> Any:
+        if isinstance(node, list):
+            return [convert(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+
+        nullable = node.get("nullable", False)
+        converted = {
+            key: (value if key in ("enum", "required") else convert(value))
+            for key, value in node.items()
+            if key not in SCHEMA_ANNOTATIONS
+        }
+        if nullable:
+            if "type" in converted:
+                converted["type"] = [converted["type"], "null"]
+            if "enum" in converted:
+                converted["enum"] = list(converted["enum"]) + [None]
+        return converted
+
+    return convert(schema)
+
+
+@lru_cache(maxsize=None)
+def get_response_validator(prompt_name: str) -> Callable[[Any], Any]:
+    """
+    Получить валидатор ответа для промпта (компилируется один раз)
+
+    Args:
+        prompt_name: Имя промпта
+
+    Returns:
+        Функция проверки, бросающая fastjsonschema.JsonSchemaException
+    """
+    schema = to_json_schema(prompt_loader.get_response_schema(prompt_name))
+    return fastjsonschema.compile(schema)
+
+
+def parse_llm_response(response: str, prompt_name: str) -> Dict[str, Any]:
+    """
+    Разобрать ответ LLM и проверить его по response_schema промпта
+
+    Args:
+        response: Ответ LLM
+        prompt_name: Имя промпта, схема которого используется для проверки
+
+    Returns:
+        Проверенные данные
+
+    Raises:
+        LLMResponseError: Если ответ не разобран или не соответствует схеме;
+            при ошибке схемы разобранные данные доступны в error.data
+
+    Example:
+        >>> try:
+        ...     data = parse_llm_response(gigachat_response, 'extract_treatment_plan')
+        ... except LLMResponseError as e:
+        ...     print(e.message)
+    """
+    data = parse_llm_json(response)
+    try:
+        get_response_validator(prompt_name)(data)
+    except fastjsonschema.JsonSchemaException as e:
+        raise LLMResponseError(f"Schema validation failed: {e.message}", response, data) from e
+    return data
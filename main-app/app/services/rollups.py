@@ -0,0 +1,101 @@
+"""
+Фоновое обновление дневных агрегатов статистики.
+Раз в ROLLUP_INTERVAL_SECONDS задача добавляет в агрегаты опросов
+и напоминаний о приеме препаратов строки после водяного знака
+(app.crud.rollup). Каждый шаг - отдельная транзакция; при нескольких
+воркерах API шаг выполняет тот, кто первым заблокировал водяной знак.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.crud.rollup import rollup_adherence, rollup_surveys
+
+logger = logging.getLogger(__name__)
+
+# Шагов подряд без паузы, пока остаются необработанные строки
+MAX_STEPS_PER_RUN = 100
+
+
+class RollupJob:
+    """
+    Инкрементальное обновление агрегатов опросов и напоминаний
+
+    Example:
+        >>> await rollup_job.start()
+        >>> await rollup_job.run_once()
+    """
+
+    def __init__(
+        self,
+        interval: float = 300,
+        batch_size: int = 50000,
+        settle_hours: float = 24,
+        timezone: str = "UTC"
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.settle = timedelta(hours=settle_hours)
+        self.timezone = timezone
+        self._task: Optional[asyncio.Task] = None
+
+    async def _step(self, rollup: Callable[[AsyncSession], Awaitable[bool]]) -> bool:
+        async with async_session_maker() as db:
+            more = await rollup(db)
+            await db.commit()
+        return more
+
+    async def _drain(self, name: str, rollup: Callable[[AsyncSession], Awaitable[bool]]) -> None:
+        for _ in range(MAX_STEPS_PER_RUN):
+            if not await self._step(rollup):
+                return
+        logger.info(f"Агрегаты {name}: обработка продолжится в следующем проходе")
+
+    async def run_once(self) -> None:
+        """Обновить оба вида агрегатов до текущего водяного знака"""
+        await self._drain("опросов", lambda db: rollup_surveys(
+            db, timezone=self.timezone, batch_size=self.batch_size
+        ))
+        await self._drain("напоминаний", lambda db: rollup_adherence(
+            db, timezone=self.timezone, settle=self.settle
+        ))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Не удалось обновить агрегаты статистики: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """Запустить фоновое обновление"""
+        if self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="stats-rollups")
+
+    async def stop(self) -> None:
+        """Остановить фоновое обновление"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Глобальный экземпляр сервиса
+rollup_job = RollupJob(
+    interval=settings.ROLLUP_INTERVAL_SECONDS,
+    batch_size=settings.ROLLUP_BATCH_SIZE,
+    settle_hours=settings.ADHERENCE_SETTLE_HOURS,
+    timezone=settings.SURVEY_STATS_TIMEZONE,
+)
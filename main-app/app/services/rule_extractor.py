@@ -0,0 +1,351 @@
+"""
+Модуль для извлечения структурированной информации из планов лечения по правилам.
+Разбирает типовые шаблоны клиник (разделы "Врач", "Жалобы", "Направления",
+"Препараты") регулярными выражениями и возвращает данные в формате схемы
+extract_treatment_plan.yaml, чтобы не обращаться к LLM для шаблонных документов.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+# Уровни уверенности из response_schema, по возрастанию
+CONFIDENCE_LEVELS = ["низкая", "средняя", "высокая"]
+
+# Заголовки разделов документа -> ключ раздела
+SECTION_HEADINGS = {
+    "врач": "doctor",
+    "лечащий врач": "doctor",
+    "жалобы": "symptoms",
+    "направления": "referrals",
+    "обследования": "referrals",
+    "анализы": "referrals",
+    "препараты": "medications",
+    "назначения": "medications",
+    "лекарственные препараты": "medications",
+    "медикаментозное лечение": "medications",
+    "рекомендации": "recommendations",
+    "анамнез": "other",
+    "диагноз": "other",
+    "заключение": "other",
+}
+
+HEADING_RE = re.compile(
+    r"^(" + "|".join(sorted(SECTION_HEADINGS, key=len, reverse=True)) + r")\s*(?::\s*(.*))?$",
+    re.IGNORECASE
+)
+PAGE_MARKER_RE = re.compile(r"^--- Страница \d+ ---$")
+TABLE_SEPARATOR_RE = re.compile(r"^\|[\s\-|:]+\|$")
+ITEM_RE = re.compile(r"^(?:\d+[.)]|[-•*])\s*(.+)$")
+
+DOSAGE_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(мг|мкг|мл|г|ед|капел[ьи]|капл[иья]?)\b", re.IGNORECASE)
+FREQUENCY_RE = re.compile(r"(\d+)\s*(раза?)\s+в\s+(день|сутки|неделю)", re.IGNORECASE)
+DURATION_RE = re.compile(r"(\d+)\s*(дней|дня|день|недел[июь]|недель|месяц(?:а|ев)?)\b", re.IGNORECASE)
+TIMING_RE = re.compile(r"(до еды|после еды|во время еды|независимо от еды)", re.IGNORECASE)
+CONDITION_RE = re.compile(r"\b(при\s+[а-яё]+(?:\s+[а-яё]+)?)", re.IGNORECASE)
+DEADLINE_RE = re.compile(r"(в течение\s+\d+\s+[а-яё]+|до\s+\d{1,2}[./]\d{1,2}(?:[./]\d{2,4})?)", re.IGNORECASE)
+FULL_NAME_RE = re.compile(
+    r"([А-ЯЁ][а-яё]+(?:-[А-ЯЁ][а-яё]+)?\s+(?:[А-ЯЁ]\.\s?[А-ЯЁ]\.|[А-ЯЁ][а-яё]+\s+[А-ЯЁ][а-яё]+))"
+)
+ORGANIZATION_RE = re.compile(
+    r"((?:поликлиника|больница|клиника|медицинский центр|госпиталь|гбуз|гауз)[^\n,]*)",
+    re.IGNORECASE
+)
+SPECIALIZATION_RE = re.compile(
+    r"^[А-ЯЁа-яё]*(?:олог|ист|терапевт|хирург|педиатр|ортопед|врач)(?:-[а-яё]+)*$",
+    re.IGNORECASE
+)
+
+FORMS = {
+    "таблет": "таблетки",
+    "капсул": "капсулы",
+    "сироп": "сироп",
+    "гель": "гель",
+    "мазь": "мазь",
+    "крем": "крем",
+    "спрей": "спрей",
+    "капл": "капли",
+    "раствор": "раствор",
+    "пластыр": "пластырь",
+    "свеч": "свечи",
+    "порош": "порошок",
+}
+FORM_RE = re.compile(r"\b(" + "|".join(FORMS) + r")[а-яё]*", re.IGNORECASE)
+
+EXAMINATION_TYPES = [
+    (re.compile(r"\bузи\b", re.IGNORECASE), "УЗИ"),
+    (re.compile(r"\bмрт\b", re.IGNORECASE), "МРТ"),
+    (re.compile(r"\bкт\b", re.IGNORECASE), "КТ"),
+    (re.compile(r"\bэкг\b", re.IGNORECASE), "ЭКГ"),
+    (re.compile(r"рентген", re.IGNORECASE), "рентген"),
+    (re.compile(r"анализ", re.IGNORECASE), "анализ"),
+]
+
+# Поля, которые в response_schema не допускают null: при отсутствии не выводятся
+NON_NULLABLE_FIELDS = {"full_name", "specialization", "dosage", "frequency", "duration"}
+
+# Слова, после которых в строке назначения название препарата заканчивается
+NAME_STOP_RE = re.compile(r"(\d|,|\(|\bпо\b|\bсогласно\b|\bпринимать\b|\bприменя)", re.IGNORECASE)
+
+
+def _drop_missing(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Удаление незаполненных полей, для которых схема не допускает null"""
+    return {
+        key: value for key, value in item.items()
+        if value is not None or key not in NON_NULLABLE_FIELDS
+    }
+
+
+class RuleExtractionResult:
+    """Результат извлечения по правилам"""
+
+    def __init__(self, data: Dict[str, Any], missing_fields: List[str]):
+        self.data = data
+        self.missing_fields = missing_fields
+
+    @property
+    def confidence(self) -> str:
+        """Уровень уверенности в терминах response_schema"""
+        return self.data["metadata"]["confidence"]
+
+    @property
+    def is_sufficient(self) -> bool:
+        """Достаточно ли результата, чтобы не обращаться к LLM"""
+        min_level = CONFIDENCE_LEVELS.index(settings.RULE_EXTRACTION_MIN_CONFIDENCE)
+        return CONFIDENCE_LEVELS.index(self.confidence) >= min_level
+
+
+class RuleExtractor:
+    """Извлечение данных плана лечения из текста типовых шаблонов"""
+
+    def extract(self, text: str) -> RuleExtractionResult:
+        """
+        Извлечение данных из текста плана лечения
+
+        Args:
+            text: Текст плана лечения (результат PDFProcessor)
+
+        Returns:
+            Результат с данными в формате response_schema и списком
+            незаполненных обязательных полей
+        """
+        sections = self._split_sections(text)
+
+        referrals, examinations = self._parse_directions(sections.get("referrals", []))
+        medications = [
+            self._parse_medication(item)
+            for item in self._split_items(sections.get("medications", []))
+        ]
+        data = {
+            "doctor": self._parse_doctor(sections.get("doctor", []), text),
+            "symptoms": self._parse_symptoms(sections.get("symptoms", [])),
+            "referrals": referrals,
+            "examinations": examinations,
+            # Пункты, не начинающиеся с названия препарата, - пояснения к разделу
+            "medications": [m for m in medications if m["name"]],
+            "additional_recommendations": self._split_items(sections.get("recommendations", [])) or None,
+        }
+
+        missing_fields = self._get_missing_fields(data)
+        data["metadata"] = {
+            "confidence": self._get_confidence(data, missing_fields),
+            "notes": "Извлечено по шаблону без LLM",
+        }
+        return RuleExtractionResult(data, missing_fields)
+
+    def _split_sections(self, text: str) -> Dict[str, List[str]]:
+        """Разбиение текста на разделы по известным заголовкам"""
+        sections: Dict[str, List[str]] = {}
+        current: Optional[str] = None
+
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if not line or PAGE_MARKER_RE.match(line) or TABLE_SEPARATOR_RE.match(line):
+                continue
+
+            match = HEADING_RE.match(line)
+            if match:
+                current = SECTION_HEADINGS[match.group(1).lower()]
+                sections.setdefault(current, [])
+                if match.group(2):
+                    sections[current].append(match.group(2).strip())
+                continue
+
+            if current is not None:
+                sections[current].append(line)
+
+        return sections
+
+    @staticmethod
+    def _split_items(lines: List[str]) -> List[str]:
+        """
+        Разбиение раздела на пункты
+
+        Пункт начинается с номера, маркера списка или строки таблицы,
+        строки без маркера продолжают предыдущий пункт.
+        """
+        items: List[str] = []
+        for line in lines:
+            if line.startswith("|"):
+                cells = [cell.strip() for cell in line.strip("|").split("|")]
+                # Заголовок таблицы не содержит чисел
+                if not any(re.search(r"\d", cell) for cell in cells):
+                    continue
+                items.append(" ".join(cell for cell in cells if cell))
+                continue
+
+            match = ITEM_RE.match(line)
+            if match or not items:
+                items.append((match.group(1) if match else line).strip())
+            else:
+                items[-1] = f"{items[-1]} {line}"
+        return items
+
+    @staticmethod
+    def _parse_doctor(lines: List[str], text: str) -> Dict[str, Any]:
+        """Разбор раздела о враче: ФИО, специализация, учреждение"""
+        full_name = None
+        specialization = None
+
+        for line in lines:
+            for part in (p.strip() for p in line.split(",")):
+                if not part:
+                    continue
+                name_match = FULL_NAME_RE.search(part)
+                if name_match and full_name is None:
+                    full_name = name_match.group(1)
+                elif SPECIALIZATION_RE.match(part) and specialization is None:
+                    specialization = part.capitalize()
+
+        organization_match = ORGANIZATION_RE.search(text)
+        return _drop_missing({
+            "full_name": full_name,
+            "specialization": specialization,
+            "medical_organization": organization_match.group(1).strip() if organization_match else None,
+        })
+
+    @staticmethod
+    def _parse_symptoms(lines: List[str]) -> List[Dict[str, Any]]:
+        """Разбор жалоб: перечисление через запятую, точку с запятой или строки"""
+        symptoms = []
+        for part in re.split(r"[,;\n]", "\n".join(lines)):
+            part = part.strip(" .")
+            if part:
+                symptoms.append({"symptom": part[0].lower() + part[1:], "severity": "неизвестна"})
+        return symptoms
+
+    def _parse_directions(self, lines: List[str]) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Разбор направлений на направления к специалистам и обследования"""
+        referrals = []
+        examinations = []
+
+        for item in self._split_items(lines):
+            name = re.split(r"[(]", item)[0].strip(" .,")
+
+            if SPECIALIZATION_RE.match(name):
+                referrals.append({
+                    "specialization": name,
+                    "purpose": None,
+                    "urgency": "неизвестна",
+                })
+                continue
+
+            exam_type = next(
+                (label for pattern, label in EXAMINATION_TYPES if pattern.search(name)),
+                "другое"
+            )
+            deadline_match = DEADLINE_RE.search(item)
+            details = re.findall(r"\(([^)]*)\)", item)
+            preparation = " ".join(details)
+            if deadline_match:
+                preparation = preparation.replace(deadline_match.group(1), "")
+            preparation = preparation.strip(" ,.")
+
+            examinations.append({
+                "name": name,
+                "type": exam_type,
+                "preparation": preparation or None,
+                "deadline": deadline_match.group(1) if deadline_match else None,
+            })
+
+        return referrals, examinations
+
+    @staticmethod
+    def _parse_medication(item: str) -> Dict[str, Any]:
+        """Разбор назначения: название, дозировка, частота, длительность и т.д."""
+        stop = NAME_STOP_RE.search(item)
+        name = item[:stop.start()] if stop else item
+        form_match = FORM_RE.search(item)
+        if form_match:
+            name = FORM_RE.sub("", name)
+        name = " ".join(name.split()).strip(" .,-")
+
+        dosage = DOSAGE_RE.search(item)
+        frequency = FREQUENCY_RE.search(item)
+        duration = DURATION_RE.search(item)
+        timing = TIMING_RE.search(item)
+        condition = CONDITION_RE.search(item)
+
+        return _drop_missing({
+            "name": name,
+            "dosage": f"{dosage.group(1)} {dosage.group(2).lower()}" if dosage else None,
+            "frequency": f"{frequency.group(1)} {frequency.group(2).lower()} в {frequency.group(3).lower()}" if frequency else None,
+            "timing": timing.group(1).lower() if timing else "не указано",
+            "duration": f"{duration.group(1)} {duration.group(2).lower()}" if duration else None,
+            "form": FORMS[form_match.group(1).lower()] if form_match else None,
+            "special_instructions": condition.group(1) if condition else None,
+        })
+
+    @staticmethod
+    def _get_missing_fields(data: Dict[str, Any]) -> List[str]:
+        """Список обязательных полей, которые не удалось извлечь"""
+        missing = []
+        if not data["doctor"].get("full_name") and not data["doctor"].get("specialization"):
+            missing.append("doctor")
+        if not data["medications"]:
+            missing.append("medications")
+        for index, medication in enumerate(data["medications"]):
+            if not medication["name"]:
+                missing.append(f"medications[{index}].name")
+            if not medication.get("frequency"):
+                missing.append(f"medications[{index}].frequency")
+        return missing
+
+    @staticmethod
+    def _get_confidence(data: Dict[str, Any], missing_fields: List[str]) -> str:
+        """
+        Оценка уверенности
+
+        Высокая - врач и все назначения (название и частота) разобраны,
+        средняя - есть назначения, но часть полей не найдена,
+        низкая - раздел назначений не найден.
+        """
+        if not data["medications"] or not any(m["name"] for m in data["medications"]):
+            return "низкая"
+        if missing_fields:
+            return "средняя"
+        return "высокая"
+
+
+# Глобальный экземпляр экстрактора
+rule_extractor = RuleExtractor()
+
+
+def extract_treatment_plan_by_rules(text: str) -> RuleExtractionResult:
+    """
+    Извлечь данные плана лечения по правилам без обращения к LLM
+
+    Args:
+        text: Текст плана лечения
+
+    Returns:
+        RuleExtractionResult; если result.is_sufficient - данные можно
+        использовать без обращения к GigaChat
+
+    Example:
+        >>> result = extract_treatment_plan_by_rules(text)
+        >>> if result.is_sufficient:
+        ...     print(result.data["medications"])
+    """
+    return rule_extractor.extract(text)
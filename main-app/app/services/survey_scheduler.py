@@ -0,0 +1,106 @@
+"""
+Планировщик опросов по симптомам.
+У каждого симптома есть срок следующего опроса (symptoms.next_survey_at).
+Раз в SURVEY_SCHEDULER_INTERVAL_SECONDS задача ставит напоминания reminder
+по симптомам, срок которых наступает до следующего запуска, и сдвигает срок:
+чаще, если оценки растут, реже, если стабильны (crud.survey.schedule_due).
+Каждый запуск читает только такие симптомы, а не всех пациентов.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from app import crud
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.crud.survey import SurveySchedulePolicy
+
+logger = logging.getLogger(__name__)
+
+# Пачек подряд без паузы, пока остаются симптомы со сроком опроса
+MAX_BATCHES_PER_RUN = 100
+
+
+class SurveyScheduler:
+    """
+    Адаптивное расписание опросов по симптомам
+
+    Example:
+        >>> await survey_scheduler.run_once()
+        12
+    """
+
+    def __init__(
+        self,
+        policy: SurveySchedulePolicy = SurveySchedulePolicy(),
+        interval: float = 900,
+        batch_size: int = 1000
+    ):
+        self.policy = policy
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """
+        Поставить напоминания на ближайший период
+
+        Returns:
+            Количество созданных напоминаний
+        """
+        reminded = 0
+        for _ in range(MAX_BATCHES_PER_RUN):
+            async with async_session_maker() as db:
+                rows = await crud.survey.schedule_due(
+                    db,
+                    policy=self.policy,
+                    lookahead=timedelta(seconds=self.interval),
+                    batch_size=self.batch_size,
+                )
+                await db.commit()
+            reminded += sum(1 for row in rows if row.reminded)
+            if len(rows) < self.batch_size:
+                break
+        if reminded:
+            logger.info(f"Поставлено напоминаний об опросе: {reminded}")
+        return reminded
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.warning(f"Не удалось запланировать опросы по симптомам: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """Запустить планировщик"""
+        if self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="survey-scheduler")
+
+    async def stop(self) -> None:
+        """Остановить планировщик"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+# Глобальный экземпляр сервиса
+survey_scheduler = SurveyScheduler(
+    policy=SurveySchedulePolicy(
+        rising_interval=timedelta(hours=settings.SURVEY_INTERVAL_MIN_HOURS),
+        base_interval=timedelta(hours=settings.SURVEY_INTERVAL_BASE_HOURS),
+        stable_interval=timedelta(hours=settings.SURVEY_INTERVAL_MAX_HOURS),
+        trend_window=timedelta(days=settings.SURVEY_TREND_DAYS),
+    ),
+    interval=settings.SURVEY_SCHEDULER_INTERVAL_SECONDS,
+    batch_size=settings.SURVEY_SCHEDULER_BATCH_SIZE,
+)
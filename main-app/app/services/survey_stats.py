@@ -0,0 +1,97 @@
+"""
+Модуль динамики симптомов по опросам пациента.
+Агрегаты по дням и неделям и тренд считаются в БД (crud.survey.get_plan_stats),
+здесь строки запроса собираются в ответ по симптомам и сглаживаются
+скользящим средним. NumPy используется только для длинных рядов:
+на коротких чистый Python быстрее.
+"""
+
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+# С какой длины ряда сглаживать через NumPy
+NUMPY_MIN_POINTS = 64
+
+
+def _moving_average_python(values: Sequence[float], window: int) -> List[float]:
+    smoothed = []
+    total = 0.0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        smoothed.append(total / min(i + 1, window))
+    return smoothed
+
+
+def _moving_average_numpy(values: Sequence[float], window: int) -> List[float]:
+    data = np.asarray(values, dtype=float)
+    cumsum = np.concatenate(([0.0], np.cumsum(data)))
+    ends = np.arange(1, len(data) + 1)
+    starts = np.maximum(ends - window, 0)
+    return ((cumsum[ends] - cumsum[starts]) / (ends - starts)).tolist()
+
+
+def moving_average(values: Sequence[float], window: int) -> List[float]:
+    """
+    Скользящее среднее по последним window точкам
+
+    Первые точки усредняются по имеющимся значениям, поэтому длина ряда
+    не меняется и последняя точка всегда есть.
+
+    Args:
+        values: Значения по времени
+        window: Ширина окна (1 - без сглаживания)
+
+    Example:
+        >>> moving_average([2, 4, 6, 8], window=2)
+        [2.0, 3.0, 5.0, 7.0]
+    """
+    if window <= 1 or not values:
+        return [float(value) for value in values]
+
+    if len(values) >= NUMPY_MIN_POINTS:
+        return _moving_average_numpy(values, window)
+    return _moving_average_python(values, window)
+
+
+def _round(value: Any, digits: int = 2) -> Optional[float]:
+    return None if value is None else round(float(value), digits)
+
+
+def build_symptom_stats(rows: Iterable[Any], smooth: int = 0) -> List[Dict[str, Any]]:
+    """
+    Динамика по симптомам из строк crud.survey.get_plan_stats
+
+    Args:
+        rows: Строки запроса (упорядочены по симптому и времени)
+        smooth: Окно скользящего среднего в интервалах (0 или 1 - без сглаживания)
+
+    Returns:
+        Список словарей в формате schemas.SymptomStats
+    """
+    symptoms = []
+    for symptom_id, group in groupby(rows, key=lambda row: row.symptom_id):
+        group = list(group)
+        averages = [float(row.avg_value) for row in group]
+        smoothed = moving_average(averages, smooth) if smooth > 1 else [None] * len(group)
+        symptoms.append({
+            "symptom_id": symptom_id,
+            "description": group[0].description,
+            "trend": _round(group[0].slope, 4),
+            "buckets": [
+                {
+                    "start": row.bucket.date(),
+                    "min": row.min_value,
+                    "avg": _round(average),
+                    "max": row.max_value,
+                    "count": row.count,
+                    "change": _round(row.change),
+                    "smoothed": _round(smoothed_value),
+                }
+                for row, average, smoothed_value in zip(group, averages, smoothed)
+            ],
+        })
+    return symptoms
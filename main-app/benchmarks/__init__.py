@@ -0,0 +1,3 @@
+"""
+Бенчмарки Health Assist API
+"""
@@ -0,0 +1,334 @@
+"""
+Генерация корпуса PDF-документов для бенчмарков.
+
+Документы рендерятся через PyMuPDF (fitz.Story, шрифты с кириллицей)
+детерминированно по seed, чтобы прогоны были сопоставимы между собой.
+"""
+
+import html
+import io
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+# Пример плана из репозитория (если есть)
+SAMPLE_PDF = Path(__file__).resolve().parents[2] / "data" / "Образец плана лечения.pdf"
+
+STYLESHEET = """
+body { font-family: sans-serif; font-size: 11pt; }
+h1 { font-size: 15pt; }
+h2 { font-size: 12pt; margin-top: 8pt; }
+table { border-collapse: collapse; width: 100%; }
+th, td { border: 1px solid #888; padding: 3pt; font-size: 10pt; }
+"""
+
+DOCTORS = [
+    ("Терапевт", "Иванова Мария Петровна"),
+    ("Кардиолог", "Петров Алексей Сергеевич"),
+    ("Невролог", "Соколова Елена Викторовна"),
+    ("Травматолог", "Иванов Иван Иванович"),
+    ("Эндокринолог", "Кузнецов Дмитрий Андреевич"),
+]
+
+COMPLAINTS = [
+    "Боль в пояснице", "Головная боль", "Кашель", "Повышенная температура",
+    "Слабость", "Боль в области 1 пальца правой кисти", "Повышенное давление",
+]
+
+MEDICATIONS = [
+    ("Амоксициллин", "500 мг", "3 раза в день", "7 дней"),
+    ("Наиз", "100 мг", "1 раз в день", "10 дней"),
+    ("Мелоксикам", "15 мг", "1 раз в день", "5 дней"),
+    ("Лизиноприл", "10 мг", "1 раз в день", "30 дней"),
+    ("Аторвастатин", "20 мг", "1 раз в день", "90 дней"),
+    ("Амброксол", "30 мг", "3 раза в день", "5 дней"),
+    ("Парацетамол", "500 мг", "2 раза в день", "3 дня"),
+    ("Толперизон", "150 мг", "3 раза в день", "10 дней"),
+]
+
+DIRECTIONS = [
+    "Общий анализ крови", "УЗИ кисти рук", "КТ стопы или кисти", "ЭКГ",
+    "МРТ поясничного отдела позвоночника", "Кардиолог", "Офтальмолог",
+]
+
+ANAMNESIS = (
+    "Со слов пациента, симптомы беспокоят в течение двух недель, усиливаются "
+    "к вечеру и после физической нагрузки. Ранее за медицинской помощью не "
+    "обращался, принимал обезболивающие препараты без назначения врача. "
+    "Хронические заболевания отрицает, аллергологический анамнез не отягощен. "
+)
+
+
+@dataclass
+class CorpusDocument:
+    """Документ корпуса"""
+
+    name: str
+    kind: str
+    content: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+def render_html(body: str, css: str = STYLESHEET) -> bytes:
+    """
+    Рендеринг HTML в PDF через fitz.Story
+
+    Args:
+        body: HTML-разметка документа
+        css: Стили
+
+    Returns:
+        Содержимое PDF
+    """
+    buffer = io.BytesIO()
+    story = fitz.Story(html=body, user_css=css)
+    writer = fitz.DocumentWriter(buffer)
+    mediabox = fitz.paper_rect("a4")
+    where = mediabox + (36, 36, -36, -36)
+
+    more = True
+    while more:
+        device = writer.begin_page(mediabox)
+        more, _ = story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+    return buffer.getvalue()
+
+
+def rasterize(pdf_bytes: bytes, dpi: int = 150) -> bytes:
+    """
+    Превращение PDF в скан: каждая страница заменяется картинкой
+
+    Args:
+        pdf_bytes: Исходный PDF
+        dpi: Разрешение растеризации
+
+    Returns:
+        PDF без текстового слоя
+    """
+    source = fitz.open(stream=pdf_bytes, filetype="pdf")
+    scanned = fitz.open()
+    for page in source:
+        pixmap = page.get_pixmap(dpi=dpi)
+        new_page = scanned.new_page(width=page.rect.width, height=page.rect.height)
+        new_page.insert_image(new_page.rect, stream=pixmap.tobytes("png"))
+    content = scanned.tobytes(garbage=3, deflate=True)
+    source.close()
+    scanned.close()
+    return content
+
+
+def _pick(rng: random.Random, items: List, count: int) -> List:
+    return rng.sample(items, min(count, len(items)))
+
+
+def template_plan_html(rng: random.Random, medications: int = 3, anamnesis_paragraphs: int = 1) -> str:
+    """План по типовому шаблону (разбирается по правилам без LLM)"""
+    esc = html.escape
+    specialization, doctor = rng.choice(DOCTORS)
+    parts = [
+        "<h1>Заключение</h1>",
+        f"<h2>Врач</h2><p>{esc(specialization)}</p><p>{esc(doctor)}</p>",
+        f"<h2>Жалобы</h2><p>{esc(rng.choice(COMPLAINTS))}</p>",
+        "<h2>Анамнез</h2>" + "".join(f"<p>{ANAMNESIS}</p>" for _ in range(anamnesis_paragraphs)),
+        "<h2>Диагноз</h2><p>На основании предоставленной информации можно предположить "
+        "острое воспалительное заболевание.</p>",
+        "<h2>Направления</h2>" + "".join(
+            f"<p>{index}. {esc(direction)}</p>"
+            for index, direction in enumerate(_pick(rng, DIRECTIONS, 3), start=1)
+        ),
+        "<p>Препараты:</p>",
+    ]
+    for index, (name, dosage, frequency, duration) in enumerate(_pick(rng, MEDICATIONS, medications), start=1):
+        parts.append(
+            f"<p>{index}. {esc(name)}</p>"
+            f"<p>Согласно инструкции применяется {esc(dosage)} {esc(frequency)} {esc(duration)}.</p>"
+        )
+    return "".join(parts)
+
+
+def freeform_plan_html(rng: random.Random, medications: int = 3, anamnesis_paragraphs: int = 1) -> str:
+    """План в свободной форме (требует извлечения через LLM)"""
+    esc = html.escape
+    specialization, doctor = rng.choice(DOCTORS)
+    treatment = "; ".join(
+        f"{esc(name)} по {esc(dosage)} {esc(frequency)} в течение {esc(duration)}"
+        for name, dosage, frequency, duration in _pick(rng, MEDICATIONS, medications)
+    )
+    parts = [
+        f"<p>Пациент осмотрен врачом ({esc(specialization.lower())}) {esc(doctor)}. "
+        f"Беспокоит: {esc(rng.choice(COMPLAINTS).lower())}.</p>",
+        "".join(f"<p>{ANAMNESIS}</p>" for _ in range(anamnesis_paragraphs)),
+        f"<p>Рекомендовано пройти: {esc(', '.join(_pick(rng, DIRECTIONS, 3)))}. "
+        f"Назначено лечение: {treatment}.</p>",
+        "<p>Повторный прием через две недели или при ухудшении состояния.</p>",
+    ]
+    return "".join(parts)
+
+
+def table_plan_html(rng: random.Random, medications: int = 5) -> str:
+    """План с назначениями в таблице (проверка восстановления таблиц)"""
+    esc = html.escape
+    specialization, doctor = rng.choice(DOCTORS)
+    rows = "".join(
+        f"<tr><td>{esc(name)}</td><td>{esc(dosage)}</td><td>{esc(frequency)}</td><td>{esc(duration)}</td></tr>"
+        for name, dosage, frequency, duration in _pick(rng, MEDICATIONS, medications)
+    )
+    return (
+        f"<h1>План лечения</h1><p>Врач: {esc(specialization)}, {esc(doctor)}</p>"
+        f"<p>Жалобы: {esc(rng.choice(COMPLAINTS))}</p>"
+        "<h2>Назначения</h2>"
+        "<table><tr><th>Препарат</th><th>Дозировка</th><th>Частота</th><th>Длительность</th></tr>"
+        f"{rows}</table>"
+    )
+
+
+# Плотность текста: слов на странице и размер шрифта
+TEXT_DENSITIES = {
+    "sparse": (60, 12),
+    "normal": (300, 11),
+    "dense": (750, 8),
+}
+
+# Изображения: none - только текст, inline - картинка на каждой странице,
+# scan - страница целиком картинкой (без текстового слоя)
+IMAGE_MODES = ("none", "inline", "scan")
+
+FONT_FAMILIES = ("sans-serif", "serif", "monospace")
+
+WORDS = (ANAMNESIS + " ".join(COMPLAINTS) + " " + " ".join(m[0] for m in MEDICATIONS)).split()
+
+
+@dataclass(frozen=True)
+class DocumentShape:
+    """Форма документа для микро-бенчмарков обработки PDF"""
+
+    pages: int = 10
+    density: str = "normal"
+    images: str = "none"
+    font: str = "sans-serif"
+
+    @property
+    def name(self) -> str:
+        return f"p{self.pages}_{self.density}_{self.images}_{self.font}"
+
+
+def _random_image(rng: random.Random, width: int = 320, height: int = 240) -> bytes:
+    """PNG со случайным шумом (плохо сжимается, как фотография)"""
+    samples = bytes(rng.getrandbits(8) for _ in range(width * height * 3))
+    return fitz.Pixmap(fitz.csRGB, width, height, samples, 0).tobytes("png")
+
+
+def render_shape(shape: DocumentShape, seed: int = 42) -> bytes:
+    """
+    Сгенерировать PDF заданной формы
+
+    Каждая страница рендерится отдельно, поэтому количество страниц
+    точно равно shape.pages.
+
+    Args:
+        shape: Форма документа
+        seed: Seed генератора текста и изображений
+
+    Returns:
+        Содержимое PDF
+    """
+    rng = random.Random(seed)
+    words, font_size = TEXT_DENSITIES[shape.density]
+    css = f"body {{ font-family: {shape.font}; font-size: {font_size}pt; }}"
+    image = _random_image(rng) if shape.images == "inline" else None
+
+    buffer = io.BytesIO()
+    writer = fitz.DocumentWriter(buffer)
+    mediabox = fitz.paper_rect("a4")
+    where = mediabox + (36, 36, -36, -36)
+    if image is not None:
+        # Место под картинку внизу страницы
+        where = where + (0, 0, 0, -260)
+
+    for page_num in range(shape.pages):
+        text = " ".join(rng.choice(WORDS) for _ in range(words))
+        story = fitz.Story(html=f"<h2>Страница {page_num + 1}</h2><p>{html.escape(text)}</p>", user_css=css)
+        device = writer.begin_page(mediabox)
+        story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+    content = buffer.getvalue()
+
+    if image is not None:
+        doc = fitz.open(stream=content, filetype="pdf")
+        for page in doc:
+            # Содержимое от DocumentWriter оставляет измененную матрицу - изолируем его
+            page.wrap_contents()
+            rect = page.rect
+            page.insert_image(fitz.Rect(36, rect.height - 286, 356, rect.height - 46), stream=image)
+        content = doc.tobytes(garbage=3, deflate=True)
+        doc.close()
+
+    if shape.images == "scan":
+        content = rasterize(content, dpi=100)
+    return content
+
+
+# Виды документов: имя -> функция генерации
+DOCUMENT_KINDS = {
+    "template": lambda rng: render_html(template_plan_html(rng)),
+    "freeform": lambda rng: render_html(freeform_plan_html(rng)),
+    "table": lambda rng: render_html(table_plan_html(rng)),
+    "long": lambda rng: render_html(freeform_plan_html(rng, medications=8, anamnesis_paragraphs=40)),
+    "scan": lambda rng: rasterize(render_html(template_plan_html(rng))),
+}
+
+
+def build_corpus(
+    kinds: Optional[List[str]] = None,
+    per_kind: int = 3,
+    seed: int = 42,
+    include_sample: bool = True
+) -> List[CorpusDocument]:
+    """
+    Сформировать корпус документов
+
+    Args:
+        kinds: Виды документов из DOCUMENT_KINDS (по умолчанию - все)
+        per_kind: Количество документов каждого вида
+        seed: Seed генератора (одинаковый seed - одинаковый корпус)
+        include_sample: Добавить образец плана из data/
+
+    Returns:
+        Список документов
+    """
+    rng = random.Random(seed)
+    documents = []
+    for kind in kinds or list(DOCUMENT_KINDS):
+        generate = DOCUMENT_KINDS[kind]
+        for index in range(per_kind):
+            documents.append(CorpusDocument(f"{kind}_{index}.pdf", kind, generate(rng)))
+
+    if include_sample and SAMPLE_PDF.exists():
+        documents.append(CorpusDocument("sample.pdf", "sample", SAMPLE_PDF.read_bytes()))
+    return documents
+
+
+def save_corpus(documents: List[CorpusDocument], directory: Path) -> Dict[str, Path]:
+    """
+    Сохранить корпус на диск (для ручной проверки документов)
+
+    Returns:
+        Словарь имя документа -> путь
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for document in documents:
+        path = directory / document.name
+        path.write_bytes(document.content)
+        paths[document.name] = path
+    return paths
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк времени импорта (холодного старта) API.
+
+Каждый замер - отдельный процесс интерпретатора:
+- `python -X importtime -c "import <модуль>"` - суммарное время импорта
+  модуля и разбивка по пакетам (собственное время всех их модулей);
+- `python -c "import <модуль>"` без флага - полное время запуска процесса
+  (то, что платит каждый воркер и каждый перезапуск --reload).
+
+Дополнительно проверяется, что тяжелые библиотеки из LAZY_MODULES
+(PyMuPDF, GigaChat SDK, PyYAML, Jinja2) не импортируются при старте - они
+загружаются при первой загрузке плана или только в пуле процессов.
+
+Запуск (из main-app/):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --targets app.main app.api.v1.plans --repeat 10 --save-baseline
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from benchmarks.measure import compare_with_baseline, load_baseline, save_results, summarize
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCHMARKS_DIR.parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baselines" / "import_time.json"
+DEFAULT_RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+DEFAULT_TARGETS = ["app.main"]
+
+# Библиотеки, которые не должны импортироваться при старте API
+LAZY_MODULES = ("fitz", "gigachat", "yaml", "jinja2")
+
+# Проверяемые метрики и минимальный абсолютный рост (мс)
+REGRESSION_METRICS = {"p50": 20.0, "p95": 40.0}
+
+
+class ImportRecord(NamedTuple):
+    """Строка отчета -X importtime"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Разбор отчета -X importtime
+
+    Строки имеют вид "import time: <self, мкс> | <cumulative, мкс> | <отступ><модуль>",
+    отступ (по два пробела) - глубина вложенности импорта.
+
+    Args:
+        output: stderr процесса
+
+    Returns:
+        Импортированные модули в порядке завершения импорта
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            # Заголовок "self [us] | cumulative | imported package"
+            continue
+        name = parts[2].rstrip()
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        records.append(ImportRecord(module, int(parts[0]), int(parts[1]), depth))
+    return records
+
+
+def _run_python(args: List[str]) -> subprocess.CompletedProcess:
+    result = subprocess.run(
+        [sys.executable, *args],
+        cwd=APP_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Процесс {' '.join(args)} завершился с кодом {result.returncode}:\n{result.stderr[-2000:]}")
+    return result
+
+
+def measure_import(target: str) -> List[ImportRecord]:
+    """Отчет -X importtime для импорта target в новом процессе"""
+    return parse_importtime(_run_python(["-X", "importtime", "-c", f"import {target}"]).stderr)
+
+
+def measure_process(target: str) -> float:
+    """Время запуска нового процесса с импортом target (секунды)"""
+    started_at = time.perf_counter()
+    _run_python(["-c", f"import {target}"])
+    return time.perf_counter() - started_at
+
+
+def package_times(records: List[ImportRecord]) -> Dict[str, float]:
+    """Собственное время импорта по пакетам верхнего уровня (мс)"""
+    packages: Dict[str, float] = defaultdict(float)
+    for record in records:
+        packages[record.module.split(".")[0]] += record.self_us / 1000
+    return packages
+
+
+def measure_target(target: str, repeat: int, warmup: int) -> Dict[str, Any]:
+    """
+    Замеры для одного модуля
+
+    Returns:
+        Сводки import/process, медианы по пакетам и найденные LAZY_MODULES
+    """
+    # Прогрев: компиляция .pyc и страничный кэш файлов библиотек
+    for _ in range(warmup):
+        measure_process(target)
+
+    import_times = []
+    process_times = []
+    packages: Dict[str, List[float]] = defaultdict(list)
+    imported = set()
+    for _ in range(repeat):
+        records = measure_import(target)
+        total = next((r.cumulative_us for r in records if r.module == target and r.depth == 0), 0)
+        import_times.append(total / 1_000_000)
+        for package, value in package_times(records).items():
+            packages[package].append(value)
+        imported.update(record.module for record in records)
+        process_times.append(measure_process(target))
+
+    return {
+        "import": summarize(import_times),
+        "process": summarize(process_times),
+        "packages": {package: round(median(values), 1) for package, values in packages.items()},
+        "eager_modules": sorted(
+            module for module in LAZY_MODULES
+            if module in imported or any(name.startswith(f"{module}.") for name in imported)
+        ),
+    }
+
+
+def print_report(target: str, measured: Dict[str, Any], top: int) -> None:
+    """Вывод сводки и самых тяжелых пакетов"""
+    print(f"{target}")
+    print(f"  импорт: p50 {measured['import']['p50']} мс, p95 {measured['import']['p95']} мс")
+    print(f"  процесс: p50 {measured['process']['p50']} мс, p95 {measured['process']['p95']} мс")
+    print(f"  тяжелые пакеты (собственное время импорта, p50):")
+    heaviest = sorted(measured["packages"].items(), key=lambda item: item[1], reverse=True)[:top]
+    for package, value in heaviest:
+        print(f"    {package:<32}{value:>10.1f} мс")
+    if measured["eager_modules"]:
+        print(f"  импортируются при старте: {', '.join(measured['eager_modules'])}")
+    print()
+
+
+def run(args: argparse.Namespace) -> int:
+    """Прогон бенчмарка; возвращает код выхода"""
+    print(f"Модулей: {len(args.targets)}, повторов: {args.repeat}, python {sys.version.split()[0]}\n")
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    packages: Dict[str, Dict[str, float]] = {}
+    eager: Dict[str, List[str]] = {}
+    for target in args.targets:
+        measured = measure_target(target, args.repeat, args.warmup)
+        print_report(target, measured, args.top)
+        groups[f"{target}.import"] = measured["import"]
+        groups[f"{target}.process"] = measured["process"]
+        packages[target] = measured["packages"]
+        if measured["eager_modules"]:
+            eager[target] = measured["eager_modules"]
+
+    results = {
+        "benchmark": "import_time",
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "targets": args.targets,
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+        },
+        "groups": groups,
+        "packages": packages,
+    }
+
+    output = args.output or DEFAULT_RESULTS_DIR / f"import_time_{datetime.now():%Y%m%d_%H%M%S}.json"
+    save_results(results, output)
+    print(f"Результаты: {output}")
+
+    if eager:
+        print("\nТяжелые библиотеки импортируются при старте:")
+        for target, modules in eager.items():
+            print(f"  {target}: {', '.join(modules)}")
+        return 1
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"Базовая линия обновлена: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"Базовая линия не найдена ({args.baseline}), сравнение пропущено")
+        return 0
+
+    regressions = compare_with_baseline(groups, baseline["groups"], args.tolerance, REGRESSION_METRICS)
+    if regressions:
+        print("\nРегрессии относительно базовой линии:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("\nРегрессий относительно базовой линии нет")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк времени импорта API")
+    parser.add_argument("--targets", nargs="+", default=DEFAULT_TARGETS, help="Импортируемые модули")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов замера каждого модуля")
+    parser.add_argument("--warmup", type=int, default=1, help="Прогревочных запусков (не учитываются)")
+    parser.add_argument("--top", type=int, default=15, help="Сколько тяжелых пакетов выводить")
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию benchmarks/results/)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Файл базовой линии")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результат как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимый рост метрик (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    sys.exit(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
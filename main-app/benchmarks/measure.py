@@ -0,0 +1,190 @@
+"""
+Общие средства замеров для бенчмарков: перцентили, пиковая память
+процесса (включая дочерние процессы пула) и сравнение с базовой линией.
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Метрики, рост которых считается регрессией, и минимальный абсолютный рост
+# (мс / МБ), ниже которого изменение считается шумом
+REGRESSION_METRICS = {"p50": 5.0, "p95": 5.0, "p99": 5.0, "peak_rss_mb": 10.0}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Перцентиль с линейной интерполяцией
+
+    Args:
+        values: Значения
+        q: Перцентиль от 0 до 100
+
+    Returns:
+        Значение перцентиля (0.0 для пустого списка)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """
+    Сводка по замерам времени
+
+    Args:
+        values: Длительности в секундах
+
+    Returns:
+        count, mean, p50, p95, p99, max (время в миллисекундах)
+    """
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values) * 1000, 3),
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p95": round(percentile(values, 95) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "max": round(max(values) * 1000, 3),
+    }
+
+
+def read_rss(pid: Optional[int] = None) -> int:
+    """
+    Текущий RSS процесса в байтах
+
+    Читается из /proc (Linux); без /proc возвращается пиковый RSS
+    текущего процесса из getrusage.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        if pid is not None:
+            return 0
+        # ru_maxrss в килобайтах на Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def read_total_rss() -> int:
+    """RSS текущего процесса и его дочерних процессов (пул обработки PDF)"""
+    return read_rss() + sum(read_rss(child.pid) for child in multiprocessing.active_children())
+
+
+class RSSSampler:
+    """
+    Фоновый замер RSS с заданным интервалом
+
+    Пиковая память этапа - максимум замеров, попавших в интервал этапа.
+
+    Example:
+        >>> with RSSSampler() as sampler:
+        ...     run()
+        >>> sampler.peak_between(start, end)
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.times: List[float] = []
+        self.values: List[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.times.append(time.perf_counter())
+            self.values.append(read_total_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RSSSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def peak_between(self, start: float, end: float) -> int:
+        """Пиковый RSS (байты) в интервале времени perf_counter"""
+        # Замеры дописываются в конец, поэтому списки отсортированы по времени
+        times = self.times[:len(self.values)]
+        left = bisect_left(times, start)
+        right = bisect_right(times, end)
+        window = self.values[left:right]
+        if not window:
+            # Этап короче интервала замера - берем ближайший замер
+            index = min(left, len(self.values) - 1)
+            return self.values[index] if self.values else 0
+        return max(window)
+
+    @property
+    def peak(self) -> int:
+        """Пиковый RSS за все время замера"""
+        return max(self.values, default=0)
+
+
+def to_mb(size: int) -> float:
+    """Байты в мегабайты"""
+    return round(size / 1024 / 1024, 1)
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    """Загрузить базовую линию (None, если файла нет)"""
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    """Сохранить результаты прогона в JSON"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = 0.2,
+    metrics: Optional[Dict[str, float]] = None
+) -> List[str]:
+    """
+    Сравнить результаты с базовой линией
+
+    Args:
+        results: Группы метрик текущего прогона (этап -> сводка)
+        baseline: Группы метрик базовой линии в том же формате
+        tolerance: Допустимый рост метрики (0.2 - на 20%)
+        metrics: Проверяемые метрики и минимальный абсолютный рост
+            (по умолчанию REGRESSION_METRICS)
+
+    Returns:
+        Описания регрессий (пустой список - регрессий нет)
+    """
+    regressions = []
+    for group, group_metrics in results.items():
+        base_metrics = baseline.get(group)
+        if not base_metrics:
+            continue
+        for metric, min_delta in (metrics or REGRESSION_METRICS).items():
+            current = group_metrics.get(metric)
+            previous = base_metrics.get(metric)
+            if not current or not previous:
+                continue
+            if current > previous * (1 + tolerance) and current - previous >= min_delta:
+                regressions.append(
+                    f"{group}.{metric}: {previous} -> {current} (+{(current / previous - 1) * 100:.0f}%)"
+                )
+    return regressions
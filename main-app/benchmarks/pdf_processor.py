@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарки PDFProcessor (app/services/pdf_processor.py).
+
+Генерирует PDF разной формы (количество страниц, плотность текста,
+встроенные изображения и сканы, шрифты) и замеряет по каждой форме:
+открытие документа, классификацию (текст/скан), извлечение текста
+в режимах layout и plain, полный process(), а также память на страницу
+(пик Python-аллокаций по tracemalloc и прирост RSS с учетом памяти MuPDF).
+
+Замеры выполняются в текущем процессе, без пула - только горячий путь
+обработки PDF. OCR сканов не входит в замер (распознавание зависит
+от движка и меряется отдельно).
+
+По умолчанию формы меняются по одному параметру относительно базовой
+(10 страниц, normal, без картинок, sans-serif); --full - полный перебор.
+
+Запуск (из main-app/):
+    python -m benchmarks.pdf_processor
+    python -m benchmarks.pdf_processor --pages 1 10 100 --repeat 10 --save-baseline
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.pdf_processor import PDFProcessor
+from benchmarks.corpus import (
+    FONT_FAMILIES,
+    IMAGE_MODES,
+    TEXT_DENSITIES,
+    DocumentShape,
+    render_shape,
+)
+from benchmarks.measure import (
+    RSSSampler,
+    compare_with_baseline,
+    load_baseline,
+    read_rss,
+    save_results,
+    summarize,
+)
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baselines" / "pdf_processor.json"
+DEFAULT_RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+EXTRACTION_MODES = ("layout", "plain")
+
+# Проверяемые метрики и минимальный абсолютный рост (мс / КБ на страницу)
+REGRESSION_METRICS = {"p50": 1.0, "p95": 2.0, "ms_per_page": 0.2, "rss_kb_per_page": 64.0}
+
+
+def build_shapes(pages: List[int], full: bool) -> List[DocumentShape]:
+    """
+    Формы документов для замера
+
+    Args:
+        pages: Варианты количества страниц
+        full: Полный перебор всех параметров вместо изменения по одному
+
+    Returns:
+        Список форм без повторов
+    """
+    if full:
+        return [
+            DocumentShape(page_count, density, images, font)
+            for page_count, density, images, font
+            in itertools.product(pages, TEXT_DENSITIES, IMAGE_MODES, FONT_FAMILIES)
+        ]
+
+    base = DocumentShape()
+    shapes = [DocumentShape(pages=page_count) for page_count in pages]
+    shapes += [DocumentShape(density=density) for density in TEXT_DENSITIES if density != base.density]
+    shapes += [DocumentShape(images=images) for images in IMAGE_MODES if images != base.images]
+    shapes += [DocumentShape(font=font) for font in FONT_FAMILIES if font != base.font]
+    return list(dict.fromkeys([base] + shapes))
+
+
+def _timed(func) -> float:
+    started_at = time.perf_counter()
+    func()
+    return time.perf_counter() - started_at
+
+
+def measure_memory(pdf_path: str, mode: str) -> Dict[str, float]:
+    """
+    Память на извлечение текста в заданном режиме
+
+    Отдельный проход без замера времени: tracemalloc замедляет выполнение.
+
+    Returns:
+        Пик Python-аллокаций и прирост RSS в килобайтах
+    """
+    settings.PDF_EXTRACTION_MODE = mode
+    processor = PDFProcessor(pdf_path)
+    processor._open_pdf()
+
+    rss_before = read_rss()
+    tracemalloc.start()
+    with RSSSampler(interval=0.001) as sampler:
+        processor._extract_page_texts()
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    processor.doc.close()
+
+    return {
+        "python_kb": python_peak / 1024,
+        "rss_kb": max(sampler.peak - rss_before, 0) / 1024,
+    }
+
+
+def measure_shape(shape: DocumentShape, repeat: int, modes: List[str], seed: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Замеры для одной формы документа
+
+    Returns:
+        Группы метрик: "<форма>.<этап>" -> сводка
+    """
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(render_shape(shape, seed))
+        pdf_path = f.name
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    try:
+        # Память - до замеров времени, пока аллокатор не прогрет этим документом
+        for mode in modes:
+            memory = measure_memory(pdf_path, mode)
+            groups[f"{shape.name}.memory_{mode}"] = {
+                "python_kb_per_page": round(memory["python_kb"] / shape.pages, 1),
+                "rss_kb_per_page": round(memory["rss_kb"] / shape.pages, 1),
+            }
+
+        timings = defaultdict(list)
+        for _ in range(repeat):
+            processor = PDFProcessor(pdf_path)
+            timings["open"].append(_timed(processor._open_pdf))
+            timings["classify"].append(_timed(processor._is_image_based_pdf))
+            for mode in modes:
+                settings.PDF_EXTRACTION_MODE = mode
+                timings[f"extract_{mode}"].append(_timed(processor._extract_page_texts))
+            processor.doc.close()
+
+            settings.PDF_EXTRACTION_MODE = modes[0]
+            timings["process"].append(_timed(PDFProcessor(pdf_path).process))
+    finally:
+        os.unlink(pdf_path)
+
+    for stage, values in timings.items():
+        summary = summarize(values)
+        summary["ms_per_page"] = round(summary["p50"] / shape.pages, 3)
+        groups[f"{shape.name}.{stage}"] = summary
+    return groups
+
+
+def print_report(shapes: List[DocumentShape], groups: Dict[str, Dict[str, Any]], modes: List[str]) -> None:
+    """Вывод таблицы: p50 этапов (мс) и память на страницу (КБ)"""
+    stages = ["open", "classify"] + [f"extract_{mode}" for mode in modes] + ["process"]
+    header = f"{'форма':<34}" + "".join(f"{stage:>16}" for stage in stages)
+    header += f"{'мс/стр':>9}" + "".join(f"{'py/rss ' + mode:>20}" for mode in modes)
+    print(header)
+    print("-" * len(header))
+
+    for shape in shapes:
+        row = f"{shape.name:<34}"
+        row += "".join(f"{groups[f'{shape.name}.{stage}']['p50']:>16}" for stage in stages)
+        row += f"{groups[f'{shape.name}.extract_{modes[0]}']['ms_per_page']:>9}"
+        for mode in modes:
+            memory = groups[f"{shape.name}.memory_{mode}"]
+            cell = f"{memory['python_kb_per_page']}/{memory['rss_kb_per_page']}"
+            row += f"{cell:>20}"
+        print(row)
+    print(f"\np50 в миллисекундах, мс/стр - извлечение {modes[0]}, память - КБ на страницу (Python / RSS)")
+
+
+def run(args: argparse.Namespace) -> int:
+    """Прогон микро-бенчмарков; возвращает код выхода"""
+    logging.getLogger().setLevel(logging.WARNING)
+    original_mode = settings.PDF_EXTRACTION_MODE
+
+    shapes = build_shapes(args.pages, args.full)
+    print(f"Форм документов: {len(shapes)}, повторов: {args.repeat}\n")
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    try:
+        for shape in shapes:
+            groups.update(measure_shape(shape, args.repeat, args.modes, args.seed))
+    finally:
+        settings.PDF_EXTRACTION_MODE = original_mode
+
+    print_report(shapes, groups, args.modes)
+
+    results = {
+        "benchmark": "pdf_processor",
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "modes": args.modes,
+            "shapes": [shape.name for shape in shapes],
+            "cpu_count": os.cpu_count(),
+        },
+        "groups": groups,
+    }
+
+    output = args.output or DEFAULT_RESULTS_DIR / f"pdf_processor_{datetime.now():%Y%m%d_%H%M%S}.json"
+    save_results(results, output)
+    print(f"Результаты: {output}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"Базовая линия обновлена: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"Базовая линия не найдена ({args.baseline}), сравнение пропущено")
+        return 0
+
+    regressions = compare_with_baseline(groups, baseline["groups"], args.tolerance, REGRESSION_METRICS)
+    if regressions:
+        print("\nРегрессии относительно базовой линии:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("\nРегрессий относительно базовой линии нет")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Микро-бенчмарки PDFProcessor")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50, 200], help="Количество страниц")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов замера каждой формы")
+    parser.add_argument("--modes", nargs="+", choices=EXTRACTION_MODES, default=list(EXTRACTION_MODES),
+                        help="Режимы извлечения текста")
+    parser.add_argument("--full", action="store_true", help="Полный перебор параметров форм")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генерации документов")
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию benchmarks/results/)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Файл базовой линии")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результат как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимый рост метрик (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    sys.exit(run(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Сквозной бенчмарк загрузки плана лечения (/api/v1/plans/load_plan_file).
+
+Прогоняет корпус синтетических PDF (и образец из data/) через эндпоинт
+загрузки и считает p50/p95/p99, пропускную способность и пиковый RSS
+по этапам: upload, parse (pdf_open, classify, extract_text), rules,
+prompt_build, gigachat_call, json_parse, medicine_match, interaction_check.
+Запись плана в БД не замеряется: эндпоинт пока не сохраняет план.
+
+По умолчанию приложение запускается в этом же процессе (ASGI-транспорт
+httpx) с локальной базой из .env - так доступны замеры этапов через
+app.core.stages и память пула обработки PDF. С --api-url запросы идут
+в уже запущенный сервер, замеряется только время ответа.
+
+Вместо GigaChat используется gigachat_mock (--gigachat-url).
+
+Запуск (из main-app/):
+    python -m benchmarks.plan_upload --gigachat-url http://localhost:8003 \\
+        --requests 100 --concurrency 4
+
+    # Сохранить результат как базовую линию
+    python -m benchmarks.plan_upload --gigachat-url http://localhost:8003 --save-baseline
+
+При наличии базовой линии результаты сравниваются с ней; рост p50/p95/p99
+или памяти больше --tolerance считается регрессией (код выхода 1).
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import platform
+import sys
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.stages import add_stage_observer, remove_stage_observer
+from benchmarks.corpus import DOCUMENT_KINDS, CorpusDocument, build_corpus
+from benchmarks.measure import (
+    RSSSampler,
+    compare_with_baseline,
+    load_baseline,
+    save_results,
+    summarize,
+    to_mb,
+)
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baselines" / "plan_upload.json"
+DEFAULT_RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+UPLOAD_URL = "/api/v1/plans/load_plan_file"
+BENCHMARK_USER_ID = "benchmark"
+
+
+def configure_gigachat(gigachat_url: Optional[str]) -> None:
+    """Направить GigaChat SDK на gigachat_mock (до импорта приложения)"""
+    if not gigachat_url:
+        return
+    gigachat_url = gigachat_url.rstrip("/")
+    os.environ["GIGACHAT_BASE_URL"] = f"{gigachat_url}/api/v1"
+    os.environ["GIGACHAT_AUTH_URL"] = f"{gigachat_url}/api/v2/oauth"
+
+
+async def ensure_benchmark_user(external_id: str) -> None:
+    """Создать авторизованного пользователя для бенчмарка, если его нет"""
+    from app import crud
+    from app.core.database import async_session_maker
+    from app.schemas.user import UserCreate
+
+    async with async_session_maker() as db:
+        user = await crud.user.get_by_external_id(db, external_id=external_id)
+        if user is None:
+            user = await crud.user.create(
+                db,
+                obj_in=UserCreate(external_id=external_id, full_name="Benchmark User", role_id=1)
+            )
+        if not user.yandex_id:
+            user.yandex_id = f"benchmark-{external_id}"
+        await db.commit()
+
+
+class StageRecorder:
+    """Наблюдатель этапов: длительности и пиковый RSS каждого этапа"""
+
+    def __init__(self, sampler: Optional[RSSSampler]):
+        self.sampler = sampler
+        self.records: List[tuple] = []
+
+    def __call__(self, name: str, started_at: float, duration: float) -> None:
+        self.records.append((name, started_at, duration))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        durations = defaultdict(list)
+        peaks = defaultdict(int)
+        for name, started_at, duration in self.records:
+            durations[name].append(duration)
+            if self.sampler is not None:
+                peak = self.sampler.peak_between(started_at, started_at + duration)
+                peaks[name] = max(peaks[name], peak)
+
+        result = {}
+        for name, values in durations.items():
+            result[f"stage.{name}"] = summarize(values)
+            if self.sampler is not None:
+                result[f"stage.{name}"]["peak_rss_mb"] = to_mb(peaks[name])
+        return result
+
+
+async def upload(
+    client: httpx.AsyncClient,
+    document: CorpusDocument,
+    telegram_id: str,
+    keep_uploads: bool
+) -> Dict[str, Any]:
+    """Загрузить один документ; возвращает время ответа и статус"""
+    started_at = time.perf_counter()
+    response = await client.post(
+        UPLOAD_URL,
+        files={"file": (document.name, document.content, "application/pdf")},
+        headers={"X-Telegram-ID": telegram_id},
+    )
+    duration = time.perf_counter() - started_at
+
+    if response.status_code == 201 and not keep_uploads and client.base_url.host == "benchmark":
+        # Сохраненные файлы в режиме в одном процессе удаляем за собой
+        Path(response.json()["file_path"]).unlink(missing_ok=True)
+
+    return {"kind": document.kind, "status": response.status_code, "duration": duration}
+
+
+async def run_requests(
+    client: httpx.AsyncClient,
+    documents: List[CorpusDocument],
+    total: int,
+    concurrency: int,
+    telegram_id: str,
+    keep_uploads: bool
+) -> List[Dict[str, Any]]:
+    """Выполнить total запросов по корпусу по кругу с заданной параллельностью"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(index: int) -> Dict[str, Any]:
+        async with semaphore:
+            return await upload(client, documents[index % len(documents)], telegram_id, keep_uploads)
+
+    return await asyncio.gather(*(worker(index) for index in range(total)))
+
+
+def build_results(
+    args: argparse.Namespace,
+    documents: List[CorpusDocument],
+    responses: List[Dict[str, Any]],
+    wall_time: float,
+    stages: Dict[str, Dict[str, Any]],
+    sampler: Optional[RSSSampler]
+) -> Dict[str, Any]:
+    """Сводка прогона в формате базовой линии"""
+    succeeded = [r for r in responses if r["status"] == 201]
+
+    groups = {"request": summarize([r["duration"] for r in succeeded])}
+    if sampler is not None:
+        groups["request"]["peak_rss_mb"] = to_mb(sampler.peak)
+
+    by_kind = defaultdict(list)
+    for response in succeeded:
+        by_kind[response["kind"]].append(response["duration"])
+    for kind, values in sorted(by_kind.items()):
+        groups[f"request.{kind}"] = summarize(values)
+    groups.update(stages)
+
+    corpus = defaultdict(int)
+    for document in documents:
+        corpus[document.kind] += 1
+
+    return {
+        "benchmark": "plan_upload",
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "mode": "remote" if args.api_url else "in-process",
+            "requests": len(responses),
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "corpus": dict(corpus),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "throughput_rps": round(len(succeeded) / wall_time, 3) if wall_time else 0.0,
+        "errors": len(responses) - len(succeeded),
+        "groups": groups,
+    }
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """Вывод таблицы результатов"""
+    meta = results["meta"]
+    print(f"\nplan_upload: {meta['requests']} запросов, параллельность {meta['concurrency']}, "
+          f"режим {meta['mode']}")
+    print(f"Пропускная способность: {results['throughput_rps']} запросов/с, ошибок: {results['errors']}\n")
+
+    header = f"{'группа':<22}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'rss, MB':>10}"
+    print(header)
+    print("-" * len(header))
+    for group, metrics in results["groups"].items():
+        if not metrics.get("count"):
+            continue
+        print(
+            f"{group:<22}{metrics['count']:>7}{metrics['mean']:>10}{metrics['p50']:>10}"
+            f"{metrics['p95']:>10}{metrics['p99']:>10}{metrics['max']:>10}"
+            f"{metrics.get('peak_rss_mb', '-'):>10}"
+        )
+    print("\nВремя в миллисекундах")
+
+
+async def run(args: argparse.Namespace) -> int:
+    """Прогон бенчмарка; возвращает код выхода"""
+    configure_gigachat(args.gigachat_url)
+
+    documents = build_corpus(args.kinds, per_kind=args.per_kind, seed=args.seed)
+    print(f"Корпус: {len(documents)} документов ({', '.join(sorted({d.kind for d in documents}))})")
+
+    app = None
+    sampler = None
+    recorder = None
+    if args.api_url:
+        client = httpx.AsyncClient(base_url=args.api_url, timeout=args.timeout)
+    else:
+        from app.main import app
+
+        # Логи обработки каждого запроса искажают замеры
+        logging.getLogger().setLevel(args.log_level)
+        await app.router.startup()
+        await ensure_benchmark_user(args.telegram_id)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=args.timeout
+        )
+        sampler = RSSSampler()
+        recorder = StageRecorder(sampler)
+
+    try:
+        # Прогрев: пул процессов, соединения с БД, токен GigaChat
+        if args.warmup:
+            await run_requests(client, documents, args.warmup, args.concurrency, args.telegram_id, args.keep_uploads)
+
+        if recorder is not None:
+            add_stage_observer(recorder)
+        with sampler or nullcontext():
+            started_at = time.perf_counter()
+            responses = await run_requests(
+                client, documents, args.requests, args.concurrency, args.telegram_id, args.keep_uploads
+            )
+            wall_time = time.perf_counter() - started_at
+    finally:
+        await client.aclose()
+        if recorder is not None:
+            remove_stage_observer(recorder)
+        if app is not None:
+            await app.router.shutdown()
+
+    stages = recorder.summary() if recorder is not None else {}
+    results = build_results(args, documents, responses, wall_time, stages, sampler)
+    print_report(results)
+
+    output = args.output or DEFAULT_RESULTS_DIR / f"plan_upload_{datetime.now():%Y%m%d_%H%M%S}.json"
+    save_results(results, output)
+    print(f"Результаты: {output}")
+
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"Базовая линия обновлена: {args.baseline}")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"Базовая линия не найдена ({args.baseline}), сравнение пропущено")
+        return 0
+
+    regressions = compare_with_baseline(results["groups"], baseline["groups"], args.tolerance)
+    if baseline["throughput_rps"] and results["throughput_rps"] < baseline["throughput_rps"] * (1 - args.tolerance):
+        regressions.append(f"throughput_rps: {baseline['throughput_rps']} -> {results['throughput_rps']}")
+
+    if regressions:
+        print("\nРегрессии относительно базовой линии:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("\nРегрессий относительно базовой линии нет")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Сквозной бенчмарк загрузки плана лечения")
+    parser.add_argument("--requests", type=int, default=50, help="Количество запросов")
+    parser.add_argument("--concurrency", type=int, default=1, help="Параллельных запросов")
+    parser.add_argument("--warmup", type=int, default=3, help="Запросов прогрева (не учитываются)")
+    parser.add_argument("--kinds", nargs="+", choices=list(DOCUMENT_KINDS), help="Виды документов корпуса")
+    parser.add_argument("--per-kind", type=int, default=3, help="Документов каждого вида")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генерации корпуса")
+    parser.add_argument("--gigachat-url", help="Адрес gigachat_mock, например http://localhost:8003")
+    parser.add_argument("--api-url", help="Адрес запущенного API (по умолчанию - приложение в этом процессе)")
+    parser.add_argument("--telegram-id", default=BENCHMARK_USER_ID, help="X-Telegram-ID пользователя")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Таймаут запроса, секунды")
+    parser.add_argument("--keep-uploads", action="store_true", help="Не удалять загруженные файлы")
+    parser.add_argument("--output", type=Path, help="Файл результатов (по умолчанию benchmarks/results/)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Файл базовой линии")
+    parser.add_argument("--save-baseline", action="store_true", help="Сохранить результат как базовую линию")
+    parser.add_argument("--log-level", default="WARNING", help="Уровень логов приложения")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимый рост метрик (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    sys.exit(asyncio.run(run(parse_args())))
+
+
+if __name__ == "__main__":
+    main()
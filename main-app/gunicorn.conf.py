@@ -0,0 +1,99 @@
+"""
+Конфигурация gunicorn для продакшен-запуска API
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+- воркеры uvicorn по числу доступных CPU (WEB_CONCURRENCY);
+- приложение и тяжелые модули (PyMuPDF, GigaChat SDK, YAML) импортируются
+  один раз в мастере до fork - воркеры стартуют за доли секунды и делят
+  страницы памяти с мастером;
+- при SIGTERM воркеры перестают принимать соединения и дожидаются
+  текущих запросов (загрузка плана с GigaChat) до GRACEFUL_TIMEOUT секунд;
+- метрики Prometheus собираются со всех воркеров (PROMETHEUS_MULTIPROC_DIR).
+"""
+
+import importlib
+import logging
+import os
+import shutil
+
+
+def _available_cpus() -> int:
+    # Учитывает ограничение CPU контейнера через cpuset
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+cpus = _available_cpus()
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", cpus))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Ожидание текущих запросов при остановке и перезапуске воркеров
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "120"))
+# Воркер, не отвечающий мастеру дольше timeout, перезапускается
+timeout = int(os.getenv("WORKER_TIMEOUT", "180"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Плавный перезапуск воркеров против утечек памяти (0 - выключено)
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+# Модули, импорт которых занимает заметное время, - грузим до fork
+PRELOAD_MODULES = ("fitz", "gigachat", "yaml", "orjson", "fastjsonschema", "jinja2", "sqlalchemy.dialects.postgresql.asyncpg")
+
+# Пул процессов разбора PDF создается в каждом воркере - делим CPU между ними,
+# чтобы N воркеров не запускали по N процессов каждый
+os.environ.setdefault("PROCESS_POOL_SIZE", str(max(1, cpus // workers)))
+
+
+def _prepare_multiproc_dir() -> None:
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        # Файлы метрик прошлого запуска исказили бы счетчики
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def _preload_modules() -> None:
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logging.getLogger("gunicorn.error").warning(f"Preload of {module} skipped: {e}")
+
+
+# Конфигурация читается мастером до импорта приложения (preload_app)
+_prepare_multiproc_dir()
+_preload_modules()
+
+
+def post_fork(server, worker):
+    """Воркер: ресурсы мастера, которые нельзя использовать после fork"""
+    from app.core.database import engine
+    from app.core.logging_config import reinit_logging_after_fork
+
+    reinit_logging_after_fork()
+    # Соединения, открытые в мастере, не должны использоваться воркерами
+    engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Мастер: воркер завершился, его gauge-метрики больше не учитываются"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def when_ready(server):
+    logging.getLogger("gunicorn.error").info(
+        f"Health Assist API: {workers} workers, graceful timeout {graceful_timeout}s"
+    )
@@ -0,0 +1,114 @@
+"""
+Тесты проверки лекарственных взаимодействий (app.services.interactions)
+"""
+
+import itertools
+
+import pytest
+
+from app.services.interactions import (
+    DrugItem,
+    InteractionMatrix,
+    InteractionRule,
+    drug_keys,
+    find_duplicates,
+)
+
+WARFARIN = DrugItem("Варфарин", 5, "B01AA03", "prescription", prescription_id=1, plan_id=1)
+IBUPROFEN = DrugItem("Ибупрофен", 3, "M01AE01", "plan")
+ASPIRIN = DrugItem("Аспирин", 7, "B01AC06", "plan")
+OMEPRAZOLE = DrugItem("Омепразол", 4, "A02BC01", "plan")
+NUROFEN = DrugItem("Нурофен", 8, "M01AE01", "plan")
+KETOPROFEN = DrugItem("Кетопрофен", 9, "M01AE03", "prescription", prescription_id=2, plan_id=1)
+
+RULES = [
+    InteractionRule("B01AA", "M01A", "major", "Риск кровотечения"),
+    InteractionRule("B01AA", "B01AC", "moderate", "Усиление антикоагулянтного действия"),
+    InteractionRule("B01AA03", "B01AC06", "contraindicated", "Варфарин с аспирином"),
+    InteractionRule("id:4", "id:9", "minor", "Правило по id справочника"),
+]
+
+
+@pytest.fixture
+def matrix():
+    return InteractionMatrix(RULES)
+
+
+def _pairs(warnings):
+    return {frozenset(item["name"] for item in warning["items"]): warning["severity"] for warning in warnings}
+
+
+def test_drug_keys():
+    assert drug_keys(12, "B01AA03") == ["id:12", "B", "B01", "B01A", "B01AA", "B01AA03"]
+    assert drug_keys(None, "") == []
+
+
+def test_rule_by_atc_class(matrix):
+    warnings = matrix.check([WARFARIN, IBUPROFEN])
+    assert _pairs(warnings) == {frozenset({"Варфарин", "Ибупрофен"}): "major"}
+    assert warnings[0]["kind"] == "interaction"
+
+
+def test_most_severe_rule_wins(matrix):
+    # Срабатывают правила B01AA-B01AC и B01AA03-B01AC06
+    assert _pairs(matrix.check([WARFARIN, ASPIRIN])) == {frozenset({"Варфарин", "Аспирин"}): "contraindicated"}
+
+
+def test_rule_by_medicin_id(matrix):
+    assert _pairs(matrix.check([OMEPRAZOLE, KETOPROFEN])) == {frozenset({"Омепразол", "Кетопрофен"}): "minor"}
+
+
+def test_prescription_pairs_are_skipped(matrix):
+    # Оба препарата - действующие назначения
+    assert matrix.check([WARFARIN, KETOPROFEN]) == []
+
+
+def test_no_rules(matrix):
+    assert matrix.check([OMEPRAZOLE, IBUPROFEN]) == []
+    assert InteractionMatrix().check([WARFARIN, IBUPROFEN]) == []
+
+
+def test_warnings_sorted_by_severity(matrix):
+    severities = [warning["severity"] for warning in matrix.check([WARFARIN, IBUPROFEN, ASPIRIN])]
+    assert severities == ["contraindicated", "major"]
+
+
+def test_bitmask_check_matches_pairwise_rules(matrix):
+    # Проверка масками находит те же пары, что и перебор всех пар по правилам
+    items = [WARFARIN, IBUPROFEN, ASPIRIN, OMEPRAZOLE, NUROFEN, KETOPROFEN]
+    expected = {}
+    for first, second in itertools.combinations(items, 2):
+        if first.source != "plan" and second.source != "plan":
+            continue
+        rule = matrix._rule_for(first, second)
+        if rule is not None:
+            expected[frozenset({first.name, second.name})] = rule.severity
+    assert _pairs(matrix.check(items)) == expected
+    assert len(expected) == 4
+
+
+def test_duplicate_same_substance():
+    warnings = find_duplicates([IBUPROFEN, NUROFEN, KETOPROFEN])
+    # Вещество M01AE01 - уровень 5; группа M01AE с кетопрофеном - отдельное предупреждение
+    assert [(warning["atc_class"], warning["severity"]) for warning in warnings] == [
+        ("M01AE01", "major"),
+        ("M01AE", "moderate"),
+    ]
+
+
+def test_duplicate_group_already_reported_is_skipped():
+    # Группа M01AE совпадает с группой вещества - второе предупреждение не нужно
+    warnings = find_duplicates([IBUPROFEN, NUROFEN])
+    assert [warning["atc_class"] for warning in warnings] == ["M01AE01"]
+
+
+def test_duplicate_needs_plan_item():
+    assert find_duplicates([KETOPROFEN._replace(atc_code="M01AE01"), KETOPROFEN]) == []
+
+
+def test_duplicate_by_medicin_id_without_atc():
+    first = DrugItem("Препарат", 10, "", "plan")
+    second = DrugItem("Препарат", 10, "", "prescription", prescription_id=3, plan_id=2)
+    warnings = find_duplicates([first, second])
+    assert len(warnings) == 1
+    assert warnings[0]["atc_class"] is None
@@ -0,0 +1,59 @@
+"""
+Тесты потокового разбора JSON (app.services.json_stream)
+"""
+
+import orjson
+import pytest
+
+from app.services.json_stream import IncrementalJSONParser
+
+RESPONSE = (
+    'Ответ:\n```json\n{"title": "План {1}", "medications": ['
+    '{"name": "Варфарин", "note": "не с \\"аспирином\\" ]}"}, '
+    '{"name": "Омепразол", "doses": [20, 40],},'
+    '], "tests": [{"name": "МНО"}], "tags": ["a", "b"], "meta": {"items": [{"x": 1}]}}\n```'
+)
+
+
+def _feed_by(parser, text, size):
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    return items
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, len(RESPONSE)])
+def test_items_do_not_depend_on_chunking(size):
+    parser = IncrementalJSONParser()
+    items = _feed_by(parser, RESPONSE, size)
+    assert items == [
+        ("medications", {"name": "Варфарин", "note": 'не с "аспирином" ]}'}),
+        ("medications", {"name": "Омепразол", "doses": [20, 40]}),
+        ("tests", {"name": "МНО"}),
+    ]
+    assert parser.text == RESPONSE
+
+
+def test_item_is_returned_as_soon_as_it_closes():
+    parser = IncrementalJSONParser(["medications"])
+    assert parser.feed('{"medications": [{"name": "Варфарин"') == []
+    assert parser.feed('}, {"name"') == [("medications", {"name": "Варфарин"})]
+
+
+def test_only_watched_keys():
+    parser = IncrementalJSONParser(["tests"])
+    assert parser.feed(RESPONSE) == [("tests", {"name": "МНО"})]
+
+
+def test_invalid_item_is_skipped():
+    parser = IncrementalJSONParser()
+    items = parser.feed('{"medications": [{"name": Варфарин}, {"name": "Омепразол"}]}')
+    assert items == [("medications", {"name": "Омепразол"})]
+
+
+def test_items_match_full_parse():
+    document = {"medications": [{"name": f"Препарат {i}", "dose": i} for i in range(20)]}
+    text = orjson.dumps(document).decode()
+    parser = IncrementalJSONParser(["medications"])
+    items = _feed_by(parser, text, 5)
+    assert [item for _, item in items] == document["medications"]
@@ -0,0 +1,102 @@
+"""
+Тесты индекса справочника препаратов (app.services.medicine_index)
+"""
+
+import pytest
+
+from app.services.medicine_index import MedicineEntry, MedicineIndex, normalize_name, trigrams
+
+ENTRIES = [
+    MedicineEntry(1, "Амоксициллин", "Амоксициллин", "капсулы", "J01CA04"),
+    MedicineEntry(2, "Амоксиклав", "Амоксициллин + Клавулановая кислота", "таблетки", "J01CR02"),
+    MedicineEntry(3, "Нурофен", "Ибупрофен", "таблетки", "M01AE01"),
+    MedicineEntry(4, "Омепразол", "Омепразол", "капсулы", "A02BC01"),
+    MedicineEntry(5, "Варфарин", "Варфарин", "таблетки", "B01AA03"),
+    MedicineEntry(6, "Амлодипин", "Амлодипин", "таблетки", "C08CA01"),
+]
+
+
+@pytest.fixture
+def index():
+    return MedicineIndex.build(ENTRIES)
+
+
+@pytest.mark.parametrize("cyrillic, latin", [
+    ("Амоксициллин", "Amoxicillin"),
+    ("Омепразол", "Omeprazole"),
+    ("Амлодипин", "Amlodipine"),
+    ("Цефтриаксон", "Ceftriaxone"),
+    ("Ибупрофен", "Ibuprofen"),
+])
+def test_transliteration_gives_same_key(cyrillic, latin):
+    assert normalize_name(cyrillic) == normalize_name(latin)
+
+
+def test_normalize_drops_dosage_and_form():
+    assert normalize_name("Амоксициллин 500 мг, капсулы") == normalize_name("Амоксициллин")
+
+
+def test_normalize_latin_homoglyphs_in_cyrillic_word():
+    # "о" и "е" набраны латиницей
+    assert normalize_name("Омeпразoл") == normalize_name("Омепразол")
+
+
+def test_normalize_keeps_name_made_of_service_words():
+    assert normalize_name("Мазь") != ""
+
+
+def test_normalize_empty():
+    assert normalize_name(None) == ""
+    assert normalize_name("500, 10") == ""
+
+
+def test_trigrams_include_word_boundaries():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+def test_lookup_exact_latin_query(index):
+    match = index.lookup("Amoxicillin 500 mg")[0]
+    assert match.medicin_id == 1
+    assert match.score == 1.0
+    assert match.matched_by == "name"
+
+
+def test_lookup_by_international_name(index):
+    matches = index.lookup("Ибупрофен")
+    assert [match.medicin_id for match in matches] == [3]
+    assert matches[0].matched_by == "international_name"
+
+
+def test_lookup_typo(index):
+    assert index.lookup("Омепрозол")[0].medicin_id == 4
+
+
+def test_lookup_extra_words_match_by_token(index):
+    match = index.lookup("Нурофен Экспресс Форте")[0]
+    assert match.medicin_id == 3
+    assert match.score < 1.0
+
+
+def test_lookup_unknown(index):
+    assert index.lookup("Парацетамол") == []
+
+
+@pytest.mark.parametrize("query", ["Амоксицилин", "Варфарн", "Omeprazol", "Амлодипин Тева", "Клавулановая"])
+@pytest.mark.parametrize("min_score", [0.3, 0.45, 0.6])
+def test_trigram_filter_keeps_all_similar_keys(index, query, min_score):
+    # Отсечение по редким триграммам не должно терять ключи, найденные полным перебором
+    grams = trigrams(normalize_name(query))
+    expected = {}
+    for key, key_grams in index._grams_by_key.items():
+        score = len(grams & key_grams) / len(grams | key_grams)
+        if score >= min_score:
+            expected[key] = score
+    assert index._similar_keys(normalize_name(query), min_score) == pytest.approx(expected)
+
+
+def test_add_replaces_and_discard_removes(index):
+    index.add(MedicineEntry(5, "Варфарин Никомед", "Варфарин", "таблетки", "B01AA03"))
+    assert index.lookup("Варфарин Никомед")[0].medicin_id == 5
+    index.discard(5)
+    assert index.lookup("Варфарин") == []
+    assert normalize_name("Варфарин") not in index._grams_by_key
@@ -0,0 +1,165 @@
+"""
+Тесты разбора и проверки ответов LLM (app.services.response_parser)
+и исправления ответа в app.services.plan_extraction
+"""
+
+import asyncio
+
+import orjson
+import pytest
+
+from app.services import plan_extraction
+from app.services.response_parser import (
+    LLMResponseError,
+    _find_json_object,
+    parse_llm_response,
+    remove_trailing_commas,
+    to_json_schema,
+)
+
+PROMPT_NAME = "extract_treatment_plan"
+
+VALID_PLAN = {
+    "doctor": {"full_name": "Иванов И.И.", "specialization": "Терапевт", "medical_organization": None},
+    "symptoms": [{"symptom": "кашель", "severity": None}],
+    "referrals": [{"specialization": "Кардиолог", "purpose": None, "urgency": None}],
+    "examinations": [{"name": "ОАК", "type": "анализ", "preparation": None, "deadline": None}],
+    "medications": [{"name": "Амоксициллин", "dosage": "500 мг"}],
+}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', '{"a": 1}'),
+    ('Вот план:\n```json\n{"a": 1}\n```\nГотово', '{"a": 1}'),
+    ('{"a": {"b": [1, {"c": 2}]}} хвост', '{"a": {"b": [1, {"c": 2}]}}'),
+])
+def test_find_object(text, expected):
+    assert _find_json_object(text) == expected
+
+
+def test_braces_inside_strings_are_ignored():
+    text = '{"note": "скобки } и { в тексте", "escaped": "кавычка \\" и }"}'
+    assert _find_json_object(text) == text
+
+
+def test_longest_object_is_returned():
+    text = 'Поля {x} заполнены: {"medications": [{"name": "Варфарин"}]} и {y}'
+    assert _find_json_object(text) == '{"medications": [{"name": "Варфарин"}]}'
+
+
+@pytest.mark.parametrize("text", ["", "нет json", '{"a": 1', "}{"])
+def test_no_complete_object(text):
+    assert _find_json_object(text) is None
+
+
+def test_remove_trailing_commas_outside_strings():
+    assert remove_trailing_commas('{"a": [1, 2,], "b": ",]",}') == '{"a": [1, 2], "b": ",]"}'
+
+
+def test_to_json_schema_nullable_and_annotations():
+    schema = {
+        "type": "object",
+        "required": ["nullable", "example"],
+        "properties": {
+            "purpose": {"type": "string", "nullable": True, "example": "контроль"},
+            "urgency": {"type": "string", "enum": ["плановый", "срочный"], "nullable": True},
+            "name": {"type": "string", "example": "Амоксициллин"},
+        },
+    }
+    converted = to_json_schema(schema)
+    properties = converted["properties"]
+
+    assert properties["purpose"] == {"type": ["string", "null"]}
+    assert properties["urgency"] == {"type": ["string", "null"], "enum": ["плановый", "срочный", None]}
+    assert properties["name"] == {"type": "string"}
+    # Значения required не считаются аннотациями, исходная схема не меняется
+    assert converted["required"] == ["nullable", "example"]
+    assert schema["properties"]["purpose"]["nullable"] is True
+
+
+def test_valid_response_with_nulls_passes():
+    response = orjson.dumps(VALID_PLAN).decode()
+    assert parse_llm_response(response, PROMPT_NAME) == VALID_PLAN
+
+
+def test_fenced_response_with_trailing_commas_parses():
+    response = (
+        "Извлеченные данные:\n```json\n"
+        '{"doctor": {"full_name": "Иванов И.И.",}, "symptoms": [], "referrals": [], '
+        '"examinations": [], "medications": [{"name": "Омепразол",},],}\n```'
+    )
+    data = parse_llm_response(response, PROMPT_NAME)
+    assert data["medications"] == [{"name": "Омепразол"}]
+
+
+def test_missing_required_key_keeps_parsed_data():
+    data = {key: value for key, value in VALID_PLAN.items() if key != "medications"}
+    response = orjson.dumps(data).decode()
+    with pytest.raises(LLMResponseError) as error:
+        parse_llm_response(response, PROMPT_NAME)
+    assert error.value.message.startswith("Schema validation failed")
+    assert error.value.data == data
+    assert error.value.response == response
+
+
+def test_null_in_not_nullable_enum_fails():
+    data = dict(VALID_PLAN, examinations=[{"name": "ОАК", "type": None}])
+    with pytest.raises(LLMResponseError, match="Schema validation failed"):
+        parse_llm_response(orjson.dumps(data).decode(), PROMPT_NAME)
+
+
+def test_response_without_json():
+    with pytest.raises(LLMResponseError) as error:
+        parse_llm_response("Не удалось извлечь план", PROMPT_NAME)
+    assert error.value.message == "JSON object not found in response"
+    assert error.value.data is None
+
+
+class FakeGigaChat:
+    """GigaChat с заранее заданными ответами на потоковый запрос и на исправление"""
+
+    def __init__(self, streamed: str, repaired: str):
+        self.streamed = streamed
+        self.repaired = repaired
+        self.repair_messages = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def astream_chat(self, messages, **params):
+        for start in range(0, len(self.streamed), 16):
+            yield self.streamed[start:start + 16]
+
+    async def achat(self, messages, **params):
+        self.repair_messages = messages
+        return self.repaired
+
+
+def _extract(monkeypatch, giga):
+    monkeypatch.setattr(plan_extraction, "get_gigachat_service", lambda: giga)
+    return asyncio.run(plan_extraction._extract_with_gigachat("текст плана", None))
+
+
+def test_invalid_response_is_repaired(monkeypatch):
+    broken = orjson.dumps({key: value for key, value in VALID_PLAN.items() if key != "doctor"}).decode()
+    giga = FakeGigaChat(broken, orjson.dumps(VALID_PLAN).decode())
+
+    assert _extract(monkeypatch, giga) == VALID_PLAN
+    # В запрос на исправление уходят исходный ответ и ошибка проверки
+    repair_prompt = giga.repair_messages[-1]["content"]
+    assert broken in repair_prompt
+    assert "Schema validation failed" in repair_prompt
+
+
+def test_valid_response_is_not_repaired(monkeypatch):
+    giga = FakeGigaChat(orjson.dumps(VALID_PLAN).decode(), "")
+    assert _extract(monkeypatch, giga) == VALID_PLAN
+    assert giga.repair_messages is None
+
+
+def test_failed_repair_returns_none(monkeypatch):
+    giga = FakeGigaChat("Не понимаю запрос", "Все равно не понимаю")
+    assert _extract(monkeypatch, giga) is None
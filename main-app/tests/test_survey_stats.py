@@ -0,0 +1,92 @@
+"""
+Тесты динамики симптомов (app.services.survey_stats)
+"""
+
+import random
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.survey_stats import (
+    NUMPY_MIN_POINTS,
+    _moving_average_numpy,
+    _moving_average_python,
+    build_symptom_stats,
+    moving_average,
+)
+
+
+def test_moving_average_example():
+    assert moving_average([2, 4, 6, 8], window=2) == [2.0, 3.0, 5.0, 7.0]
+
+
+def test_moving_average_without_smoothing():
+    assert moving_average([1, 2, 3], window=1) == [1.0, 2.0, 3.0]
+    assert moving_average([], window=3) == []
+
+
+def test_moving_average_window_longer_than_series():
+    assert moving_average([3, 6, 9], window=10) == [3.0, 4.5, 6.0]
+
+
+@pytest.mark.parametrize("length", [NUMPY_MIN_POINTS, NUMPY_MIN_POINTS * 3 + 1])
+@pytest.mark.parametrize("window", [2, 7, NUMPY_MIN_POINTS * 2])
+def test_numpy_and_python_paths_agree(length, window):
+    rng = random.Random(length * window)
+    values = [rng.uniform(0, 10) for _ in range(length)]
+    expected = _moving_average_python(values, window)
+    assert _moving_average_numpy(values, window) == pytest.approx(expected)
+    assert moving_average(values, window) == pytest.approx(expected)
+
+
+def _row(symptom_id, day, avg_value, **fields):
+    row = {
+        "symptom_id": symptom_id,
+        "description": f"Симптом {symptom_id}",
+        "slope": 0.123456,
+        "bucket": datetime(2026, 10, day, tzinfo=timezone.utc),
+        "min_value": 1,
+        "avg_value": avg_value,
+        "max_value": 9,
+        "count": 3,
+        "change": None,
+    }
+    row.update(fields)
+    return SimpleNamespace(**row)
+
+
+def test_build_symptom_stats_groups_by_symptom():
+    rows = [
+        _row(1, 1, 2.0),
+        _row(1, 2, 4.0, change=2.0),
+        _row(2, 1, 5.556, slope=None),
+    ]
+    stats = build_symptom_stats(rows)
+
+    assert [symptom["symptom_id"] for symptom in stats] == [1, 2]
+    assert stats[0]["description"] == "Симптом 1"
+    assert stats[0]["trend"] == 0.1235
+    assert stats[1]["trend"] is None
+    assert stats[0]["buckets"][1] == {
+        "start": date(2026, 10, 2),
+        "min": 1,
+        "avg": 4.0,
+        "max": 9,
+        "count": 3,
+        "change": 2.0,
+        "smoothed": None,
+    }
+    assert stats[1]["buckets"][0]["avg"] == 5.56
+
+
+def test_build_symptom_stats_smoothing_per_symptom():
+    rows = [_row(1, 1, 2.0), _row(1, 2, 4.0), _row(1, 3, 6.0), _row(2, 1, 10.0)]
+    stats = build_symptom_stats(rows, smooth=2)
+    assert [bucket["smoothed"] for bucket in stats[0]["buckets"]] == [2.0, 3.0, 5.0]
+    # Окно не переходит на следующий симптом
+    assert [bucket["smoothed"] for bucket in stats[1]["buckets"]] == [10.0]
+
+
+def test_build_symptom_stats_empty():
+    assert build_symptom_stats([]) == []